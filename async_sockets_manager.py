@@ -0,0 +1,426 @@
+"""This module is asyncio version of SocketsManager, socket clients are served in own thread"""
+import asyncio
+import threading
+from typing import Union
+
+from sockets_manager import SocketsManager, SocketsManagerError
+from utils.send_queues import SendQueues
+
+
+class ClientProtocol(asyncio.Protocol):
+    """
+        This class passes events of one client connection to AsyncSocketsManager
+
+        :param on_connection_made: <func(ClientProtocol)> called when client was connected
+        :param on_data_received: <func(ClientProtocol, bytes)> called when data from client were received
+        :param on_connection_lost: <func(ClientProtocol, Exception | None)> called when connection was closed
+        :param on_resume_writing: <func(ClientProtocol)> called when transport buffer has space for new data
+    """
+    def __init__(self, on_connection_made, on_data_received, on_connection_lost, on_resume_writing):
+        """
+        self.transport - <asyncio.Transport | None> transport of connection
+        self.is_paused - <bool> True - transport buffer is full, so new data shouldn't be written
+        self.is_closing - <bool> True - connection was aborted, so new data shouldn't be written
+        """
+        self.__on_connection_made = on_connection_made
+        self.__on_data_received = on_data_received
+        self.__on_connection_lost = on_connection_lost
+        self.__on_resume_writing = on_resume_writing
+        self.transport = None
+        self.is_paused = False
+        self.is_closing = False
+
+    def abort(self) -> None:
+        """
+        This method closes connection immediately, not sent data are lost
+
+        :return: None
+        """
+        self.is_closing = True
+        self.transport.abort()
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+        self.__on_connection_made(self)
+
+    def data_received(self, data: bytes) -> None:
+        self.__on_data_received(self, data)
+
+    def connection_lost(self, exc) -> None:
+        self.__on_connection_lost(self, exc)
+
+    def pause_writing(self) -> None:
+        self.is_paused = True
+
+    def resume_writing(self) -> None:
+        self.is_paused = False
+        self.__on_resume_writing(self)
+
+
+class AsyncSocketsManager:
+    """
+        This class has the same public methods like SocketsManager, but socket clients are served by asyncio event loop
+        in own thread. Data to send are added to queue (protected by lock) and the loop is woken up by
+        call_soon_threadsafe, so sending to many clients doesn't delay communication between COM ports.
+        communications() only returns data received from clients.
+
+        Logs are the same like in SocketsManager.
+
+        :raise SocketsManagerError:
+    """
+    def __init__(self, on_add_log, max_queue_bytes: int = 0, max_queue_messages: int = 0,
+                 overflow_policy: str = "drop_oldest"):
+        """
+        :param on_add_log: <func(int,str,str,str)> function to add logs
+        :param max_queue_bytes: <int> like in SocketsManager
+        :param max_queue_messages: <int> like in SocketsManager
+        :param overflow_policy: <str> like in SocketsManager
+        :raise SocketsManagerError: 11-005
+
+        self.__on_add_log - same like in :param on_add_log:
+        self.__lock - <threading.Lock> protects data shared between the loop thread and other threads
+        self.__clients - <dict> key is ClientProtocol, value is dict with fields:
+                                - data_to_recv - <bytes> waiting queue for recv, in this var socket wait to sign '\r'
+                                - number_received_bytes - <int> number of recv bytes from data_to_recv
+                                - number_received_communicates - <int> number of recv communicates from data_to_recv
+        self.__data_to_send - <SendQueues> data to send to every client (ClientProtocol is key of client)
+        self.__received_data - <bytes> data received from clients, which weren't returned by communications()
+        self.__enable_send - <bool> is allowed send to socket
+        self.__loop - <asyncio.AbstractEventLoop | None> event loop of server, None - server isn't created
+        self.__server - <asyncio.AbstractServer | None> server
+        self.__loop_thread - <threading.Thread | None> thread where self.__loop runs
+        """
+        if overflow_policy not in SendQueues.LIST_POLICY:
+            raise SocketsManagerError("11-005", "ValueError - Unknown policy of queue overflow: {}"
+                                      .format(overflow_policy))
+        self.__on_add_log = on_add_log
+        self.__lock = threading.Lock()
+        self.__clients = {}
+        self.__data_to_send = SendQueues(on_add_log, self.__get_address, max_queue_bytes, max_queue_messages,
+                                         overflow_policy)
+        self.__received_data = b""
+        self.__enable_send = True
+        self.__loop = None
+        self.__server = None
+        self.__loop_thread = None
+
+    @staticmethod
+    def __get_address(protocol: ClientProtocol):
+        """
+        :param protocol: <ClientProtocol> client
+        :return: <tuple> address of client
+        """
+        return protocol.transport.get_extra_info("peername")
+
+    def create_server(self, ip_addr: str, port: int) -> bool:
+        """
+        This method create server and starts thread with event loop.
+
+        :param ip_addr: <str> server ip address
+        :param port: <int> port where server will listen (0-65535)
+        :return: <bool> True - successful, False - otherwise
+        :raise SocketsManagerError: 11-000, 11-001, 11-002, 11-003
+        :logs: SKT_SRCD (2)
+        """
+        for name, value in [["ip_addr", ip_addr], ["port", port]]:
+            expected_type = str if name == "ip_addr" else int
+            if type(value) != expected_type:
+                raise SocketsManagerError("11-000", "TypeError - variable '{}' must be one of [{}], but is {}"
+                                          .format(name, type(value).__name__, str([expected_type])))
+        if self.__loop is not None:
+            self.__stop_loop()
+        with self.__lock:
+            self.__clients = {}
+            self.__data_to_send.remove_all_clients()
+
+        loop = asyncio.new_event_loop()
+        try:
+            self.__server = loop.run_until_complete(loop.create_server(self.__create_protocol, ip_addr, port,
+                                                                       backlog=5))
+        except OSError as e:
+            loop.close()
+            raise SocketsManagerError("11-001", "OSError - Error while create socket server | {}".format(e))
+        except OverflowError as e:
+            loop.close()
+            raise SocketsManagerError("11-002", "OverflowError - Error while create socket server - "
+                                                "wrong number of port | {}".format(e))
+        except TypeError as e:
+            loop.close()
+            raise SocketsManagerError("11-003", "TypeError - Error while create socket server - "
+                                                "wrong type of argument | {}".format(e))
+        self.__loop = loop
+        self.__loop_thread = threading.Thread(target=self.__run_loop, name="AsyncSocketsManager")
+        self.__loop_thread.daemon = True
+        self.__loop_thread.start()
+        self.__on_add_log(2, "SKT_SRCD", "", "Socket server: ip addr: {} port: {}".format(ip_addr, port))
+        return True
+
+    def __run_loop(self) -> None:
+        """
+        Body of the loop thread
+
+        :return: None
+        """
+        asyncio.set_event_loop(self.__loop)
+        self.__loop.run_forever()
+
+    def __create_protocol(self) -> ClientProtocol:
+        """
+        :return: <ClientProtocol> protocol of new connection
+        """
+        return ClientProtocol(self.__on_connection_made, self.__on_data_received, self.__on_connection_lost,
+                              self.__flush)
+
+    def get_info(self) -> list:
+        """
+        This method give list with primary information about every sockets, like SocketsManager.get_info
+
+        :return: <list<list<str, str, str, str, str, str>>> like in SocketsManager.get_info
+        """
+        result = []
+        with self.__lock:
+            for protocol, client in self.__clients.items():
+                result.append([
+                    str(self.__get_address(protocol)),
+                    str(client["number_received_communicates"]),
+                    str(client["number_received_bytes"]),
+                    str(self.__data_to_send.get_number_of_messages(protocol)),
+                    "0",
+                    str(self.__data_to_send.get_number_dropped_messages(protocol))
+                ])
+            queue = SendQueues.QUEUE_NOT_SENT_DATA
+            number_dropped_messages = str(self.__data_to_send.get_number_dropped_messages(queue))
+            if self.__data_to_send.has_queue_not_sent_data():
+                result.append([
+                    "Kolejka",
+                    str(self.__data_to_send.get_number_of_messages(queue)),
+                    str(self.__data_to_send.get_number_of_bytes(queue)),
+                    "0",
+                    "0",
+                    number_dropped_messages
+                ])
+            else:
+                result.append(["Kolejka", "0", "0", "0", "0", number_dropped_messages])
+        return result
+
+    def communications(self, enable_send: bool) -> bytes:
+        """
+        This method returns data received from clients. Clients are served in loop thread, so this method doesn't
+        send or receive anything.
+
+        :param: enable_send - is allowed send to socket
+        :return: <bytes> all received data
+        """
+        with self.__lock:
+            received_data, self.__received_data = self.__received_data, b""
+            is_send_enabled_now = enable_send and not self.__enable_send
+            self.__enable_send = enable_send
+        if is_send_enabled_now:
+            self.__call_in_loop(self.__flush_all)
+        return received_data
+
+    def add_bytes_to_send(self, new_bytes_to_send: bytes) -> bool:
+        """
+        This method add to all send queues new message or if aren't any opened socket client, then add to waiting queue.
+        Message must have sign "\r" on the end. Data are sent by loop thread.
+
+        :param new_bytes_to_send: <bytes> Bytes which will be add to send queue
+        :return: <boot> True - successfully, False - was error
+        :logs: SKT_ATST_ERROR (10), SKT_ATSL_ERROR (10), SKT_ATSE_ERROR (10), SKT_ATSD (1), SKT_ATQE (1),
+               SKT_QOVF_DISCONNECT (8), SKT_QOVF_DROP (8), SKT_QOVF_SPILL (5)
+        """
+        if type(new_bytes_to_send) != bytes:
+            self.__on_add_log(10, "SKT_ATST_ERROR", "", "Wrong type of data to send: '{}' have type '{}'"
+                              .format(new_bytes_to_send, type(new_bytes_to_send).__name__))
+            return False
+        if len(new_bytes_to_send) == 0:
+            self.__on_add_log(10, "SKT_ATSL_ERROR", "", "Wrong length of data to send, must send minimum one byte: '{}'"
+                              .format(new_bytes_to_send))
+            return False
+        if new_bytes_to_send[-1:] != b"\r":
+            self.__on_add_log(10, "SKT_ATSE_ERROR", "", "Wrong last sign of data to send, last sign must be '\\r': '{}'"
+                              .format(new_bytes_to_send))
+            return False
+        with self.__lock:
+            list_client_to_close = self.__data_to_send.append(new_bytes_to_send)
+            if len(self.__clients):
+                for protocol in self.__clients:
+                    self.__on_add_log(1, "SKT_ATSD", self.__get_address(protocol), "{}".format(new_bytes_to_send))
+            else:
+                self.__on_add_log(1, "SKT_ATQE", "", "{}".format(new_bytes_to_send))
+        for protocol in list_client_to_close:
+            self.__call_in_loop(protocol.abort)
+        if len(self.__clients):
+            self.__call_in_loop(self.__flush_all)
+        return True
+
+    def __call_in_loop(self, func) -> None:
+        """
+        This method calls func in loop thread
+
+        :param func: <func()> function to call
+        :return: None
+        """
+        loop = self.__loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(func)
+
+    def __on_connection_made(self, protocol: ClientProtocol) -> None:
+        """
+        Called in loop thread after new client was connected
+
+        :param protocol: <ClientProtocol> new client
+        :return: None
+        :logs: SKT_ACPT (6)
+        """
+        with self.__lock:
+            self.__clients[protocol] = {
+                "data_to_recv": b"",
+                "number_received_bytes": 0,
+                "number_received_communicates": 0
+            }
+            self.__data_to_send.add_client(protocol)
+        self.__on_add_log(6, "SKT_ACPT", self.__get_address(protocol), "New socket client")
+        self.__flush(protocol)
+
+    def __on_data_received(self, protocol: ClientProtocol, data: bytes) -> None:
+        """
+        Called in loop thread after data from client were received
+
+        :param protocol: <ClientProtocol> client
+        :param data: <bytes> received data
+        :return: None
+        :logs: SKT_RCVP (1), SKT_RECV (5)
+        """
+        client_address = self.__get_address(protocol)
+        if data == b"\r":
+            self.__on_add_log(1, "SKT_RCVP", client_address, "Receive ping message")
+            return
+        with self.__lock:
+            client = self.__clients[protocol]
+            data_to_recv = client["data_to_recv"] + data
+            index = data_to_recv.rfind(b"\r") + 1
+            data_received = data_to_recv[:index]
+            client["data_to_recv"] = data_to_recv[index:]
+            client["number_received_bytes"] += len(data_received)
+            client["number_received_communicates"] += data_received.count(b"\r")
+            self.__received_data += data_received
+        self.__on_add_log(5, "SKT_RECV", client_address, str(data_received))
+
+    def __on_connection_lost(self, protocol: ClientProtocol, exc: Union[Exception, None]) -> None:
+        """
+        Called in loop thread after connection with client was closed
+
+        :param protocol: <ClientProtocol> client
+        :param exc: <Exception | None> error which closed connection, None - connection was closed normally
+        :return: None
+        :logs: SKT_RECV_ERROR (10), SKT_RECV_CLOSE (7), SKT_CLSC (6)
+        """
+        client_address = self.__get_address(protocol)
+        with self.__lock:
+            self.__clients.pop(protocol, None)
+            self.__data_to_send.remove_client(protocol)
+        if exc is None:
+            self.__on_add_log(7, "SKT_RECV_CLOSE", client_address, "The socket connection was closed")
+        else:
+            self.__on_add_log(10, "SKT_RECV_ERROR", client_address, "An error occurred in connection | {}".format(exc))
+        self.__on_add_log(6, "SKT_CLSC", client_address, "Socket has been closed")
+
+    def __flush_all(self) -> None:
+        """
+        Called in loop thread, writes data waiting to send to every client
+
+        :return: None
+        """
+        for protocol in list(self.__clients):
+            self.__flush(protocol)
+
+    def __flush(self, protocol: ClientProtocol) -> None:
+        """
+        Called in loop thread, writes data waiting to send to client until transport buffer is full
+
+        :param protocol: <ClientProtocol> client
+        :return: None
+        :logs: SKT_SEND (3)
+        """
+        with self.__lock:
+            if not self.__enable_send or protocol not in self.__clients:
+                return
+            while not protocol.is_paused and not protocol.is_closing and \
+                    self.__data_to_send.get_number_of_bytes(protocol) > 0:
+                number_sent_bytes, sent_data = self.__data_to_send.send(protocol, self.__write_function(protocol))
+                self.__on_add_log(3, "SKT_SEND", self.__get_address(protocol), sent_data)
+
+    @staticmethod
+    def __write_function(protocol: ClientProtocol):
+        """
+        :param protocol: <ClientProtocol> client
+        :return: <func(bytes | memoryview) -> int> function which writes all data to transport of client
+        """
+        def write(data) -> int:
+            protocol.transport.write(data)
+            return len(data)
+        return write
+
+    def __stop_loop(self) -> None:
+        """
+        This method closes server and all clients, then stops loop thread
+
+        :return: None
+        """
+        def close_in_loop():
+            self.__server.close()
+            for protocol in list(self.__clients):
+                protocol.abort()
+            self.__loop.call_soon(self.__loop.stop)
+
+        self.__loop.call_soon_threadsafe(close_in_loop)
+        self.__loop_thread.join()
+        self.__loop.run_until_complete(self.__server.wait_closed())
+        self.__loop.close()
+        self.__loop = None
+        self.__server = None
+        self.__loop_thread = None
+
+    def close(self) -> bool:
+        """
+        This method close every sockets and stops loop thread.
+
+        :return: True - closing was ended successfully, False - server wasn't created
+        :logs: SKT_CCSS_ERROR (10), SKT_CLSS_ERROR (10), SKT_CLSS (6)
+        """
+        if self.__loop is None:
+            self.__on_add_log(10, "SKT_CCSS_ERROR", "", "Error occurred while trying close closed server socket")
+            return False
+        try:
+            self.__stop_loop()
+        except OSError as e:
+            self.__on_add_log(10, "SKT_CLSS_ERROR", "", "Error occurred while trying close socket server"
+                                                        " | {}".format(e))
+            return False
+        self.__on_add_log(6, "SKT_CLSS", "", "Socket server has been closed")
+        return True
+
+    def on_clear_queue(self) -> int:
+        """
+        This method clear queue with unsent data has been cleared
+
+        :return: <int> number of deleted bytes
+        :logs: SKT_CQUE (8), SKT_EQUE (8)
+        """
+        with self.__lock:
+            number_of_deleted_bytes = self.__data_to_send.clear_queue_not_sent_data()
+        if number_of_deleted_bytes > 0:
+            self.__on_add_log(8, "SKT_CQUE", "", "Queue with unsent data has been cleared")
+        else:
+            self.__on_add_log(8, "SKT_EQUE", "", "Queue with unsent data was empty")
+        return number_of_deleted_bytes
+
+    @staticmethod
+    def get_list_ip():
+        """
+        This method give list of available IP on computer
+
+        :return: <list[str]> list of available IP on computer
+        """
+        return SocketsManager.get_list_ip()
@@ -0,0 +1,56 @@
+"""
+Benchmark of calculating control sum and preparing messages.
+
+It compares the old functions (loop over bytes and formatting through hex()) with the functions from utils.messages
+(sum() and lookup table, precalculated sums of commands).
+
+Run: python -m benchmarks.bench_checksum
+"""
+import timeit
+
+from utils.messages import calculate_message_control_sum, prepare_command_message, prepare_z_message
+
+NUMBER = 200000
+MESSAGE_THROW = b"3831w00A00400F07B000000000003000"
+MESSAGE_HEAD = b"3138"
+
+
+def old_calculate_control_sum(message: bytes) -> bytes:
+    sum_ascii = 0
+    for x in message:
+        sum_ascii += x
+    checksum = bytes(hex(sum_ascii).split("x")[-1].upper()[-2:], 'utf-8')
+    return checksum
+
+
+def old_prepare_message(message: bytes) -> bytes:
+    return message + old_calculate_control_sum(message) + b"\r"
+
+
+def old_prepare_z_message() -> bytes:
+    return old_prepare_message(MESSAGE_HEAD + b"Z" + b"00A" + b"004" + b"00F" + b"07B" + b"000" + b"000" + b"000" +
+                               b"003" + b"000")
+
+
+def new_prepare_z_message() -> bytes:
+    return prepare_z_message(MESSAGE_HEAD, b"00A", b"004", b"00F", b"07B", b"000", b"000", b"000", b"003", b"000")
+
+
+def measure(name: str, func_old, func_new) -> None:
+    assert func_old() == func_new()
+    time_old = min(timeit.repeat(func_old, number=NUMBER, repeat=3))
+    time_new = min(timeit.repeat(func_new, number=NUMBER, repeat=3))
+    print("{:<16} old: {:7.3f} us   new: {:7.3f} us   speedup: {:5.2f}x".format(
+        name,
+        1000000 * time_old / NUMBER,
+        1000000 * time_new / NUMBER,
+        time_old / time_new
+    ))
+
+
+if __name__ == '__main__':
+    measure("control sum", lambda: old_calculate_control_sum(MESSAGE_THROW),
+            lambda: calculate_message_control_sum(MESSAGE_THROW))
+    measure("command T14", lambda: old_prepare_message(MESSAGE_HEAD + b"T14"),
+            lambda: prepare_command_message(MESSAGE_HEAD, b"T14"))
+    measure("message Z", old_prepare_z_message, new_prepare_z_message)
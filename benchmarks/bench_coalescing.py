@@ -0,0 +1,91 @@
+"""
+Benchmark of throughput of ComManager.send() with and without coalescing of messages (max_messages_per_write).
+
+In every of NUMBER_OF_ROUNDS rounds every lane gets the sequence used by SectionClearOffTest to finish a layout
+(Stop, Z, Korekta, C, Enter with time_wait 0 and Podnies with time_wait 800) and the loop calls send() and sleeps
+TIME_INTERVAL_BREAK, like ConnectionManager in polling mode, until all messages of the round are received. Instead of
+a real COM port pyserial's "loop://" port is used, so no com0com is needed. loop:// raises write timeout like a real
+port at 9600 baud, so one write is limited to bytes which can be sent in write_timeout; the line limit is printed
+next to the result.
+
+Run: python -m benchmarks.bench_coalescing
+"""
+import time
+
+import serial
+
+import com_manager
+from com_manager import ComManager
+from utils.messages import encapsulate_message, prepare_command_message, prepare_z_message
+
+NUMBER_OF_LANE = 6
+NUMBER_OF_ROUNDS = 3
+TIME_INTERVAL_BREAK = 0.05
+BAUDRATE = 9600
+
+
+def create_com_manager(max_messages_per_write: int) -> ComManager:
+    original_serial = com_manager.serial.Serial
+    com_manager.serial.Serial = lambda port, baudrate, **kwargs: serial.serial_for_url("loop://", baudrate, **kwargs)
+    try:
+        list_recipient = ["3{}".format(lane_id).encode() for lane_id in range(NUMBER_OF_LANE)]
+        return ComManager("loop", 0.05, 0.05, "COM_B", lambda a, b, c, d: None, list_recipient, 700,
+                          max_messages_per_write)
+    finally:
+        com_manager.serial.Serial = original_serial
+
+
+def get_clear_off_sequence(lane_id: int, round_number: int) -> list:
+    """Messages sent by SectionClearOffTest to one lane to set the full layout."""
+    head = "3{}38".format(lane_id).encode()
+    throw = "{:03X}".format(round_number).encode()
+    command = lambda command_name, time_wait=0: encapsulate_message(prepare_command_message(head, command_name), 5,
+                                                                    time_wait)
+    return [
+        command(b"T40"),
+        encapsulate_message(prepare_z_message(head, throw, b"009", b"01E", b"01E", b"1FF", b"000", b"000", b"000",
+                                              b"000"), 5, 0),
+        command(b"T16"),
+        command(b"T22"),
+        command(b"T24"),
+        command(b"T41", 800)
+    ]
+
+
+def run(max_messages_per_write: int) -> (int, int, float, int):
+    com = create_com_manager(max_messages_per_write)
+    number_of_messages = 0
+    number_of_bytes = 0
+    number_of_passes = 0
+    time_start = time.time()
+    for round_number in range(NUMBER_OF_ROUNDS):
+        number_of_messages_in_round = 0
+        for lane_id in range(NUMBER_OF_LANE):
+            list_msg = get_clear_off_sequence(lane_id, round_number)
+            com.add_msg_to_send([], list_msg)
+            number_of_messages_in_round += len(list_msg)
+            number_of_bytes += sum(len(msg["message"]) for msg in list_msg)
+        number_of_messages += number_of_messages_in_round
+
+        number_of_received = 0
+        while number_of_received < number_of_messages_in_round:
+            number_of_passes += 1
+            com.send()
+            number_of_received += com.read().count(b"\r")
+            time.sleep(TIME_INTERVAL_BREAK)
+    time_all = time.time() - time_start
+    com.close()
+    return number_of_messages, number_of_bytes, time_all, number_of_passes
+
+
+def print_result(max_messages_per_write: int) -> None:
+    number_of_messages, number_of_bytes, time_all, number_of_passes = run(max_messages_per_write)
+    line_limit = BAUDRATE / 10 / (number_of_bytes / number_of_messages)
+    print("max_messages_per_write={:<3} messages: {}   time: {:5.2f} s   {:6.1f} msg/s   loop passes: {:4}   "
+          "line limit: {:.1f} msg/s".format(max_messages_per_write, number_of_messages, time_all,
+                                            number_of_messages / time_all, number_of_passes, line_limit))
+
+
+if __name__ == '__main__':
+    for max_messages in [1, 6, 12]:
+        print_result(max_messages)
@@ -0,0 +1,80 @@
+"""
+Benchmark of latency between arriving of a frame on COM port and reading it by the communication loop.
+
+It compares the old polling loop (read + time.sleep(time_interval_break)) with the event-driven loop (reader thread
+wakes up the loop). Instead of a real COM port pyserial's "loop://" port is used, so no com0com is needed.
+
+Run: python -m benchmarks.bench_event_loop
+"""
+import random
+import threading
+import time
+
+import serial
+
+import com_manager
+from com_manager import ComManager
+
+NUMBER_OF_FRAMES = 100
+TIME_INTERVAL_BREAK = 0.05
+FRAME = b"3038w0120070070070FF00000000000FFA0\r"
+
+
+def create_com_manager() -> ComManager:
+    original_serial = com_manager.serial.Serial
+    com_manager.serial.Serial = lambda port, baudrate, **kwargs: serial.serial_for_url("loop://", baudrate, **kwargs)
+    try:
+        return ComManager("loop", 0.05, 0.05, "COM_B", lambda a, b, c, d: None, [], 0)
+    finally:
+        com_manager.serial.Serial = original_serial
+
+
+def lane(com: ComManager, list_time_sent: list) -> None:
+    """Write frames into the loopback port in random moments, like a lane does."""
+    port = com._ComManager__com_port
+    for _ in range(NUMBER_OF_FRAMES):
+        time.sleep(random.uniform(0.01, 0.03))
+        list_time_sent.append(time.time())
+        port.write(FRAME)
+
+
+def run(event_driven: bool) -> (list, int):
+    com = create_com_manager()
+    wake_event = threading.Event()
+    if event_driven:
+        com.start_reader_thread(wake_event.set)
+
+    list_time_sent, list_latency = [], []
+    lane_thread = threading.Thread(target=lane, args=(com, list_time_sent))
+    lane_thread.start()
+    number_of_wakeups = 0
+    while len(list_latency) < NUMBER_OF_FRAMES:
+        number_of_wakeups += 1
+        received = com.read()
+        time_now = time.time()
+        for _ in range(received.count(b"\r")):
+            list_latency.append(time_now - list_time_sent[len(list_latency)])
+        if event_driven:
+            wake_event.wait(0.5)
+            wake_event.clear()
+        else:
+            time.sleep(TIME_INTERVAL_BREAK)
+    lane_thread.join()
+    com.close()
+    return list_latency, number_of_wakeups
+
+
+def print_result(name: str, list_latency: list, number_of_wakeups: int) -> None:
+    list_latency = sorted(list_latency)
+    print("{:<14} mean: {:6.2f} ms   p95: {:6.2f} ms   max: {:6.2f} ms   loop passes: {}".format(
+        name,
+        1000 * sum(list_latency) / len(list_latency),
+        1000 * list_latency[int(len(list_latency) * 0.95)],
+        1000 * list_latency[-1],
+        number_of_wakeups
+    ))
+
+
+if __name__ == '__main__':
+    print_result("polling", *run(False))
+    print_result("event-driven", *run(True))
@@ -1,7 +1,13 @@
+import re
 import serial
+import threading
 import time
+from collections import deque
 from typing import Union
 
+from utils.frame_buffer import FrameBuffer
+from utils.send_scheduler import SendScheduler
+
 
 class ComManagerError(Exception):
     """
@@ -25,6 +31,7 @@ class ComManager:
         This class is used to manage serial port communication.
 
         Logs:
+            COM_READER_ERROR - 10 - error in the thread which reads data from com port
             COM_READ_NOISE - 10 - noisy data was read
             COM_SEND_WTPE - 6 - invalid data type attempted to be added to the send queue
             COM_SEND_WEND - 6 - wrong end of data to send, should have '\r' as last sign
@@ -32,14 +39,19 @@ class ComManager:
             COM_READ - 5 - read bytes from com port
             COM_SEND_inQUEUE - 5 - message is already in the queue to be sent, so it is discarded
             COM_SEND - 4 - sent bytes to com port
+            COM_READER_START - 2 - thread which reads data from com port has been started
             COM_SEND_TOUT - 1 - timeout occurred while trying to send data
             COM_CREATE - 1 - COM port has been created
 
         :raise ComManagerError:
     """
+    READER_TIMEOUT = 0.05
+    # bytes which aren't defined in Windows-1250, data with them are noise on the line
+    NOISE_BYTES = re.compile(b"[\x81\x83\x88\x90\x98]")
 
     def __init__(self, port_name: str, timeout: Union[int, float, None],
-                 write_timeout: Union[int, float, None], alias: str, on_add_log, list_recipients, time_wait_between_msg_on_bucket):
+                 write_timeout: Union[int, float, None], alias: str, on_add_log, list_recipients, time_wait_between_msg_on_bucket,
+                 max_messages_per_write: int = 1):
         """
         :param port_name: <str> name of port e.g. "COM1", "COM2"
         :param timeout: <int, float, None> waiting during send data
@@ -50,20 +62,33 @@ class ComManager:
         :param write_timeout: <int, float, None> waiting during received data (same options like in timeout)
         :param alias: <str> alternative port name, e.g. "COM_X", "COM_Y"
         :param on_add_log: <func(int,str,str,str)> function to add logs
-        :param list_recipients: list[bytes] - TODO
-        :param time_wait_between_msg_on_bucket: int TODO
+        :param list_recipients: list[bytes] - recipients (first two bytes of message), for every recipient is created
+                                              separate bucket with messages to send
+        :param time_wait_between_msg_on_bucket: int - default time in ms between two messages sent from one bucket
+        :param max_messages_per_write: int - max number of messages which can be sent now and are written to port
+                                             together in one send(), 1 - every message is written separately
 
         self.__port_name - same like in :param port_name:
         self.__alias - same like in :param alias:
         self.__bytes_to_send - <bytes> buffer with data witch waiting to send to com port
-        self.__bytes_to_recv - <bytes> buffer with data witch waiting to recv
+        self.__bytes_to_recv - <FrameBuffer> buffer with data witch waiting to recv
                                         (in this buffer is data until not recv sign '\r')
         self.__number_received_bytes - <int> number of bytes which was recv from self.__bytes_to_recv
         self.__number_received_communicates - <int> number of communicates which was recv from self.__bytes_to_recv
+        self.__send_scheduler - <SendScheduler> buckets with messages to send, chooses which message will be sent
+        self.__recipient_to_queue_index - <dict[bytes, int]> recipient -> index of bucket in self.__send_scheduler
+        self.__send_lock - <threading.Lock> messages can be added from other thread (e.g. GUI) than they are sent
         self.__on_add_log - same like in :param on_add_log:
         self.__com_port - <serial.Serial, None>
                             - serial.Serial - opened com port to communicate
                             - None - closed or not open com port
+        self.__reader_thread - <threading.Thread, None> thread which reads data from com port (event-driven mode),
+                                None - data are read directly in read()
+        self.__reader_is_run - <bool> the reader thread works until this flag is True
+        self.__inbound_chunks - <deque[bytes]> data read by the reader thread, waiting for read()
+        self.__max_messages_per_write - same like in :param max_messages_per_write:
+        self.__max_bytes_per_write - <int | None> max number of bytes of joined messages, which can be written before
+                                     write_timeout at baudrate of port, None - without limit
         """
         self.__check_types([
             ["port_name", port_name, [str]],
@@ -74,19 +99,24 @@ class ComManager:
         self.__port_name = port_name
         self.__alias = alias
         # self.__bytes_to_send = b""
-        self.__send_buckets = []
-        self.__send_buckets_pointer = 0
+        self.__send_scheduler = SendScheduler(len(list_recipients), time_wait_between_msg_on_bucket)
         self.__recipient_to_queue_index = {}
-        self.__default_time_wait_between_msg_on_bucket = time_wait_between_msg_on_bucket
-        self.__bytes_to_recv = b""
+        self.__send_lock = threading.Lock()
+        self.__bytes_to_recv = FrameBuffer(b"\r")
         self.__number_received_bytes = 0
         self.__number_received_communicates = 0
         self.__number_duplicates = 0
         self.__on_add_log = on_add_log
+        self.__reader_thread = None
+        self.__reader_is_run = False
+        self.__inbound_chunks = deque()
+        self.__max_messages_per_write = max(1, max_messages_per_write)
         self.__com_port = self.__create_port(timeout, write_timeout)
+        self.__max_bytes_per_write = None
+        if write_timeout is not None and write_timeout > 0:
+            self.__max_bytes_per_write = int(write_timeout * self.__com_port.baudrate / 10)
 
         for i, recipient in enumerate(list_recipients):
-            self.__send_buckets.append({"time_last_send": 0, "messages": []})
             self.__recipient_to_queue_index[recipient] = i
 
     @staticmethod
@@ -150,31 +180,112 @@ class ComManager:
         :raise ComManagerError:
             10-003 - method will throw this raise, if port was be closed
         """
+        return b"".join(self.read_frames())
+
+    def read_frames(self) -> list:
+        """
+        This method read bytes from com port and returns received complete messages.
+
+        :return: <list[bytes]> Received messages (every with ended sign '\r'), in order of receiving
+        :logs: COM_READ_NOISE (10), COM_READ (5)
+        :raise ComManagerError:
+            10-003 - method will throw this raise, if port was be closed
+        """
         if self.__com_port is None:
             raise ComManagerError("10-003", "Port {} ({}) is closed or not was be created, so I can't read data"
                                   .format(self.__port_name, self.__alias))
 
-        in_waiting = self.__com_port.in_waiting
-        if in_waiting == 0:
-            return b""
+        if self.__reader_thread is not None:
+            data_read = self.__take_inbound_chunks()
+            if data_read == b"":
+                return []
+        else:
+            in_waiting = self.__com_port.in_waiting
+            if in_waiting == 0:
+                return []
+            data_read = self.__com_port.read(in_waiting)
 
-        data_read = self.__com_port.read(in_waiting)
         self.__on_add_log(5, "COM_READ", self.__alias, data_read)
-        self.__bytes_to_recv += data_read
+        self.__bytes_to_recv.append(data_read)
 
-        try:
-            data_read.decode('Windows-1250')
-        except UnicodeError:
+        if self.NOISE_BYTES.search(data_read) is not None:
             self.__on_add_log(10, "COM_READ_NOISE", self.__alias, data_read)
 
-        if b"\r" not in self.__bytes_to_recv:
-            return b""
+        list_frames = self.__bytes_to_recv.pop_frames()
+        for frame in list_frames:
+            self.__number_received_bytes += len(frame)
+        self.__number_received_communicates += len(list_frames)
+        return list_frames
+
+    def start_reader_thread(self, on_data_received) -> None:
+        """
+        This method starts a thread which waits (blocking) for data on the com port, so the port doesn't have to be
+        polled. Read data are buffered and returned by read(), after every received chunk on_data_received is called.
+
+        Reader thread needs a finite read timeout, so if port was created with timeout 0 or None, then
+        READER_TIMEOUT is used.
 
-        index = self.__bytes_to_recv.rindex(b"\r") + 1
-        data_received, self.__bytes_to_recv = self.__bytes_to_recv[:index], self.__bytes_to_recv[index:]
-        self.__number_received_bytes += len(data_received)
-        self.__number_received_communicates += data_received.count(b"\r")
-        return data_received
+        :param on_data_received: <func()> function called from the reader thread after new data was received
+        :return: None
+        :logs: COM_READER_START (2)
+        :raise ComManagerError:
+            10-003 - method will throw this raise, if port was be closed
+        """
+        if self.__com_port is None:
+            raise ComManagerError("10-003", "Port {} ({}) is closed or not was be created, so I can't read data"
+                                  .format(self.__port_name, self.__alias))
+        if self.__reader_thread is not None:
+            return
+        if not self.__com_port.timeout:
+            self.__com_port.timeout = self.READER_TIMEOUT
+        self.__reader_is_run = True
+        self.__reader_thread = threading.Thread(target=self.__reader_loop, args=(on_data_received,),
+                                                name="Reader_" + self.__alias)
+        self.__reader_thread.daemon = True
+        self.__reader_thread.start()
+        self.__on_add_log(2, "COM_READER_START", self.__alias, "Reader thread has been started")
+
+    def __reader_loop(self, on_data_received) -> None:
+        """
+        Body of the reader thread. read(1) blocks until first byte arrives (or timeout expires), then rest of bytes
+        waiting in the port are read.
+
+        :param on_data_received: <func()> function called after new data was received
+        :return: None
+        :logs: COM_READER_ERROR (10)
+        """
+        while self.__reader_is_run:
+            com_port = self.__com_port
+            if com_port is None:
+                break
+            try:
+                data_read = com_port.read(1)
+                if data_read == b"":
+                    continue
+                in_waiting = com_port.in_waiting
+                if in_waiting > 0:
+                    data_read += com_port.read(in_waiting)
+            except (serial.SerialException, OSError, TypeError, AttributeError) as e:
+                if self.__reader_is_run:
+                    self.__on_add_log(10, "COM_READER_ERROR", self.__alias, "Error while reading data | {}".format(e))
+                    time.sleep(self.READER_TIMEOUT)
+                continue
+            self.__inbound_chunks.append(data_read)
+            on_data_received()
+
+    def __take_inbound_chunks(self) -> bytes:
+        """
+        This method takes all chunks read by the reader thread.
+
+        :return: <bytes> joined chunks, b"" if there aren't any
+        """
+        chunks = []
+        while True:
+            try:
+                chunks.append(self.__inbound_chunks.popleft())
+            except IndexError:
+                break
+        return b"".join(chunks)
 
     def send(self) -> (int, bytes):
         """
@@ -184,7 +295,13 @@ class ComManager:
         This method will send only message which will be completed received, so it will send only messages witch will
         be ended with sign '\r'
 
-        :return: <int, bytes> number of sent bytes or -1 if was error, and sent message
+        Up to max_messages_per_write messages which can be sent now are joined and written to port at once, but
+        without exceeding number of bytes which can be written before write_timeout (the first message is always
+        written). Messages are taken like they were sent one by one, so the next one still respects 'time_wait' and
+        time between messages from the same bucket, but they are marked as sent only after writing, so if writing
+        fails, they can be sent again at once.
+
+        :return: <int, bytes> number of sent bytes or -1 if was error, and sent messages
         :logs: COM_SEND (4), COM_SEND_TOUT (1)
         :raise ComManagerError:
             10-004 - method will throw this raise, if port was be closed
@@ -196,52 +313,79 @@ class ComManager:
         if self.__com_port.out_waiting > 0:
             return 0, b""
 
-        count_bucket = len(self.__send_buckets)
-
         try:
-            time_now = int(time.time() * 1000)
-            msg_bucket_index = -1
-            msg_bucket_priority = -1
-            for i in range(count_bucket):
-                bucket_index = (self.__send_buckets_pointer + i) % count_bucket
-                list_msg = self.__send_buckets[bucket_index]["messages"]
-
+            with self.__send_lock:
+                time_now = int(time.time() * 1000)
+                list_msg = self.__send_scheduler.get_messages_to_send(time_now, self.__max_messages_per_write)
+                number_of_bytes = 0
+                for i, (_, msg) in enumerate(list_msg):
+                    number_of_bytes += len(msg["message"])
+                    if i > 0 and self.__max_bytes_per_write is not None and \
+                            number_of_bytes > self.__max_bytes_per_write:
+                        list_msg = list_msg[:i]
+                        break
                 if len(list_msg) == 0:
-                    continue
-
-                priority = list_msg[0]["priority"]
-
-                time_wait = list_msg[0]["time_wait"]
-                if time_wait == -1:
-                    time_wait = self.__default_time_wait_between_msg_on_bucket
-
-                if time_now < self.__send_buckets[bucket_index]["time_last_send"] + time_wait:
-                    continue
-
-                if priority > msg_bucket_priority:
-                    msg_bucket_index = bucket_index
-                    msg_bucket_priority = priority
+                    return 0, b""
 
-            if msg_bucket_index == -1:
-                return 0, b""
-
-            bytes_to_send = self.__send_buckets[msg_bucket_index]["messages"][0]["message"]
-            number_sent_bytes = self.__com_port.write(bytes_to_send)
-            self.__send_buckets[msg_bucket_index]["messages"].pop(0)
-            self.__send_buckets[msg_bucket_index]["time_last_send"] = time_now
+                bytes_to_send = b"".join(msg["message"] for _, msg in list_msg)
+                number_sent_bytes = self.__com_port.write(bytes_to_send)
+                for msg_bucket_index, _ in list_msg:
+                    self.__send_scheduler.mark_message_as_sent(msg_bucket_index, time_now)
 
             if len(bytes_to_send) != number_sent_bytes:
-                self.__on_add_log(10, "NEW_3", "Nie wysłano wszystkich danych: '{}', długość wiadomości: {}, ilość wysłanych danych: {}".format(bytes_to_send, len(bytes_to_send), number_sent_bytes))
-
-            if msg_bucket_index == self.__send_buckets_pointer:
-                self.__send_buckets_pointer = (self.__send_buckets_pointer + 1) % count_bucket
+                self.__on_add_log(10, "NEW_3", self.__alias, "Nie wysłano wszystkich danych: '{}', długość wiadomości: {}, ilość wysłanych danych: {}".format(bytes_to_send, len(bytes_to_send), number_sent_bytes))
 
-            self.__on_add_log(4, "COM_SEND", self.__alias, bytes_to_send)
+            for _, msg in list_msg:
+                self.__on_add_log(4, "COM_SEND", self.__alias, msg["message"])
             return len(bytes_to_send), bytes_to_send
         except serial.SerialTimeoutException as e:
             self.__on_add_log(1, "COM_SEND_TOUT", self.__alias, str(e))
             return -1, b""
 
+    def set_time_wait_between_msg_on_bucket(self, recipient: bytes, time_wait: int) -> bool:
+        """
+        This method changes default time between two messages sent from bucket of recipient
+
+        :param recipient: <bytes> recipient (first two bytes of message), e.g. b"30"
+        :param time_wait: <int> time in ms
+        :return: <bool> False - there isn't bucket for this recipient, otherwise True
+        """
+        index = self.__recipient_to_queue_index.get(recipient)
+        if index is None:
+            return False
+        with self.__send_lock:
+            self.__send_scheduler.set_default_time_wait(index, time_wait)
+        return True
+
+    def get_time_wait_between_msg_on_bucket(self, recipient: bytes) -> Union[int, None]:
+        """
+        :param recipient: <bytes> recipient (first two bytes of message), e.g. b"30"
+        :return: <int | None> default time in ms between two messages sent from bucket of recipient, None - there
+                 isn't bucket for this recipient
+        """
+        index = self.__recipient_to_queue_index.get(recipient)
+        if index is None:
+            return None
+        return self.__send_scheduler.get_default_time_wait(index)
+
+    def get_time_to_next_send(self) -> Union[float, None]:
+        """
+        This method return how long the caller can wait, before send() will be able to send next message.
+
+        :return: <float | None> time in seconds (0 - message can be sent now), None - there aren't messages to send
+        """
+        if self.__com_port is None:
+            return None
+        out_waiting = self.__com_port.out_waiting
+        if out_waiting > 0:
+            return out_waiting * 10 / self.__com_port.baudrate
+
+        with self.__send_lock:
+            time_to_next_send = self.__send_scheduler.get_time_to_next_message(int(time.time() * 1000))
+        if time_to_next_send is None:
+            return None
+        return max(0, time_to_next_send) / 1000
+
     def add_bytes_to_send(self, new_bytes_to_send: bytes) -> int:
         """
         TODO: TO DEL
@@ -283,7 +427,10 @@ class ComManager:
                 continue
             index = self.__recipient_to_queue_index[recipient]
             self.__on_add_log(6, "COM_ADD_MSG_SEND_FRONT", self.__alias, "Dodano wiadomość '{}' z priorytetem {} i time_wait: {} na początek kubełka '{}' o numerze {}".format(msg["message"], msg["priority"], msg["time_wait"], recipient, index))
-            self.__send_buckets[index]["messages"].insert(0, msg)
+            with self.__send_lock:
+                duplicate = self.__send_scheduler.add_message_front(index, msg)
+            if duplicate is not None:
+                self.__on_duplicate_removed(duplicate)
 
         for msg in list_msg_end:
             recipient = msg["message"][:2]
@@ -292,23 +439,24 @@ class ComManager:
                 continue
             index = self.__recipient_to_queue_index[recipient]
             self.__on_add_log(6, "COM_ADD_MSG_SEND_END", self.__alias, "Dodano wiadomość '{}' z priorytetem {} i time_wait: {} na koniec kubełka '{}' o numerze {}".format(msg["message"], msg["priority"], msg["time_wait"], recipient, index))
-            self.__send_buckets[index]["messages"].append(msg)
-
-        # TODO: make more optymalize func
-        for b_index in range(len(self.__send_buckets)):
-            seen_msg = set()
-            i = 0
-            while i < len(self.__send_buckets[b_index]["messages"]):
-                m = self.__send_buckets[b_index]["messages"][i]["message"]
-                if m in seen_msg:
-                    self.__on_add_log(5, "COM_SEND_inQUEUE", self.__alias, "Wiadomość '{}' już jest w kolejce, więc duplikat zostaje usunięty".format(m))
-                    del self.__send_buckets[b_index]["messages"][i]
-                else:
-                    seen_msg.add(m)
-                    i += 1
+            with self.__send_lock:
+                duplicate = self.__send_scheduler.add_message_end(index, msg)
+            if duplicate is not None:
+                self.__on_duplicate_removed(duplicate)
 
         return 0
 
+    def __on_duplicate_removed(self, msg: dict) -> None:
+        """
+        This method counts messages which weren't sent, because the same message was in the same bucket
+
+        :param msg: <dict<"message": bytes, "time_wait": int (ms), "priority": int>> removed message
+        :return: None
+        :logs: COM_SEND_inQUEUE (5)
+        """
+        self.__number_duplicates += 1
+        self.__on_add_log(5, "COM_SEND_inQUEUE", self.__alias, "Wiadomość '{}' już jest w kolejce, więc duplikat zostaje usunięty".format(msg["message"]))
+
     def get_number_received_bytes(self) -> int:
         """
         This method return number of received bytes from port.
@@ -331,15 +479,12 @@ class ComManager:
 
         :return: <int> number of waiting messages
         """
-        n = 0
-        for bucket in self.__send_buckets:
-            n += len(bucket["messages"])
-        return n
+        return self.__send_scheduler.get_number_of_messages()
         # return self.__bytes_to_send.count(b"\r")
 
     def get_number_of_duplicates(self) -> int:
         """
-        This method return number of duplicate messages in queue to send
+        This method return number of duplicate messages which were removed from queue to send
 
         :return: <int> number of duplicates
         """
@@ -358,5 +503,9 @@ class ComManager:
         if self.__com_port is None:
             raise ComManagerError("10-005", "Port {} ({}) is closed or not was be created, so I can't close port"
                                   .format(self.__port_name, self.__alias))
+        self.__reader_is_run = False
+        if self.__reader_thread is not None:
+            self.__reader_thread.join(2 * self.__com_port.timeout)
+            self.__reader_thread = None
         self.__com_port.close()
         self.__com_port = None
@@ -1,10 +1,19 @@
 """This module is responsible for data transfer"""
+import collections
 import time
+import threading
 import serial
-from typing import List
+from typing import List, Union
 
+from async_sockets_manager import AsyncSocketsManager
 from com_manager import ComManager
 from sockets_manager import SocketsManager
+from utils.analyze_worker import AnalyzeWorker, StageStat
+from utils.messages import LaneMessage, prepare_message, is_message_control_sum_valid
+from utils.opcode_dispatcher import OpcodeDispatcher
+from utils.pacing_controller import PacingController
+from utils.pending_responses import PendingResponses
+from utils.response_stat import ResponseStat
 
 
 class ConnectionManager:
@@ -12,9 +21,13 @@ class ConnectionManager:
 
         Logs:
             CON_ERROR_WAIT - 10 - timeout - too long wait for response, so next message was sent
+            CON_ANLS_ERROR_1 - 10 - lane sent more responses than messages it received
+            CON_ANLS_ERROR_2 - 10 - response came from lane, which doesn't have message waiting for response
             CON_READ_ERROR - 10 - error when reading data from the port
             CON_WAIT_veryLONG - 10 - critical long wait for a response
+            CON_BAD_POLICY - 10 - Unknown policy of messages with bad control sum, so "pass" is used
             CON_CLOSE - 8 - Com and socket ports have been closed
+            CON_BAD_SUM - 8 - Message with bad control sum was read
             CON_REPLACE - 7 - Message was changed on fly
             CON_WAIT_LONG - 7 - long wait for a response
             CON_STOP - 7 - Communication has been stopped
@@ -27,9 +40,31 @@ class ConnectionManager:
             ComManagerError
             SocketsManagerError
     """
+    # what is done with received message with bad control sum
+    BAD_SUM_PASS = "pass"  # message is forwarded like others, only counted
+    BAD_SUM_DROP = "drop"  # message is removed
+    BAD_SUM_QUARANTINE = "quarantine"  # message is forwarded only to other COM port, analyzers and sockets don't get it
+    LIST_BAD_SUM_POLICY = [BAD_SUM_PASS, BAD_SUM_DROP, BAD_SUM_QUARANTINE]
+    # max number of kept messages in quarantine
+    QUARANTINE_SIZE = 100
+    # percentiles of response times in lane stat
+    LIST_PERCENTILE = [50, 90, 95, 99]
+    # number of the last responses of lane used to calculate adaptive timeout
+    ADAPTIVE_TIMEOUT_WINDOW = 250
+    # time in ms between two messages sent to the same lane (initial gap, when adaptive pacing is enabled)
+    TIME_WAIT_BETWEEN_MSG_ON_LANE = 700
+
     def __init__(self, com_name_x: str, com_name_y: str, com_timeout, com_write_timeout: float, on_add_log,
                  time_interval_break: float, max_waiting_time_for_response: float, critical_response_time: float,
-                 warning_response_time: float, number_of_lane: int, check_communication_outgoing_is_enabled):
+                 warning_response_time: float, number_of_lane: int, check_communication_outgoing_is_enabled,
+                 event_driven_loop: bool = False, event_loop_max_wait: float = 0.5, socket_queue_max_bytes: int = 0,
+                 socket_queue_max_messages: int = 0, socket_queue_overflow_policy: str = "drop_oldest",
+                 socket_backend: str = "select", analyze_queue_max_size: int = 1000,
+                 bad_checksum_policy: str = "pass", lane_stat_percentile_windows=(1000, 0),
+                 adaptive_timeout: bool = False, adaptive_timeout_factor: float = 3.0, adaptive_timeout_min: float = 0.2,
+                 adaptive_timeout_min_samples: int = 50, adaptive_pacing: bool = False,
+                 adaptive_pacing_min_gap: int = 150, adaptive_pacing_max_gap: int = 2000,
+                 com_max_messages_per_write: int = 1):
         """
         :param com_name_x: <str> name of COM port to get information from 9pin machine, e.g. "COM1"
         :param com_name_y: <str> name of COM port to get information from computer application, e.g. "COM2"
@@ -42,19 +77,59 @@ class ConnectionManager:
         :param warning_response_time: <float> time in seconds after which program will inform about the alarmingly long waiting time for a response
         :param number_of_lane: <int>
         :param check_communication_outgoing_is_enabled: <func()=bool> return True if communication is enabled, otherwise return False
+        :param event_driven_loop: <bool> True - loop sleeps until data arrive on COM port or until next message can be
+                                  sent, False - loop polls COM ports and sleeps time_interval_break after every pass
+        :param event_loop_max_wait: <float> max time in seconds of sleep in event driven loop, after this time sockets
+                                    are served even if nothing has happened on COM ports
+        :param socket_queue_max_bytes: <int> max number of bytes waiting to send to one socket client, 0 - no limit
+        :param socket_queue_max_messages: <int> max number of messages waiting to send to one socket client,
+                                          0 - no limit
+        :param socket_queue_overflow_policy: <str> "drop_oldest", "disconnect" or "spill_to_disk", see SocketsManager
+        :param socket_backend: <str> "select" - socket clients are served in communication loop (SocketsManager),
+                               "asyncio" - socket clients are served in own thread (AsyncSocketsManager)
+        :param analyze_queue_max_size: <int> max number of messages waiting for functions which only observe messages,
+                                       0 - no limit
+        :param bad_checksum_policy: <str> one of LIST_BAD_SUM_POLICY, what is done with received message with bad
+                                    control sum
+        :param lane_stat_percentile_windows: <list[int]> numbers of the last responses for which percentiles of
+                                             response time are calculated (max 1000), 0 - all responses, the first
+                                             window is shown in lane stat table
+        :param adaptive_timeout: <bool> True - time of waiting for response is calculated for every lane from its p99 of
+                                 the last ADAPTIVE_TIMEOUT_WINDOW response times, False - max_waiting_time_for_response
+        :param adaptive_timeout_factor: <float> adaptive timeout = p99 * adaptive_timeout_factor
+        :param adaptive_timeout_min: <float> the shortest adaptive timeout in seconds, the longest is
+                                     max_waiting_time_for_response
+        :param adaptive_timeout_min_samples: <int> minimal number of responses of lane to use adaptive timeout, before
+                                             that max_waiting_time_for_response is used
+        :param adaptive_pacing: <bool> True - time between messages sent to the same lane is changed by
+                                PacingController from response times of lane, False - it is always
+                                TIME_WAIT_BETWEEN_MSG_ON_LANE
+        :param adaptive_pacing_min_gap: <int> the shortest time in ms between messages sent to the same lane
+        :param adaptive_pacing_max_gap: <int> the longest time in ms between messages sent to the same lane
+        :param com_max_messages_per_write: <int> max number of messages, which can be sent now, written together to
+                                           COM port in one pass of loop, 1 - one message in one pass
 
         List of additional_options: <empty list>
 
-        :logs: CON_INFO (2)
+        :logs: CON_BAD_POLICY (10), CON_INFO (2)
         :raise
             ComManagerError
             SocketsManagerError
         """
-        self.__com_x = ComManager(com_name_x, com_timeout, com_write_timeout, "COM_X", on_add_log, [b"30", b"31", b"32", b"33", b"34", b"35"], 700)
-        self.__com_y = ComManager(com_name_y, com_timeout, com_write_timeout, "COM_Y", on_add_log, [b"38"], 0)
+        self.__list_lane_recipient = ["3{}".format(lane_id).encode() for lane_id in range(number_of_lane)]
+        self.__com_x = ComManager(com_name_x, com_timeout, com_write_timeout, "COM_X", on_add_log,
+                                  self.__list_lane_recipient, self.TIME_WAIT_BETWEEN_MSG_ON_LANE,
+                                  com_max_messages_per_write)
+        self.__com_y = ComManager(com_name_y, com_timeout, com_write_timeout, "COM_Y", on_add_log, [b"38"], 0,
+                                  com_max_messages_per_write)
         self.__recv_com_x_additional_options = 0
         self.__recv_com_y_additional_options = 0
-        self.__sockets = SocketsManager(on_add_log)
+        if socket_backend == "asyncio":
+            self.__sockets = AsyncSocketsManager(on_add_log, socket_queue_max_bytes, socket_queue_max_messages,
+                                                 socket_queue_overflow_policy)
+        else:
+            self.__sockets = SocketsManager(on_add_log, socket_queue_max_bytes, socket_queue_max_messages,
+                                            socket_queue_overflow_policy)
         self.__on_add_log = on_add_log
         self.__is_run = False
         self.__time_interval_break = time_interval_break
@@ -64,74 +139,98 @@ class ConnectionManager:
         self.__history_of_communication_x = []
         self.__number_of_lane = number_of_lane
         self.__on_add_log(2, "CON_INFO", "", "COM_X={}, COM_Y={}".format(com_name_x, com_name_y))
-        self.__list_func_for_analyze_msg_to_send = []
-        self.__list_func_for_analyze_msg_to_recv = []
+        self.__dispatcher_analyze_msg_to_send = OpcodeDispatcher()
+        self.__dispatcher_analyze_msg_to_recv = OpcodeDispatcher()
+        self.__dispatcher_observe_msg_to_send = OpcodeDispatcher()
+        self.__dispatcher_observe_msg_to_recv = OpcodeDispatcher()
+        self.__analyze_worker = AnalyzeWorker(on_add_log, analyze_queue_max_size)
+        self.__stat_forwarding = StageStat()
         self.__check_communication_outgoing_is_enabled = check_communication_outgoing_is_enabled
+        self.__event_driven_loop = event_driven_loop
+        self.__event_loop_max_wait = event_loop_max_wait
+        self.__wake_event = threading.Event()
+        if bad_checksum_policy not in self.LIST_BAD_SUM_POLICY:
+            self.__on_add_log(10, "CON_BAD_POLICY", "", "Nieznana polityka błędnych sum kontrolnych '{}', użyto '{}'"
+                              .format(bad_checksum_policy, self.BAD_SUM_PASS))
+            bad_checksum_policy = self.BAD_SUM_PASS
+        self.__bad_checksum_policy = bad_checksum_policy
+        self.__quarantine = collections.deque(maxlen=self.QUARANTINE_SIZE)
+        self.__percentile_windows = [min(window, ResponseStat.BUFFER_SIZE) for window in lane_stat_percentile_windows]
+        self.__stat_windows = self.__percentile_windows + [self.ADAPTIVE_TIMEOUT_WINDOW]
+        self.__adaptive_timeout = adaptive_timeout
+        self.__adaptive_timeout_factor = adaptive_timeout_factor
+        self.__adaptive_timeout_min = adaptive_timeout_min
+        self.__adaptive_timeout_min_samples = adaptive_timeout_min_samples
+        self.__match_response_with_lane = com_max_messages_per_write > 1
+        self.__pacing = None
+        if adaptive_pacing:
+            self.__pacing = PacingController(number_of_lane, self.TIME_WAIT_BETWEEN_MSG_ON_LANE,
+                                             adaptive_pacing_min_gap, adaptive_pacing_max_gap)
+            for lane_id in range(number_of_lane):
+                self.__set_lane_gap(lane_id, self.__pacing.get_gap(lane_id))
 
         for _ in range(self.__number_of_lane):
             self.__history_of_communication_x.append({
                 "no_answer": 0,
                 "warning_wait": 0,
                 "critical_wait": 0,
-                "left_max": 0,
-                "response_times": []
+                "response_times": ResponseStat(self.__stat_windows),
+                "bad_sum_from_lane": 0,
+                "bad_sum_to_lane": 0
             })
 
     def start(self) -> None:
         """
         This method starts transferring data
 
-        possible value in response_waiting_mode:
-            3 - if the wait is longer than this __warning_response_time then add log CON_WAIT_LONG and set mode 2
-            2 - if the wait is longer than this __critical_response_time then add log CON_WAIT_veryLONG and set mode 1
-            1 v 2 - the wait was long, so when received add log with a late message was received
-            0 - does not wait for a response
+        Every message sent to COM_X waits for response from its lane in PendingResponses (several messages can be
+        written together, so several lanes can be waited for). When the wait is longer than __warning_response_time
+        log CON_WAIT_LONG is added, when longer than __critical_response_time log CON_WAIT_veryLONG, after timeout of
+        lane (see get_response_timeout) log CON_ERROR_WAIT. Next messages are sent to COM_X only when every lane
+        responded or its timeout passed. If only one message is written at once, any response ends waiting.
+
+        In event driven mode COM ports are read by reader threads, which wake up the loop when data arrive, and between
+        passes the loop sleeps until the nearest deadline (next message to send, warning/critical wait time for
+        response, timeout). Otherwise loop sleeps time_interval_break after every pass.
 
         :return: None
         :logs: CON_ERROR_WAIT (10), CON_WAIT_veryLONG (10), CON_WAIT_LONG (7), CON_START (7), CON_WAIT_END (6)
         """
         self.__on_add_log(7, "CON_START", "", "Communication has been started")
 
-        time_next_sending_x = time.time() + 1.5
-        time_last_sending_x = 0
-        last_sent_x = b""
-        response_waiting_mode = 0
+        time_start_sending_x = time.time() + 1.5
+        pending_responses = PendingResponses(self.__warning_response_time, self.__critical_response_time)
 
+        if self.__event_driven_loop:
+            self.__com_x.start_reader_thread(self.__wake_event.set)
+            self.__com_y.start_reader_thread(self.__wake_event.set)
+
+        self.__analyze_worker.start()
         self.__is_run = True
         while self.__is_run:
-            if response_waiting_mode == 3 and time.time() > time_last_sending_x + self.__warning_response_time:
-                self.__on_add_log(7, "CON_WAIT_LONG", "COM_X", "Ostrzegawczo długie oczekiwanie na odpowiedź na: " + str(last_sent_x))
-                self.__count_anomalies_pending_response(last_sent_x, 2)
-                response_waiting_mode = 2
-
-            if response_waiting_mode == 2 and time.time() > time_last_sending_x + self.__critical_response_time:
-                self.__on_add_log(10, "CON_WAIT_veryLONG", "COM_X", "Krytycznie długie oczekiwanie na odpowiedź na: " + str(last_sent_x))
-                self.__count_anomalies_pending_response(last_sent_x, 1)
-                response_waiting_mode = 1
+            for msg, stage, mode in pending_responses.check(time.time(), self.__check_communication_outgoing_is_enabled()):
+                if stage == PendingResponses.STAGE_WARNING:
+                    self.__on_add_log(7, "CON_WAIT_LONG", "COM_X", "Ostrzegawczo długie oczekiwanie na odpowiedź na: " + str(msg))
+                elif stage == PendingResponses.STAGE_CRITICAL:
+                    self.__on_add_log(10, "CON_WAIT_veryLONG", "COM_X", "Krytycznie długie oczekiwanie na odpowiedź na: " + str(msg))
+                else:
+                    self.__on_add_log(10, "CON_ERROR_WAIT", "COM_X", "Oczekiwanie na tyle długie, że zostanie wysłana nowa wiadomość. Ostatnio wysłana: " + str(msg))
+                self.__count_anomalies_pending_response(msg, stage, mode)
 
-            recv_bytes_x, recv_msg_x = self.__com_reader(self.__com_x, self.__com_y, self.__sockets, self.__recv_com_x_additional_options, self.__list_func_for_analyze_msg_to_recv)
+            recv_bytes_x, recv_msg_x = self.__com_reader(self.__com_x, self.__com_y, self.__sockets, self.__recv_com_x_additional_options, self.__dispatcher_analyze_msg_to_recv, self.__dispatcher_observe_msg_to_recv, True)
             if recv_bytes_x > 0:
-                if response_waiting_mode in [1, 2]:
-                    self.__on_add_log(6, "CON_WAIT_END", "COM_X", "Przyszła odpowiedź na: " + str(last_sent_x))
-                self.__analysis_of_responses(last_sent_x, recv_msg_x, time_last_sending_x)
-                time_next_sending_x = 0
-                response_waiting_mode = 0
+                self.__analysis_of_responses(pending_responses, recv_msg_x)
 
-            self.__com_reader(self.__com_y, self.__com_x, self.__sockets, self.__recv_com_y_additional_options, self.__list_func_for_analyze_msg_to_send)
+            self.__com_reader(self.__com_y, self.__com_x, self.__sockets, self.__recv_com_y_additional_options, self.__dispatcher_analyze_msg_to_send, self.__dispatcher_observe_msg_to_send, False)
             self.__com_y.send()
 
-            if self.__check_communication_outgoing_is_enabled() and time.time() >= time_next_sending_x:
-                if time_next_sending_x > 0 and last_sent_x != b"":
-                    self.__on_add_log(10, "CON_ERROR_WAIT", "COM_X", "Oczekiwanie na tyle długie, że zostanie wysłana nowa wiadomość. Ostatnio wysłana: " + str(last_sent_x))
-                    time_next_sending_x = 0
-                    self.__count_anomalies_pending_response(last_sent_x, 0)
+            if self.__check_communication_outgoing_is_enabled() and not pending_responses.is_waiting() and \
+                    time.time() >= time_start_sending_x:
                 sent_bytes_x, sent_msg_x = self.__com_x.send()
-
                 if sent_bytes_x > 0:
-                    time_next_sending_x = time.time() + self.__max_waiting_time_for_response
-                    time_last_sending_x = time.time()
-                    last_sent_x = sent_msg_x
-                    response_waiting_mode = 3
+                    time_send = time.time()
+                    for msg in self.__split_messages(sent_msg_x):
+                        pending_responses.add(self.__get_lane_id(msg, 1), msg, time_send, self.get_response_timeout(msg))
 
             enable_send_to_socket = self.__check_communication_outgoing_is_enabled()
             bytes_to_send_to_com_x = self.__sockets.communications(enable_send_to_socket)
@@ -140,7 +239,45 @@ class ConnectionManager:
                 # TODO
                 self.__on_add_log(10, "TODO_1", "", "Give msg from socket to com_x")
                 # self.__com_x.add_bytes_to_send(bytes_to_send_to_com_x)
-            time.sleep(self.__time_interval_break)
+
+            if self.__event_driven_loop:
+                self.__wake_event.wait(self.__get_time_to_next_event(pending_responses, time_start_sending_x))
+                self.__wake_event.clear()
+            else:
+                time.sleep(self.__time_interval_break)
+
+    def __get_time_to_next_event(self, pending_responses: PendingResponses, time_start_sending_x: float) -> float:
+        """
+        This method calculates how long the event driven loop can sleep, if no data will be received.
+
+        :param pending_responses: <PendingResponses> messages sent to COM_X waiting for response
+        :param time_start_sending_x: <float> time before which messages to COM_X aren't sent
+        :return: <float> time in seconds, maximum self.__event_loop_max_wait
+        """
+        time_now = time.time()
+        list_deadline = [time_now + self.__event_loop_max_wait]
+        is_outgoing_enabled = self.__check_communication_outgoing_is_enabled()
+        deadline = pending_responses.get_next_deadline(is_outgoing_enabled)
+        if deadline is not None:
+            list_deadline.append(deadline)
+
+        time_to_send_y = self.__com_y.get_time_to_next_send()
+        if time_to_send_y is not None:
+            list_deadline.append(time_now + time_to_send_y)
+
+        if is_outgoing_enabled and not pending_responses.is_waiting():
+            time_to_send_x = self.__com_x.get_time_to_next_send()
+            if time_to_send_x is not None:
+                list_deadline.append(max(time_start_sending_x, time_now + time_to_send_x))
+
+        return max(0, min(list_deadline) - time_now)
+
+    def wake(self) -> None:
+        """
+        This method wakes up the event driven loop, e.g. after adding new message to send
+        :return: None
+        """
+        self.__wake_event.set()
 
     def stop(self) -> None:
         """
@@ -150,6 +287,8 @@ class ConnectionManager:
         """
         self.__on_add_log(7, "CON_STOP", "", "Communication has been stopped")
         self.__is_run = False
+        self.__wake_event.set()
+        self.__analyze_worker.stop()
 
     def close(self) -> None:
         """
@@ -161,11 +300,13 @@ class ConnectionManager:
         self.__com_x.close()
         self.__com_y.close()
         self.__sockets.close()
+        self.__analyze_worker.stop()
 
     def get_info(self) -> List[List[str]]:
         """
         This method returned info about connection
-        :return: list[list[name port: str, number recv communicates: str, number recv data: str]]
+        :return: list[list[name port: str, number recv communicates: str, number recv data: str,
+                           number waiting messages: str, number duplicates: str, number dropped messages: str]]
         """
         com_info = []
         for com in [self.__com_x, self.__com_y]:
@@ -175,12 +316,43 @@ class ConnectionManager:
                     str(com.get_number_received_communicates()),
                     str(com.get_number_received_bytes()),
                     str(com.get_number_of_waiting_messages_to_send()),
-                    str(com.get_number_of_duplicates())
+                    str(com.get_number_of_duplicates()),
+                    "0"
                 ]
             )
         return com_info + self.__sockets.get_info()
 
-    def __com_reader(self, com_in: ComManager, com_out: ComManager, sockets: SocketsManager, additional_options: int, list_func_for_analyze_msg) -> (int, bytes):
+    def get_pipeline_info(self) -> List[List[str]]:
+        """
+        This method returns statistics of communication stages: forwarding (from read of COM port to adding messages to
+        queues of COM ports and sockets, analyzers which can change messages are called here) and observing (functions
+        which only observe messages, they are called in AnalyzeWorker thread)
+
+        :return: list[list[name of stage: str, number of messages: str, number waiting messages: str,
+                           number dropped messages: str, average time in ms: str, max time in ms: str]]
+        """
+        stat_wait = self.__analyze_worker.get_stat_wait()
+        stat_run = self.__analyze_worker.get_stat_run()
+        return [
+            [
+                "Przekazywanie",
+                str(self.__stat_forwarding.get_number()),
+                "0",
+                "0",
+                "{:.1f}".format(self.__stat_forwarding.get_avg_time() * 1000),
+                "{:.1f}".format(self.__stat_forwarding.get_max_time() * 1000)
+            ],
+            [
+                "Analiza",
+                str(stat_run.get_number()),
+                str(self.__analyze_worker.get_number_of_waiting_messages()),
+                str(self.__analyze_worker.get_number_dropped_messages()),
+                "{:.1f}".format((stat_wait.get_avg_time() + stat_run.get_avg_time()) * 1000),
+                "{:.1f}".format((stat_wait.get_max_time() + stat_run.get_max_time()) * 1000)
+            ]
+        ]
+
+    def __com_reader(self, com_in: ComManager, com_out: ComManager, sockets: Union[SocketsManager, AsyncSocketsManager], additional_options: int, dispatcher_analyze_msg: OpcodeDispatcher, dispatcher_observe_msg: OpcodeDispatcher, is_from_lane: bool) -> (int, bytes):
         """
         This method reads data from the "com_in" port. It then adds the read data to the queue with data to be sent in
         'com_out' and sockets queue.
@@ -189,42 +361,92 @@ class ConnectionManager:
         :param com_out: <ComManager> with COM port where this func will add read data to the queue with data to be sent
         :param sockets <SocketManager> obj to management socket connection
         :param additional_options <int> options used to edit message on fly
-        :param list_func_for_analyze_msg: list[func] TODO
+        :param dispatcher_analyze_msg: <OpcodeDispatcher> functions which can change received messages, see __analyze_msg
+        :param dispatcher_observe_msg: <OpcodeDispatcher> functions called with received messages in AnalyzeWorker
+                                       thread, their results are ignored
+        :param is_from_lane: <bool> True - com_in is connected to lanes, False - com_in is connected to computer
+                             application, so messages go to lanes
 
-        :return: <int, bytes> The number of data bytes received or -1 if there was an error, received bytes
-        :logs: CON_READ_ERROR (10)
+        :return: <int, bytes> The number of accepted bytes or -1 if there was an error, accepted messages (messages
+                 with bad control sum removed or put in quarantine aren't there, so they aren't taken as responses)
+        :logs: CON_READ_ERROR (10), CON_BAD_SUM (8)
         """
         try:
-            received_bytes = com_in.read()
-            if received_bytes == b"":
+            list_frames = com_in.read_frames()
+            if len(list_frames) == 0:
                 return 0, b""
 
-            received_bytes = self.__edit_message_on_the_fly(additional_options, received_bytes)
-            socket_msg = b""
-            received_bytes_from_in = received_bytes
-            while b"\r" in received_bytes:
-                index_first_special_sign = received_bytes.index(b"\r") + 1
-                msg = received_bytes[:index_first_special_sign]
-                received_bytes = received_bytes[index_first_special_sign:]
-
-                com_in_front, com_in_end, com_out_front, com_out_end = self.__analyze_msg(msg, list_func_for_analyze_msg)
+            time_start = time.time()
+            list_frames = self.__edit_message_on_the_fly(additional_options, list_frames)
+            list_socket_msg = []
+            list_accepted = []
+            for msg in list_frames:
+                if not is_message_control_sum_valid(msg):
+                    self.__count_bad_checksum(com_in, msg, is_from_lane)
+                    if self.__bad_checksum_policy == self.BAD_SUM_DROP:
+                        continue
+                    if self.__bad_checksum_policy == self.BAD_SUM_QUARANTINE:
+                        self.__quarantine.append((com_in.get_alias(), msg))
+                        com_out.add_msg_to_send([], [{"message": msg, "time_wait": -1, "priority": 3}])
+                        continue
+                list_accepted.append(msg)
+                list_func_to_analyze = dispatcher_analyze_msg.get_funcs(msg)
+                list_func_to_observe = dispatcher_observe_msg.get_funcs(msg)
+                if len(list_func_to_analyze) == 0 and len(list_func_to_observe) == 0:
+                    com_in_front, com_in_end, com_out_front = [], [], []
+                    com_out_end = [{"message": msg, "time_wait": -1, "priority": 3}]
+                else:
+                    lane_msg = LaneMessage(msg, is_from_lane)
+                    self.__analyze_worker.put(list_func_to_observe, lane_msg)
+                    com_in_front, com_in_end, com_out_front, com_out_end = self.__analyze_msg(lane_msg, list_func_to_analyze)
 
                 com_in.add_msg_to_send(com_in_front, com_in_end)
                 com_out.add_msg_to_send(com_out_front, com_out_end)
 
-                # TODO optymalize
-
                 for m in com_in_front + com_out_front + com_in_end + com_out_end:
-                    socket_msg += m["message"]
-                sockets.add_bytes_to_send(socket_msg)
-            return len(received_bytes_from_in), received_bytes_from_in
+                    list_socket_msg.append(m["message"])
+            if len(list_socket_msg) > 0:
+                sockets.add_bytes_to_send(b"".join(list_socket_msg))
+            self.__stat_forwarding.add(time.time() - time_start)
+            accepted_bytes = b"".join(list_accepted)
+            return len(accepted_bytes), accepted_bytes
         except (serial.SerialException, serial.SerialTimeoutException) as e:
             self.__on_add_log(10, "CON_READ_ERROR", com_in.get_alias(), e)
             return -1, b""
 
-    def  __analyze_msg(self, message, list_func_to_analyze):
+    def __count_bad_checksum(self, com_in: ComManager, msg: bytes, is_from_lane: bool) -> None:
+        """
+        This method counts message with bad control sum in statistic of lane, which sent it or which is addressee
+
+        :param com_in: <ComManager> port from which message was read
+        :param msg: <bytes> message with bad control sum
+        :param is_from_lane: <bool> True - message from lane, False - message to lane
+        :return: None
+        :logs: CON_BAD_SUM (8)
+        """
+        self.__on_add_log(8, "CON_BAD_SUM", com_in.get_alias(), "Błędna suma kontrolna ({}): {}"
+                          .format(self.__bad_checksum_policy, msg))
+        lane_id = LaneMessage(msg, is_from_lane).lane
+        if lane_id is None or lane_id >= self.__number_of_lane:
+            return
+        if is_from_lane:
+            self.__history_of_communication_x[lane_id]["bad_sum_from_lane"] += 1
+        else:
+            self.__history_of_communication_x[lane_id]["bad_sum_to_lane"] += 1
+
+    def get_quarantined_messages(self) -> list:
+        """
+        :return: <list[(str, bytes)]> the last messages with bad control sum (alias of COM port, message), which were
+                 put in quarantine
+        """
+        return list(self.__quarantine)
+
+    def  __analyze_msg(self, message: LaneMessage, list_func_to_analyze):
         """
         TODO
+
+        :param message: <LaneMessage> message parsed once and given to every function
+        :param list_func_to_analyze: list[func(LaneMessage)]
         """
 
         for func in list_func_to_analyze:
@@ -233,7 +455,7 @@ class ConnectionManager:
                 continue
             if isinstance(result, bytes):
                 self.__on_add_log(5, "CON_ANA_MSG_REPLACE", "", "{} -> {}".format(message, result))
-                message = result
+                message = LaneMessage(result, message.is_from_lane)
             elif isinstance(result, tuple):
                 if len(result) != 4:
                     self.__on_add_log(10, "CON_ANA_MSG_1", "", result)
@@ -248,10 +470,10 @@ class ConnectionManager:
                 self.__on_add_log(10, "CON_ANA_MSG_3", "", result)
             else:
                 self.__on_add_log(10, "CON_ANA_MSG_4", "", result)
-        msg_obj = {"message": message, "time_wait": -1, "priority": 3}
+        msg_obj = {"message": message.raw, "time_wait": -1, "priority": 3}
         return [], [], [], [msg_obj]
 
-    def __edit_message_on_the_fly(self, options: int, messages: bytes) -> bytes:
+    def __edit_message_on_the_fly(self, options: int, messages: list) -> list:
         """
         NOT USED
         Method is used to swap message data on the fly if certain conditions occur
@@ -262,69 +484,121 @@ class ConnectionManager:
             <empty>
 
         :param options: <int> options
-        :param messages: <bytes> message/messages to edit
-        :return: <bytes> message/messags after edit
+        :param messages: <list[bytes]> messages to edit, every message is ended with '\r'
+        :return: <list[bytes]> messages after edit
         :logs: CON_REPLACE (7)
         """
         if options == 0:
             return messages
-        return_messages = b""
-        for message in messages.split(b"\r")[:-1]:
+        return_messages = []
+        for message in messages:
+            message = message[:-1]
             message_old = message
             # if options & 1 and message[4:6] == b"IG" and len(message) == 27: #PRINT_ON
             #     head = message[:-2]
             #     head_new = head[:24] + bytes([head[24] | 0b00000001]) + head[25:]
             #     if head_new != head:
-            #         message_new = head_new + self.__calculate_control_sum(head_new) + b"\r"
+            #         message_new = head_new + calculate_message_control_sum(head_new) + b"\r"
             #         self.__on_add_log(7, "CON_REPLACE", "", "Wiadomość {} zostałą zamianiona na {}".format(message, message_new))
             #         message = message_new
             if message_old != message:
                 self.__on_add_log(7, "CON_REPLACE", "", "Wiadomość {} zostałą zamianiona na {}".format(message_old, message))
-            return_messages += message + b"\r"
+            return_messages.append(message + b"\r")
         return return_messages
 
-    @staticmethod
-    def __calculate_control_sum(message_head: bytes) -> bytes:
-        sum_ascii = 0
-        for x in message_head:
-            sum_ascii += x
-        checksum = bytes(hex(sum_ascii).split("x")[-1].upper()[-2:], 'utf-8')
-        return checksum
-
-    def __analysis_of_responses(self, msg_to: bytes, msg_from: bytes, time_send: float) -> None:
+    def __analysis_of_responses(self, pending_responses: PendingResponses, msg_from: bytes) -> None:
         """
-        The main task of the function is to add to history_of_communication_x the time to wait for a response
+        The main task of the function is to add to history_of_communication_x the time to wait for a response. If
+        several messages can be written together (com_max_messages_per_write > 1), every response is matched with the
+        oldest message sent to the same lane, which waits for response. Otherwise only one message waits for response
+        and any response ends waiting for it, like response from other lane, which is only logged.
 
-        :param msg_to: <bytes> message to lane
-        :param msg_from: <bytes> message from lane
-        :param time_send: <float>
+        :param pending_responses: <PendingResponses> messages waiting for response, key is lane index (None - message
+                                  isn't to lane, any response ends waiting for it)
+        :param msg_from: <bytes> message from lane (several messages, if several messages were sent)
         :return: None
+        :logs: CON_ANLS_ERROR_1 (10), CON_ANLS_ERROR_2 (10), CON_WAIT_END (6)
         """
-        if msg_from.count(b"\r") > 1:
-            self.__on_add_log(10, "CON_ANLS_ERROR_1", "", "Przyszło kilka odpowiedzi ({}) po wiadomości {}".format(msg_from, msg_to))
-            return
-
-        if len(msg_to) < 2 or len(msg_from) < 4:
-            return
-        try:
-            msg_to_addressee = int(msg_to[1:2])
-            msg_from_sender = int(msg_from[3:4])
-            if msg_to_addressee >= self.__number_of_lane or msg_from_sender >= self.__number_of_lane:
+        time_now = time.time()
+        if not self.__match_response_with_lane:
+            item = pending_responses.pop_oldest()
+            if item is None:
+                return
+            msg_to, time_send, _, mode = item
+            if mode in [1, 2]:
+                self.__on_add_log(6, "CON_WAIT_END", "COM_X", "Przyszła odpowiedź na: " + str(msg_to))
+            if msg_from.count(b"\r") > 1:
+                self.__on_add_log(10, "CON_ANLS_ERROR_1", "", "Przyszło kilka odpowiedzi ({}) po wiadomości {}".format(msg_from, msg_to))
+                return
+            addressee, sender = self.__get_lane_id(msg_to, 1), self.__get_lane_id(msg_from, 3)
+            if addressee is None or sender is None:
                 return
-            if msg_to_addressee != msg_from_sender:
+            if addressee != sender:
                 self.__on_add_log(10, "CON_ANLS_ERROR_2", "", "Odpowiedź od innego toru: po wiadomości {} przyszła odpowiedź {}".format(msg_to, msg_from))
                 return
-            delta_time = int((time.time() - time_send) * 1000)
-            self.__history_of_communication_x[msg_to_addressee]["response_times"].append(delta_time)
-        except ValueError:
+            self.__add_response_time(sender, int((time_now - time_send) * 1000))
             return
 
-    def __count_anomalies_pending_response(self, msg: bytes, stage: int) -> None:
+        list_sender = []
+        for frame in self.__split_messages(msg_from):
+            sender = self.__get_lane_id(frame, 3)
+            item = pending_responses.pop(sender)
+            if item is None and sender is not None:
+                item = pending_responses.pop(None)
+            if item is None:
+                if sender is not None and sender in list_sender:
+                    self.__on_add_log(10, "CON_ANLS_ERROR_1", "", "Przyszło kilka odpowiedzi od toru {}: {}".format(sender, msg_from))
+                elif pending_responses.is_waiting():
+                    self.__on_add_log(10, "CON_ANLS_ERROR_2", "", "Odpowiedź od toru, który nie ma wiadomości czekającej na odpowiedź: {}".format(frame))
+                continue
+            list_sender.append(sender)
+            msg_to, time_send, _, mode = item
+            if mode in [1, 2]:
+                self.__on_add_log(6, "CON_WAIT_END", "COM_X", "Przyszła odpowiedź na: " + str(msg_to))
+            if sender is None or self.__get_lane_id(msg_to, 1) != sender:
+                continue
+            self.__add_response_time(sender, int((time_now - time_send) * 1000))
+
+    def __add_response_time(self, lane_id: int, delta_time: int) -> None:
         """
-        Function increments the corresponding values in anomaly statistics
+        :param lane_id: <int> lane index
+        :param delta_time: <int> time in ms from sending message to lane to its response
+        :return: None
+        """
+        self.__history_of_communication_x[lane_id]["response_times"].add(delta_time)
+        if self.__pacing is not None:
+            self.__set_lane_gap(lane_id, self.__pacing.on_response(lane_id, delta_time))
+
+    def __get_lane_id(self, msg: bytes, index: int) -> Union[int, None]:
+        """
+        :param msg: <bytes> message
+        :param index: <int> position of lane number, 1 - in message to lane, 3 - in message from lane
+        :return: <int | None> lane index, None - there isn't correct lane number
+        """
+        try:
+            lane_id = int(msg[index:index + 1])
+        except ValueError:
+            return None
+        if lane_id >= self.__number_of_lane:
+            return None
+        return lane_id
+
+    @staticmethod
+    def __split_messages(data: bytes) -> List[bytes]:
+        """
+        :param data: <bytes> messages written or read together, every is ended with '\r'
+        :return: <list[bytes]> messages with '\r'
+        """
+        return [msg + b"\r" for msg in data.split(b"\r")[:-1]]
+
+    def __count_anomalies_pending_response(self, msg: bytes, stage: int, mode: int) -> None:
+        """
+        Function increments the corresponding values in anomaly statistics. Gap of lane (adaptive pacing) is increased
+        once for message: after critical waiting time, or after time out, if message didn't wait critically long
 
         :param msg: <bytes> message for which we (are waiting) / (have finished waiting)
         :param stage: <int> 0 - time out (waiting end), 1 - critical waiting time, 2 - warning waiting time
+        :param mode: <int> mode of message in PendingResponses after this stage, 1 - message waited critically long
         :return: None
         """
         if len(msg) < 2:
@@ -343,9 +617,27 @@ class ConnectionManager:
                     self.__history_of_communication_x[addressee]["warning_wait"] -= 1
             else:
                 self.__history_of_communication_x[addressee]["warning_wait"] += 1
+            if self.__pacing is not None and (stage == 1 or (stage == 0 and mode != 1)):
+                self.__set_lane_gap(addressee, self.__pacing.on_missing_response(addressee))
         except ValueError:
             return
 
+    def __set_lane_gap(self, lane_id: int, gap: int) -> None:
+        """
+        This method sets time between messages sent to lane in bucket of lane in COM_X
+
+        :param lane_id: <int> index of lane
+        :param gap: <int> time in ms
+        :return: None
+        """
+        self.__com_x.set_time_wait_between_msg_on_bucket(self.__list_lane_recipient[lane_id], gap)
+
+    def get_lane_gaps(self) -> List[int]:
+        """
+        :return: <list[int]> for every lane current time in ms between messages sent to this lane
+        """
+        return [self.__com_x.get_time_wait_between_msg_on_bucket(recipient) for recipient in self.__list_lane_recipient]
+
     def on_clear_sockets_queue(self) -> int:
         """
         This method clear queue with unsent data has been cleared
@@ -384,28 +676,82 @@ class ConnectionManager:
         return self.__sockets.get_list_ip()
 
     def get_lane_response_stat(self):
+        """
+        :return: list[list[number of responses, avg of last 50, avg of 100-51 last, avg of last 250, avg of last 1000,
+                           avg of all, max, warnings, critical waits, no answers, bad sums from lane, bad sums to lane,
+                           p50, p90, p95, p99]]
+                 for every lane, averages and percentiles are "" if there aren't enough responses, percentiles are
+                 from the first window of lane_stat_percentile_windows
+        """
         data = []
         for i, lane_stat in enumerate(self.__history_of_communication_x):
-            list_all = lane_stat["response_times"]
-            data_lane = [len(list_all)]
-            for n in [50, [100, 50], 250, 1000, len(list_all)]:
-                left = n[0] if isinstance(n, list) else n
-                right = n[1] if isinstance(n, list) else 0
-                l = list_all[-left:-right] if right > 0 else list_all[-left:]
-                if len(list_all) <= right:
-                    data_lane.append("")
-                elif len(l) == 0:
-                    data_lane.append(0)
-                else:
-                    data_lane.append(int(sum(l) / len(l)))
-            list_max = list_all[lane_stat["left_max"]:]
-            max_wait = 0 if len(list_max) == 0 else max(list_max)
-            data_lane.extend([max_wait, lane_stat["warning_wait"], lane_stat["critical_wait"], lane_stat["no_answer"]])
+            response_stat = lane_stat["response_times"]
+            data_lane = [response_stat.get_number()]
+            if response_stat.get_number() == 0:
+                data_lane.extend(["", "", "", "", ""])
+            else:
+                data_lane.extend([
+                    response_stat.get_avg_last(50),
+                    response_stat.get_avg_between(50, 100),
+                    response_stat.get_avg_last(250),
+                    response_stat.get_avg_last(1000),
+                    response_stat.get_avg_all()
+                ])
+            data_lane.extend([response_stat.get_max(), lane_stat["warning_wait"], lane_stat["critical_wait"], lane_stat["no_answer"],
+                              lane_stat["bad_sum_from_lane"], lane_stat["bad_sum_to_lane"]])
+            if len(self.__percentile_windows) > 0:
+                list_value = response_stat.get_percentiles(self.__percentile_windows[0], self.LIST_PERCENTILE)
+                data_lane.extend(list_value if len(list_value) > 0 else ["" for _ in self.LIST_PERCENTILE])
+            data.append(data_lane)
+        return data
+
+    def get_response_timeout(self, msg_to: bytes) -> float:
+        """
+        This method returns how long to wait for response on message to lane, before sending next message
+
+        :param msg_to: <bytes> message sent to lane
+        :return: <float> time in seconds, max_waiting_time_for_response if adaptive timeout is disabled or lane has less
+                 than adaptive_timeout_min_samples responses
+        """
+        if not self.__adaptive_timeout:
+            return self.__max_waiting_time_for_response
+        lane_id = LaneMessage(msg_to, False).lane
+        if lane_id is None or lane_id >= self.__number_of_lane:
+            return self.__max_waiting_time_for_response
+        response_stat = self.__history_of_communication_x[lane_id]["response_times"]
+        if response_stat.get_number() < self.__adaptive_timeout_min_samples:
+            return self.__max_waiting_time_for_response
+        p99 = response_stat.get_percentiles(self.ADAPTIVE_TIMEOUT_WINDOW, [99])[0] / 1000
+        return min(max(p99 * self.__adaptive_timeout_factor, self.__adaptive_timeout_min),
+                   self.__max_waiting_time_for_response)
+
+    def get_lane_response_percentiles(self) -> list:
+        """
+        This method returns percentiles of response times of every lane for every window of
+        lane_stat_percentile_windows, e.g. to export them
+
+        :return: list[dict[window: int, dict[str, int]]] for every lane: window -> {"number": number of responses,
+                 "p50": .., "p90": .., "p95": .., "p99": .., "max": ..}, times are in ms (about 3% precision), without
+                 percentiles if there is no response
+        """
+        data = []
+        for lane_stat in self.__history_of_communication_x:
+            response_stat = lane_stat["response_times"]
+            data_lane = {}
+            for window in self.__percentile_windows:
+                number = response_stat.get_number() if window == 0 else min(window, response_stat.get_number())
+                data_window = {"number": number}
+                list_value = response_stat.get_percentiles(window, self.LIST_PERCENTILE + [100])
+                if len(list_value) > 0:
+                    for percentile, value in zip(self.LIST_PERCENTILE, list_value):
+                        data_window["p{}".format(percentile)] = value
+                    data_window["max"] = list_value[-1]
+                data_lane[window] = data_window
             data.append(data_lane)
         return data
 
     def add_message_to_x(self, head_message: bytes, front: bool, priority: int, time_wait: int):
-        message = head_message + self.__calculate_control_sum(head_message) + b"\r"
+        message = prepare_message(head_message)
         self.__on_add_log(5, "CON_USERMSG", "", "Wiadomość dodana przez użytkowanika {}".format(message))
         msg_obj = {"message": message, "time_wait": time_wait, "priority": priority}
         if front:
@@ -413,6 +759,7 @@ class ConnectionManager:
         else:
             self.__com_x.add_msg_to_send([], [msg_obj])
         self.__sockets.add_bytes_to_send(message)
+        self.__wake_event.set()
 
     def clear_lane_stat(self, clear_type: str) -> None:
         """
@@ -421,27 +768,61 @@ class ConnectionManager:
         """
         if clear_type == "Max":
             for lane_stat in self.__history_of_communication_x:
-                lane_stat["left_max"] = len(lane_stat["response_times"])
+                lane_stat["response_times"].clear_max()
         if clear_type == "Warn":
             for lane_stat in self.__history_of_communication_x:
                 lane_stat["warning_wait"] = 0
                 lane_stat["critical_wait"] = 0
                 lane_stat["no_answer"] = 0
+                lane_stat["bad_sum_from_lane"] = 0
+                lane_stat["bad_sum_to_lane"] = 0
         if clear_type == "All":
+            if self.__pacing is not None:
+                self.__pacing.clear()
+                for lane_id in range(self.__number_of_lane):
+                    self.__set_lane_gap(lane_id, self.__pacing.get_gap(lane_id))
             for i in range(len(self.__history_of_communication_x)):
                 self.__history_of_communication_x[i] = {
                     "no_answer": 0,
                     "warning_wait": 0,
                     "critical_wait": 0,
-                    "left_max": 0,
-                    "response_times": []
+                    "response_times": ResponseStat(self.__stat_windows),
+                    "bad_sum_from_lane": 0,
+                    "bad_sum_to_lane": 0
                 }
 
-    def add_func_for_analyze_msg_to_recv(self, func):
+    def add_func_for_analyze_msg_to_recv(self, func, list_opcode=None):
         """
         TODO: rename add_func_for_analyze_msg_from_lane
+
+        :param func: <func(LaneMessage)> function to analyze message from lane, see __analyze_msg
+        :param list_opcode: <list[bytes] | None> types of messages handled by func (e.g. [b"i0", b"w"]), other messages
+                            aren't given to func, None - every message
+        """
+        self.__dispatcher_analyze_msg_to_recv.add(func, list_opcode)
+
+    def add_func_for_analyze_msg_to_lane(self, func, list_opcode=None):
+        """
+        :param func: <func(LaneMessage)> function to analyze message to lane, see __analyze_msg
+        :param list_opcode: <list[bytes] | None> like in add_func_for_analyze_msg_to_recv
+        """
+        self.__dispatcher_analyze_msg_to_send.add(func, list_opcode)
+
+    def add_func_for_observe_msg_from_lane(self, func, list_opcode=None):
         """
-        self.__list_func_for_analyze_msg_to_recv.append(func)
+        Function is called with every message from lane in AnalyzeWorker thread, independently of forwarding, so it
+        can't change message, but it can be slow (e.g. copy files)
 
-    def add_func_for_analyze_msg_to_lane(self, func):
-        self.__list_func_for_analyze_msg_to_send.append(func)
+        :param func: <func(LaneMessage)> function, its result is ignored
+        :param list_opcode: <list[bytes] | None> like in add_func_for_analyze_msg_to_recv
+        """
+        self.__dispatcher_observe_msg_to_recv.add(func, list_opcode)
+
+    def add_func_for_observe_msg_to_lane(self, func, list_opcode=None):
+        """
+        Like add_func_for_observe_msg_from_lane, but for messages to lane
+
+        :param func: <func(LaneMessage)> function, its result is ignored
+        :param list_opcode: <list[bytes] | None> like in add_func_for_analyze_msg_to_recv
+        """
+        self.__dispatcher_observe_msg_to_send.add(func, list_opcode)
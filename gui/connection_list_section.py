@@ -0,0 +1,68 @@
+from PyQt5.QtWidgets import QGroupBox, QLabel, QVBoxLayout
+
+
+class ConnectionListSection(QGroupBox):
+    """
+        This class shows list of COM ports, socket clients and stages of communication with their counters. Labels are
+        created once and only text of changed rows is set, labels are added or removed only when number of rows
+        changes (e.g. socket client was connected).
+    """
+    def __init__(self):
+        """
+        self.__labels - <list[QLabel]> label for every row
+        self.__texts - <list[str]> text of every label, to compare without reading label
+        """
+        super().__init__("Komunikacja")
+        self.__layout = QVBoxLayout()
+        self.setLayout(self.__layout)
+        self.__labels = []
+        self.__texts = []
+
+    def update_list(self, list_info: list, list_pipeline_info: list) -> None:
+        """
+        :param list_info: <list[list[str]]> rows from ConnectionManager.get_info
+        :param list_pipeline_info: <list[list[str]]> rows from ConnectionManager.get_pipeline_info
+        :return: None
+        """
+        list_text = [self.__get_text_of_connection(*info) for info in list_info]
+        list_text += [self.__get_text_of_stage(*info) for info in list_pipeline_info]
+
+        for i, text in enumerate(list_text):
+            if i == len(self.__labels):
+                label = QLabel(text)
+                self.__layout.addWidget(label)
+                self.__labels.append(label)
+                self.__texts.append(text)
+            elif self.__texts[i] != text:
+                self.__labels[i].setText(text)
+                self.__texts[i] = text
+
+        while len(self.__labels) > len(list_text):
+            label = self.__labels.pop()
+            self.__texts.pop()
+            self.__layout.removeWidget(label)
+            label.deleteLater()
+
+    @staticmethod
+    def __get_text_of_connection(name: str, rec_communicates: str, rec_bytes: str, waiting_messages: str,
+                                 duplicates: str, dropped_messages: str) -> str:
+        rec = ""
+        if rec_communicates != "0" or rec_bytes != "0":
+            rec = " ( " + rec_communicates + " | " + rec_bytes + " B )"
+        if waiting_messages != "0":
+            rec += " | ( " + waiting_messages + " w kolejce )"
+        if duplicates != "0":
+            rec += " | ( " + duplicates + " duplikatów )"
+        if dropped_messages != "0":
+            rec += " | ( " + dropped_messages + " utraconych )"
+        return name + rec
+
+    @staticmethod
+    def __get_text_of_stage(name: str, number_messages: str, waiting_messages: str, dropped_messages: str,
+                            avg_time: str, max_time: str) -> str:
+        rec = " ( " + number_messages + " | śr. " + avg_time + " ms | maks. " + max_time + " ms )"
+        if waiting_messages != "0":
+            rec += " | ( " + waiting_messages + " w kolejce )"
+        if dropped_messages != "0":
+            rec += " | ( " + dropped_messages + " utraconych )"
+        return name + rec
@@ -0,0 +1,75 @@
+from collections import deque, OrderedDict
+
+from PyQt5.QtCore import QTimer
+
+
+class GuiEventBus:
+    """
+        This class passes changes of widgets from threads of communication to GUI thread. Analyzers change only own
+        state and post function which updates widget (e.g. label.setText), the function is called later by QTimer in
+        GUI thread, so threads of communication never touch Qt objects and never wait for GUI.
+
+        Posted functions wait in deque, append and popleft are atomic, so no lock is needed. All waiting functions are
+        called together once per frame (FRAME_INTERVAL_MS). Functions with the same key are coalesced, only the last
+        one is called, by default key is the function, e.g. many label.setText in one frame set text only once.
+
+        Logs:
+            GUI_BUS_ERROR - 10 - Posted function raised exception
+    """
+    FRAME_INTERVAL_MS = 40
+
+    def __init__(self, parent, interval_ms: int = FRAME_INTERVAL_MS):
+        """
+        :param parent: <QObject> parent of timer, it must live in GUI thread
+        :param interval_ms: <int> time between calling of posted functions
+
+        self.__events - <deque[tuple(key, func, tuple)]> posted functions with arguments in order of posting
+        self.__on_add_log - <func(int, str, str, str)> function to add log
+        """
+        self.__events = deque()
+        self.__on_add_log = lambda a, b, c, d: None
+        self.__timer = QTimer(parent)
+        self.__timer.timeout.connect(self.drain)
+        self.__timer.start(interval_ms)
+
+    def set_on_add_log(self, on_add_log) -> None:
+        """
+        :param on_add_log: <func(int, str, str, str)> function to add log
+        :return: None
+        """
+        self.__on_add_log = on_add_log
+
+    def post(self, func, *args, key=None) -> None:
+        """
+        This method can be called from any thread, it never blocks
+
+        :param func: <func> function called in GUI thread with args
+        :param args: <any> arguments of func
+        :param key: <any | None> hashable key of coalescing, None - func is the key
+        :return: None
+        """
+        self.__events.append((func if key is None else key, func, args))
+
+    def drain(self) -> int:
+        """
+        This method must be called in GUI thread, it calls all waiting functions, only the last function with the
+        same key is called, functions are called in order of their last posting
+
+        :return: <int> number of called functions
+        :logs: GUI_BUS_ERROR (10)
+        """
+        events = OrderedDict()
+        while True:
+            try:
+                key, func, args = self.__events.popleft()
+            except IndexError:
+                break
+            events.pop(key, None)
+            events[key] = (func, args)
+
+        for func, args in events.values():
+            try:
+                func(*args)
+            except Exception as e:
+                self.__on_add_log(10, "GUI_BUS_ERROR", "", "{}: {}".format(type(e).__name__, e))
+        return len(events)
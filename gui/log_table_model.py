@@ -0,0 +1,76 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QBrush, QColor
+
+from utils.log_rows import LogRows
+
+
+class LogTableModel(LogRows, QAbstractTableModel):
+    """
+        This class shows rows of LogRows in the log table. LogRows inserts new logs at the top and removes rows which
+        fall out of the table, its hooks tell the view about it, so the view repaints only changed rows. Style of rows
+        is given by data roles.
+    """
+    HEADERS = ["Id", "Data", "Priorytet", "Kod", "Port", "Wiadomość"]
+    BRUSH_ERROR = QBrush(QColor(255, 100, 100))
+    BRUSH_IMPORTANT = QBrush(QColor(255, 255, 225))
+
+    def __init__(self, number_logs: int = 250, number_additional_errors: int = 100, parent=None):
+        """
+        :param number_logs: <int> maximum number of the newest logs in the table
+        :param number_additional_errors: <int> maximum number of older errors below the newest logs
+        :param parent: <QObject | None>
+        """
+        QAbstractTableModel.__init__(self, parent)
+        LogRows.__init__(self, number_logs, number_additional_errors)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.get_rows())
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.get_rows()[index.row()]
+        if role == Qt.DisplayRole:
+            return str(row[index.column()])
+        if role == Qt.TextAlignmentRole and index.column() < 5:
+            return Qt.AlignCenter
+        if role == Qt.BackgroundRole:
+            priority = int(row[2])
+            if priority >= 10:
+                return self.BRUSH_ERROR
+            if priority >= 5:
+                return self.BRUSH_IMPORTANT
+        return None
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index: QModelIndex):
+        return Qt.ItemIsSelectable | Qt.ItemIsEnabled
+
+    def _begin_reset(self) -> None:
+        self.beginResetModel()
+
+    def _end_reset(self) -> None:
+        self.endResetModel()
+
+    def _begin_insert(self, first: int, last: int) -> None:
+        self.beginInsertRows(QModelIndex(), first, last)
+
+    def _end_insert(self) -> None:
+        self.endInsertRows()
+
+    def _begin_remove(self, first: int, last: int) -> None:
+        self.beginRemoveRows(QModelIndex(), first, last)
+
+    def _end_remove(self) -> None:
+        self.endRemoveRows()
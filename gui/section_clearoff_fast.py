@@ -1,13 +1,39 @@
 from PyQt5.QtWidgets import QGroupBox, QGridLayout, QPushButton, QCheckBox, QLabel, QHBoxLayout, QComboBox
 from PyQt5.QtCore import Qt
 
+from utils.messages import LaneMessage, encapsulate_message, prepare_command_message, prepare_z_message
+
 class SectionClearOffTest(QGroupBox):
+    # types of messages analyzed by analyze_message_to_lane and analyze_message_from_lane
+    OPCODES_TO_LANE = [b"IG"]
+    OPCODES_FROM_LANE = [b"i0", b"w", b"g", b"h", b"f", b"k"]
 
-    def __init__(self):
+    def __init__(self, gui_event_bus):
         """
-        TODO: describe variables
+        Analyzers are called by thread of communication, so they don't touch widgets, state of checkboxes and combo is
+        kept in lists updated by signals and widgets are updated by gui_event_bus
+
+        :param gui_event_bus: <GuiEventBus> bus to update widgets in GUI thread
+
+        self.__log_management - <func(int, str, str, str) | None> function to add log, it's set in init
+        self.__box - <QGroupBox | None> panel with combo, labels and checkboxes, it's created in init
+        self.__checkboxes - <list[list[QCheckBox]]> checkboxes "Aktualny tor" (0) and "Następny tor" (1) of every lane
+        self.__labels - <list[QLabel]> status of every lane: last throw of current layout | number of finished layouts
+        self.__combo_modes - <QComboBox | None> combo to choose mode of ending layout
+        self.__list_checked - <list[list[bool]]> state of checkboxes "Aktualny tor" (0) and "Następny tor" (1)
+        self.__mode_index - <int> index of selected mode in combo
+        self.__list_throw_to_current_layout - <list[int]> lane -> number of throws to current layout
+        self.__list_count_clear_off_finish - <list[int]> lane -> number of layouts ended faster by this section
+        self.__list_count_full_throws - <list[int]> lane -> number of throws in full (from message IG)
+        self.__list_count_all_throws - <list[int]> lane -> number of throws in full and clear off (from message IG),
+                                       0 - trial, layouts aren't ended
+        self.__list_actually_layout - <list[list[int, int]]> lane -> [first, last] throw of current layout
+        self.__list_last_layout - <list[list[int, int]]> lane -> [first, last] throw of previous layout, it's restored
+                                  when throw number goes back (e.g. after correction)
+        self.__max_throw_to_layout - <int> max number of throws to one layout in clear off
         """
         super().__init__("Szybsze kończenie zbieranych")
+        self.__gui_event_bus = gui_event_bus
         self.__log_management = None
         self.__box = None
         self.__layout = QGridLayout()
@@ -16,6 +42,8 @@ class SectionClearOffTest(QGroupBox):
         self.__checkboxes = []
         self.__labels = []
         self.__combo_modes = None
+        self.__list_checked = [[], []]
+        self.__mode_index = 0
         self.__list_throw_to_current_layout = []
         self.__list_count_clear_off_finish = []
         self.__list_count_full_throws = []
@@ -33,6 +61,8 @@ class SectionClearOffTest(QGroupBox):
             self.__list_count_all_throws.append(0)
             self.__list_actually_layout.append([0,0])
             self.__list_last_layout.append([0,0])
+            self.__list_checked[0].append(False)
+            self.__list_checked[1].append(False)
         self.__box = self.__get_panel(number_of_lane)
         self.__layout.addWidget(self.__box)
 
@@ -50,6 +80,7 @@ class SectionClearOffTest(QGroupBox):
             "Tryb 43.E: (z podniesieniem i 800ms) Stop(0)   Z_1(0)    Korekta(0)   C(0)   Enter(0)   Podnies(800) =  800",
 
         ])
+        self.__combo_modes.currentIndexChanged.connect(self.__on_mode_selected)
         layout.addWidget(self.__combo_modes, 0, 0)
 
         box_row = QGroupBox("Status na torach")
@@ -77,6 +108,7 @@ class SectionClearOffTest(QGroupBox):
 
                 label = QLabel(str(i + 1))
                 checkbox = QCheckBox()
+                checkbox.toggled.connect(lambda checked, r=row, lane=i: self.__on_checkbox_toggled(r, lane, checked))
 
                 self.__checkboxes[row].append(checkbox)
 
@@ -93,7 +125,7 @@ class SectionClearOffTest(QGroupBox):
         box.setVisible(False)
         return box
 
-    def analyze_message_from_lane(self, msg):
+    def analyze_message_from_lane(self, msg: LaneMessage):
         """
         Level of interference:
             8: b'____w_____________________________\r' & 3 throw to layout & enable full layout after 3 throw
@@ -112,24 +144,28 @@ class SectionClearOffTest(QGroupBox):
                 [set_full_layout], [], [], [b'____w_____________________________\r'] - otherwise
 
         """
-        if msg[4:6] == b"i0":
-            lane = int(msg[3:4])
+        if msg.opcode == b"i0":
+            lane = msg.lane
             self.__log_management(5, "S_COF_1", "", "Odebrano wiadomość i0 a torze '{}'({})".format(lane, msg ))
-            if lane >= len(self.__list_throw_to_current_layout):
+            if lane is None or lane >= len(self.__list_throw_to_current_layout):
                 return
-            self.__checkboxes[0][lane].setChecked(self.__checkboxes[1][lane].isChecked())
-            self.__checkboxes[1][lane].setChecked(False)
+            self.__list_checked[0][lane] = self.__list_checked[1][lane]
+            self.__list_checked[1][lane] = False
+            self.__gui_event_bus.post(self.__checkboxes[0][lane].setChecked, self.__list_checked[0][lane])
+            self.__gui_event_bus.post(self.__checkboxes[1][lane].setChecked, False)
             self.__list_throw_to_current_layout[lane] = 0
             self.__list_count_clear_off_finish[lane] = 0
             self.__list_actually_layout[lane] = [0, 100] # TODO
             self.__list_count_all_throws[lane] = 0 # then in trial after 3x 0 this function not will set full layout
             self.__actualize_label(lane)
             return
-        if msg[4:5] in [b"w", b"g", b"h", b"f", b"k"]:
-            lane = int(msg[3:4])
-            if lane >= len(self.__list_throw_to_current_layout):
+        if msg.kind in msg.THROW_TYPES:
+            lane = msg.lane
+            if lane is None or lane >= len(self.__list_throw_to_current_layout):
+                return
+            throw_number = msg.throw_number
+            if throw_number is None:
                 return
-            throw_number = int(msg[5:8], 16)
             self.__log_management(4, "S_COF_2", "", "Odebrano wiadomość o rzucie {} na torze '{}'({})".format(throw_number, lane, msg))
             if self.__list_count_all_throws[lane] == 0:
                 self.__log_management(3, "S_COF_14", "", "Są próbne: jest rzut '{}'".format(throw_number))
@@ -145,8 +181,8 @@ class SectionClearOffTest(QGroupBox):
             if throw_number >= self.__list_count_all_throws[lane]:
                 self.__log_management(3, "S_COF_13", "", "Gra na torze się zakończyła: jest rzut '{}', a pełne trwają {} rzutów".format(throw_number, self.__list_count_full_throws[lane]))
                 return
-            next_layout = msg[17:20]
-            fallen_pins = msg[26:29]
+            next_layout = msg.next_layout
+            fallen_pins = msg.fallen_pins
 
             if next_layout == b"000" and fallen_pins != b"000":
                 self.__list_last_layout[lane][0] = self.__list_actually_layout[lane][0]
@@ -168,13 +204,13 @@ class SectionClearOffTest(QGroupBox):
                 self.__log_management(5, "S_COF_3", "", "Na torze {} ustawi się pełen układ, a actually_layout to [{}, {}]".format(
                     lane, self.__list_actually_layout[lane][0], self.__list_actually_layout[lane][1]))
                 self.__actualize_label(lane)
-                if self.__checkboxes[0][lane].isChecked():
-                    return self.__analyse_max_throw_clearoff(lane, msg)
+                if self.__list_checked[0][lane]:
+                    return self.__analyse_max_throw_clearoff(lane, msg.raw)
             else:
                 return
         return
 
-    def analyze_message_to_lane(self, msg):
+    def analyze_message_to_lane(self, msg: LaneMessage):
         """
         Level of interference:
             1: b'____IG_____________________\r'
@@ -186,14 +222,14 @@ class SectionClearOffTest(QGroupBox):
             Out:
                 None
         """
-        if msg[4:6] == b"IG":
-            lane = int(msg[1:2])
+        if msg.opcode == b"IG":
+            lane = msg.lane
             self.__log_management(5, "S_COF_10", "", "Odebrano wiadomość IG na torze '{}'({})".format(lane, msg ))
-            if lane >= len(self.__list_throw_to_current_layout):
+            if lane is None or lane >= len(self.__list_throw_to_current_layout):
                 return
 
-            count_full_throw = int(msg[6:9], 16)
-            count_clear_off_throw = int(msg[9:12], 16)
+            count_full_throw = int(msg.raw[6:9], 16)
+            count_clear_off_throw = int(msg.raw[9:12], 16)
             self.__list_count_full_throws[lane] = count_full_throw
             self.__list_count_all_throws[lane] = count_full_throw + count_clear_off_throw
             self.__list_actually_layout[lane] = [0, count_full_throw + self.__max_throw_to_layout]
@@ -224,18 +260,9 @@ class SectionClearOffTest(QGroupBox):
 
     def __send_message_to_end_layout(self, message_head, number_of_throw, last_throw_result, lane_sum, total_sum, next_layout,
                                      number_of_x, time_to_end, fallen_pins, options):
-        z = lambda time_wait=-1, priority=5: self.__on_get_message(
-            message_head +
-            b"Z" +
-            number_of_throw +
-            last_throw_result +
-            lane_sum +
-            total_sum +
-            b"000" +
-            number_of_x +
-            time_to_end +
-            fallen_pins +
-            options,
+        z = lambda time_wait=-1, priority=5: encapsulate_message(
+            prepare_z_message(message_head, number_of_throw, last_throw_result, lane_sum, total_sum, b"000",
+                              number_of_x, time_to_end, fallen_pins, options),
             priority,
             time_wait
         )
@@ -244,23 +271,15 @@ class SectionClearOffTest(QGroupBox):
         total_sum_1 = self.__add_to_hex(total_sum, pins)
         lane_sum_1 = self.__add_to_hex(lane_sum, pins)
 
-        z_1 = lambda time_wait=-1, priority=5: self.__on_get_message(
-            message_head +
-            b"Z" +
-            number_of_throw +
-            last_throw_result +
-            lane_sum_1 +
-            total_sum_1 +
-            next_layout +
-            number_of_x +
-            time_to_end +
-            fallen_pins +
-            options,
+        z_1 = lambda time_wait=-1, priority=5: encapsulate_message(
+            prepare_z_message(message_head, number_of_throw, last_throw_result, lane_sum_1, total_sum_1, next_layout,
+                              number_of_x, time_to_end, fallen_pins, options),
             priority,
             time_wait
         )
 
-        b_click = lambda msg, priority=3, time_wait=-1: self.__on_get_message(message_head + msg, priority, time_wait)
+        b_click = lambda msg, priority=3, time_wait=-1: encapsulate_message(prepare_command_message(message_head, msg),
+                                                                            priority, time_wait)
 
         b_stop = lambda time_wait=-1, priority=9: b_click(b"T40", priority, time_wait)
         b_layout = lambda time_wait=-1, priority=5: b_click(b"T16", priority, time_wait)
@@ -295,7 +314,7 @@ class SectionClearOffTest(QGroupBox):
             ],  # Tryb 43E
         ]
 
-        mode_index = self.__combo_modes.currentIndex()
+        mode_index = self.__mode_index
         if mode_index >= len(modes):
             self.__log_management(10, "S_COF_6", "", "Wybrano mode o nmerze {}, a jest {}".format(mode_index, len(modes)))
             mode_index = 0
@@ -308,10 +327,6 @@ class SectionClearOffTest(QGroupBox):
             self.__log_management(4, "S_COF_6", "", "Do ustawienia pełnego układu zostanie użyty mode dla zbitych kręgli")
         return modes[mode_index][mode_of_mode], []
 
-    def __on_get_message(self, message, priority=5, time_wait=-1):
-        msg = message + self.__calculate_control_sum(message) + b"\r"
-        return {"message": msg, "time_wait": time_wait, "priority": priority}
-
     @staticmethod
     def __add_to_hex(hex_bytes, x):
         hex_str = hex_bytes.decode('Windows-1250')
@@ -330,13 +345,11 @@ class SectionClearOffTest(QGroupBox):
         ones_count = bin(value).count('1')
         return ones_count
 
-    @staticmethod
-    def __calculate_control_sum(message):
-        sum_ascii = 0
-        for x in message:
-            sum_ascii += x
-        checksum = bytes(hex(sum_ascii).split("x")[-1].upper()[-2:], 'utf-8')
-        return checksum
+    def __on_checkbox_toggled(self, row: int, lane: int, checked: bool) -> None:
+        self.__list_checked[row][lane] = checked
+
+    def __on_mode_selected(self, mode_index: int) -> None:
+        self.__mode_index = mode_index
 
     def show_control_panel(self, show: bool):
         if self.__box is None:
@@ -348,6 +361,7 @@ class SectionClearOffTest(QGroupBox):
 
     def __actualize_label(self, lane):
         """
-        TODO
+        Text of label is set by gui_event_bus, because this method is called by thread of communication
         """
-        self.__labels[lane].setText(str(self.__list_actually_layout[lane][1]) + " | " + str(self.__list_count_clear_off_finish[lane]))
\ No newline at end of file
+        self.__gui_event_bus.post(self.__labels[lane].setText, str(self.__list_actually_layout[lane][1]) + " | " +
+                                  str(self.__list_count_clear_off_finish[lane]))
\ No newline at end of file
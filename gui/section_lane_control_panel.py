@@ -2,10 +2,12 @@ import time
 
 from PyQt5.QtWidgets import QGroupBox, QGridLayout, QPushButton, QAction
 
-from utils.messages import extract_lane_id_from_incoming_message, prepare_message_to_lane_and_encapsulate, encapsulate_message
+from utils.messages import prepare_message_to_lane_and_encapsulate, encapsulate_message, LaneMessage
 
 
 class SectionLaneControlPanel(QGroupBox):
+    # every message from lane is analyzed, because time in trial is checked in messages with any type
+    OPCODES_FROM_LANE = None
 
     def __init__(self, parent):
         """
@@ -150,12 +152,12 @@ class SectionLaneControlPanel(QGroupBox):
         if show_main:
             self.adjustSize()
 
-    def analyze_message_from_lane(self, msg: bytes):
+    def analyze_message_from_lane(self, msg: LaneMessage):
         """
         This function is responsible for analyzing messages received from the lanes
 
         Args:
-            msg (bytes): Incoming message received from a lane.
+            msg (LaneMessage): Incoming message received from a lane.
 
         Level of interference:
             8: b'____w_____________________________\r' & was clicked "Stop time" when pins weren't standing
@@ -182,15 +184,15 @@ class SectionLaneControlPanel(QGroupBox):
         Returns:
             None || [list, list, list, list]
         """
-        lane_id = extract_lane_id_from_incoming_message(msg, self.__number_of_lane)
-        if lane_id == -1:
+        lane_id = msg.lane
+        if lane_id is None or lane_id >= self.__number_of_lane:
             self.__log_management(10, "LCP_ERROR_1", "", "Numer toru {} jest niepoprawny".format(lane_id))
             return
         self.__update_mode_from_incoming_message(msg, lane_id)
         self.__analyze_message__moment_of_trial(msg, lane_id)
         return self.__analyze_message__throw(msg, lane_id)
 
-    def __update_mode_from_incoming_message(self, msg: bytes, lane_id: int) -> None:
+    def __update_mode_from_incoming_message(self, msg: LaneMessage, lane_id: int) -> None:
         """
         Update the current mode based on an incoming message.
 
@@ -198,7 +200,7 @@ class SectionLaneControlPanel(QGroupBox):
         the internal mode state accordingly.
 
         Args:
-            msg (bytes): Incoming message received from a lane.
+            msg (LaneMessage): Incoming message received from a lane.
             lane_id (int): Lane number from which the message was sent.
 
         Returns:
@@ -207,10 +209,10 @@ class SectionLaneControlPanel(QGroupBox):
         if len(msg) < 9:
             return
 
-        if msg[4:5] not in [b"p", b"i"]:
+        if msg.kind not in [b"p", b"i"]:
             return
 
-        content = msg[4:6]
+        content = msg.opcode
         if content == b"p1":
             self.__mode_on_lane[lane_id] = 1
             self.__trial_time_on_lane[lane_id] = b""
@@ -228,12 +230,12 @@ class SectionLaneControlPanel(QGroupBox):
             self.__enable_enter_on_lane[lane_id] = False
             self.__enable_stop_time_on_lane[lane_id] = False
 
-    def __analyze_message__moment_of_trial(self, msg: bytes, lane_id: int) -> None:
+    def __analyze_message__moment_of_trial(self, msg: LaneMessage, lane_id: int) -> None:
         """
         This func analyze messages when is trial (mode == 1), and when time is started then disable possibility to click "enter"
 
         param:
-            msg <bytes> - message from lane
+            msg <LaneMessage> - message from lane
             lane_id <int> - lane number from where message was sent
 
         return:
@@ -250,16 +252,16 @@ class SectionLaneControlPanel(QGroupBox):
             return
 
         if self.__trial_time_on_lane[lane_id] == b"":
-            self.__trial_time_on_lane[lane_id] = msg[4:7]
-        elif self.__trial_time_on_lane[lane_id] != msg[4:7]:
+            self.__trial_time_on_lane[lane_id] = msg.raw[4:7]
+        elif self.__trial_time_on_lane[lane_id] != msg.raw[4:7]:
             self.__enable_enter_on_lane = False
 
-    def __analyze_message__throw(self, msg: bytes, lane_id: int):
+    def __analyze_message__throw(self, msg: LaneMessage, lane_id: int):
         """
         This function is responsible for resending the message to stop the time if a message with a new roll is received before the deadline expires
 
         param:
-            msg <bytes> - message from lane
+            msg <LaneMessage> - message from lane
             lane_id <int> - lane number from where message was sent
 
         return:
@@ -274,6 +276,6 @@ class SectionLaneControlPanel(QGroupBox):
         if time.time() <= self.__stop_time_deadline_on_lane[lane_id]:
             self.__stop_time_deadline_on_lane[lane_id] = 0
             packet_to_lane = prepare_message_to_lane_and_encapsulate(lane_id, b"T14", 9, 0)
-            packet_from_lane = encapsulate_message(msg, 3, -1)
+            packet_from_lane = encapsulate_message(msg.raw, 3, -1)
             return [packet_to_lane], [], [], [packet_from_lane]
         return
@@ -1,6 +1,5 @@
 from gui.setting_option import CheckboxActionAnalyzedMessageBase
-from utils.messages import extract_lane_id_from_outgoing_message, prepare_message, encapsulate_message, \
-    prepare_message_and_encapsulate
+from utils.messages import prepare_message, encapsulate_message, prepare_message_and_encapsulate, LaneMessage
 
 from PyQt5.QtWidgets import QGroupBox, QGridLayout, QLabel, QHBoxLayout, QWidget, QComboBox, QLineEdit
 from PyQt5.QtCore import Qt
@@ -8,14 +7,20 @@ from PyQt5.QtGui import QIntValidator
 
 
 class SectionSetResultFromLastGame(CheckboxActionAnalyzedMessageBase, QGroupBox):
-    def __init__(self, parent):
+    OPCODES_TO_LANE = [b"P", b"IG"]
+    OPCODES_FROM_LANE = [b"i0", b"p0"]
+
+    def __init__(self, parent, gui_event_bus):
         """
+            gui_event_bus - <GuiEventBus> bus to update editors in GUI thread, analyzers are called by thread of
+                            communication
             self.__round_in_block - -1 - when is trial, 0 on first lane, 1 on second, ...
             self.__is_during_game - True after "IG" and "P", False after "p0" and "i0"
         """
         QGroupBox.__init__(self, "Wynik z elimiminacji", parent)
         CheckboxActionAnalyzedMessageBase.__init__(self, parent, "Ustawianie wyniku z eliminacji", False)
         self.__parent = parent
+        self.__gui_event_bus = gui_event_bus
         self.__number_of_lane = 0
         self.__round_in_block = -1
         self.__is_during_game = False
@@ -103,7 +108,7 @@ class SectionSetResultFromLastGame(CheckboxActionAnalyzedMessageBase, QGroupBox)
         else:
             value_str = str(value_int)
 
-        editor.setText(value_str)
+        self.__gui_event_bus.post(editor.setText, value_str)
         self.__set_lane_value(stored_values, lane_id, value_int)
 
     @staticmethod
@@ -125,7 +130,7 @@ class SectionSetResultFromLastGame(CheckboxActionAnalyzedMessageBase, QGroupBox)
 
         return format(value_int, "03X").encode()
 
-    def analyze_message_to_lane(self, message: bytes):
+    def analyze_message_to_lane(self, message: LaneMessage):
         """
         Level of interference:
             8: b'____IG_________000_________\r' and mode 1
@@ -153,7 +158,7 @@ class SectionSetResultFromLastGame(CheckboxActionAnalyzedMessageBase, QGroupBox)
         if not self.is_enabled():
             return
 
-        if message[4:5] == b"P":
+        if message.kind == b"P":
             if not self.__is_during_game:
                 self.__is_during_game = True
                 if self.__round_in_block != -1:
@@ -163,14 +168,14 @@ class SectionSetResultFromLastGame(CheckboxActionAnalyzedMessageBase, QGroupBox)
                 self.__round_in_block = -1
             return
 
-        if message[4:6] == b"IG":
+        if message.opcode == b"IG":
             if not self.__is_during_game:
                 self.__is_during_game = True
                 self.__round_in_block += 1
                 self.__replace_additional_sum_between_lane()
             return self.__prepare_ig_messages(message)
 
-    def analyze_message_from_lane(self, message: bytes):
+    def analyze_message_from_lane(self, message: LaneMessage):
         """
         Level of interference:
             1: b'____i0__\r'
@@ -183,12 +188,15 @@ class SectionSetResultFromLastGame(CheckboxActionAnalyzedMessageBase, QGroupBox)
             Out:
                 None
         """
-        if message[4:6] == b"i0" or message[4:6] == b"p0":
+        if message.opcode == b"i0" or message.opcode == b"p0":
             self.__is_during_game = False
 
-    def __prepare_ig_messages(self, message: bytes):
-        total_sum = int(message[15:18].decode(), 16)
-        additional_sum = self.__get_sum_from_last_game(message)
+    def __prepare_ig_messages(self, lane_message: LaneMessage):
+        total_sum = lane_message.total_sum
+        if total_sum is None:
+            return
+        additional_sum = self.__get_sum_from_last_game(lane_message)
+        message = lane_message.raw
         new_total_sum = total_sum + additional_sum
         new_total_sum_bytes = self.__int_to_hex_bytes(new_total_sum)
 
@@ -214,9 +222,9 @@ class SectionSetResultFromLastGame(CheckboxActionAnalyzedMessageBase, QGroupBox)
             message = prepare_message(message)
             return message
 
-    def __get_sum_from_last_game(self, message: bytes) -> int:
-        lane_id = extract_lane_id_from_outgoing_message(message, self.__number_of_lane)
-        if lane_id is None:
+    def __get_sum_from_last_game(self, message: LaneMessage) -> int:
+        lane_id = message.lane
+        if lane_id is None or lane_id >= self.__number_of_lane:
             return 0
         total_sum = self.__list_sum[lane_id]
         return total_sum
@@ -2,14 +2,19 @@ from PyQt5.QtWidgets import QAction, QPushButton, QComboBox, QHBoxLayout, QLabel
 import os
 import shutil
 
-from utils.messages import prepare_message_and_encapsulate, encapsulate_message, prepare_message, \
-    extract_lane_id_from_incoming_message, extract_lane_id_from_outgoing_message
+from utils.messages import encapsulate_message, prepare_message, prepare_command_message, LaneMessage
 
 
 class CheckboxActionAnalyzedMessageBase:
     """
     Abstract base class for a checkable QAction-based menu setting.
+
+    OPCODES_TO_LANE and OPCODES_FROM_LANE are types of messages (beginning of message[4:]) which are analyzed,
+    other messages aren't given to analyze_message_to_lane/analyze_message_from_lane, None - every message.
     """
+    OPCODES_TO_LANE = None
+    OPCODES_FROM_LANE = None
+
     def __init__(self, parent, label: str, default_enabled=True) -> None:
         """
 
@@ -71,25 +76,25 @@ class CheckboxActionAnalyzedMessageBase:
         """
         return self._is_enabled
 
-    def analyze_message_to_lane(self, message: bool):
+    def analyze_message_to_lane(self, message: LaneMessage):
         """
         Analyze a message being sent to the lane.
 
         Subclasses must implement this method and decide whether
         to act based on the current enabled state.
 
-        :param message: <bytes> Message to analyze (terminated with b"\r")
+        :param message: <LaneMessage> Message to analyze (raw bytes terminated with b"\r")
         """
         return
 
-    def analyze_message_from_lane(self, message: bytes):
+    def analyze_message_from_lane(self, message: LaneMessage):
         """
         Analyze a message received from the lane.
 
         Subclasses must implement this method and decide whether
         to act based on the current enabled state.
 
-        :param message: <bytes> Message to analyze (terminated with b"\r")
+        :param message: <LaneMessage> Message to analyze (raw bytes terminated with b"\r")
         """
         return
 
@@ -107,10 +112,13 @@ class SettingTurnOnPrinter(CheckboxActionAnalyzedMessage):
     Menu setting responsible for enabling the printer
     when a 'IG' message is sent with disable printer.
     """
+    OPCODES_TO_LANE = [b"IG"]
+    OPCODES_FROM_LANE = []
+
     def __init__(self, parent):
         super().__init__(parent,"Uruchom drukarkę przy meczówce", default_enabled=True)
 
-    def analyze_message_to_lane(self, message: bytes):
+    def analyze_message_to_lane(self, message: LaneMessage):
         """
         Analyze an outgoing message and optionally inject
         a modified packet to enable the printer.
@@ -127,11 +135,11 @@ class SettingTurnOnPrinter(CheckboxActionAnalyzedMessage):
         """
         if not self.is_enabled():
             return
-        if len(message) < 28 or message[4:6] != b"IG":
+        if len(message) < 28 or message.opcode != b"IG":
             return
-        if message[24:25] != b"0":
+        if message.raw[24:25] != b"0":
             return
-        content_msg = message[:24] + b"1"
+        content_msg = message.raw[:24] + b"1"
         return prepare_message(content_msg)
 
 
@@ -139,10 +147,13 @@ class SettingStartTimeInTrial(CheckboxActionAnalyzedMessage):
     """
     Menu setting responsible for add possibility to start time in trial.
     """
+    OPCODES_TO_LANE = [b"P"]
+    OPCODES_FROM_LANE = []
+
     def __init__(self, parent):
         super().__init__(parent,"Dodaj opcję włączenia czasu w próbnych", default_enabled=True)
 
-    def analyze_message_to_lane(self, message: bytes):
+    def analyze_message_to_lane(self, message: LaneMessage):
         """
         Level of interference:
             9: b'____P_________\r' - every time
@@ -156,12 +167,12 @@ class SettingStartTimeInTrial(CheckboxActionAnalyzedMessage):
         """
         if not self.is_enabled():
             return
-        if len(message) != 15 or message[4:5] != b"P":
+        if len(message) != 15 or message.kind != b"P":
             return
 
-        packet_trial = encapsulate_message(message, 3, -1)
-        packet_pick_up = prepare_message_and_encapsulate(message[:4] + b"T41", 3, -1)
-        packet_stop_time = prepare_message_and_encapsulate(message[:4] + b"T14", 9, 300)
+        packet_trial = encapsulate_message(message.raw, 3, -1)
+        packet_pick_up = encapsulate_message(prepare_command_message(message.raw[:4], b"T41"), 3, -1)
+        packet_stop_time = encapsulate_message(prepare_command_message(message.raw[:4], b"T14"), 9, 300)
         return [], [], [], [packet_trial, packet_pick_up, packet_stop_time]
 
 
@@ -169,8 +180,16 @@ class SettingStopCommunicationBeforeTrial(CheckboxActionAnalyzedMessage):
     """
     Menu setting responsible stop communication before new block.
     """
-    def __init__(self, parent):
+    OPCODES_TO_LANE = [b"P"]
+    OPCODES_FROM_LANE = [b"p0"]
+
+    def __init__(self, parent, gui_event_bus):
+        """
+        :param gui_event_bus: <GuiEventBus> bus to show and hide buttons in GUI thread, analyzers are called by thread
+                              of communication
+        """
         super().__init__(parent,"Wstrzymuj kolejny blok", default_enabled=True)
+        self._gui_event_bus = gui_event_bus
         self._mode = 0
         self._active_lanes = set()
         self._stop_communication = False
@@ -180,7 +199,7 @@ class SettingStopCommunicationBeforeTrial(CheckboxActionAnalyzedMessage):
     def communication_outgoing_is_enabled(self) -> bool:
         return not self._stop_communication
 
-    def analyze_message_to_lane(self, message: bytes):
+    def analyze_message_to_lane(self, message: LaneMessage):
         """
         Level of interference:
             1: b'____P_________\r'
@@ -194,10 +213,10 @@ class SettingStopCommunicationBeforeTrial(CheckboxActionAnalyzedMessage):
 
         :logs: STOP_COM_STOP (5)
         """
-        if message[4:5] == b"P":
+        if message.kind == b"P":
             if self._mode == 0:
                 return
-            lane_id = extract_lane_id_from_outgoing_message(message)
+            lane_id = message.lane
             self._active_lanes.discard(lane_id)
             if self._mode == 1:
                 if self.is_enabled():
@@ -216,7 +235,7 @@ class SettingStopCommunicationBeforeTrial(CheckboxActionAnalyzedMessage):
                     self._show_button(2, 3)
                     self._mode = 3
 
-    def analyze_message_from_lane(self, message: bytes):
+    def analyze_message_from_lane(self, message: LaneMessage):
         """
         Level of interference:
             1: b'____p0__\r'
@@ -228,11 +247,11 @@ class SettingStopCommunicationBeforeTrial(CheckboxActionAnalyzedMessage):
             Out:
                 None
         """
-        if message[4:6] == b"p0":
+        if message.opcode == b"p0":
             if self._mode in [2, 3]:
                 self._enable_communication()
             self._mode = 1
-            lane_id = extract_lane_id_from_incoming_message(message)
+            lane_id = message.lane
             self._active_lanes.add(lane_id)
         return
 
@@ -297,8 +316,8 @@ class SettingStopCommunicationBeforeTrial(CheckboxActionAnalyzedMessage):
         """
         if self._stop_communication:
             self._add_log(5, "STOP_COM_START", "", "Wznowiono komunikację")
-        self._btn_temporary.hide()
-        self._btn_main.hide()
+        self._gui_event_bus.post(self._btn_temporary.setVisible, False)
+        self._gui_event_bus.post(self._btn_main.setVisible, False)
         if self._mode == 2:
             self._active_lanes.clear()
         self._mode = 0
@@ -307,20 +326,23 @@ class SettingStopCommunicationBeforeTrial(CheckboxActionAnalyzedMessage):
     def _show_button(self, old_mode, new_mode):
         if old_mode == 1 and new_mode == 2:
             if self.is_enabled():
-                self._btn_temporary.show()
+                self._gui_event_bus.post(self._btn_temporary.setVisible, True)
         elif old_mode == 1 and new_mode == 3:
             if self.is_enabled():
-                self._btn_main.show()
+                self._gui_event_bus.post(self._btn_main.setVisible, True)
         elif old_mode == 2 and new_mode == 3:
-            self._btn_temporary.hide()
+            self._gui_event_bus.post(self._btn_temporary.setVisible, False)
             if self.is_enabled():
-                self._btn_main.show()
+                self._gui_event_bus.post(self._btn_main.setVisible, True)
 
 
 class SettingShowResultOnMonitorFromLastGame(CheckboxActionAnalyzedMessage):
     """
     Menu setting responsible show result from last block on monitor. (replace daten.ini)
     """
+    OPCODES_TO_LANE = [b"P"]
+    OPCODES_FROM_LANE = [b"i0", b"p1"]
+
     def __init__(self, parent):
         """
         :list_path_to_lane_dir: list[str] - list with path to dir where is daten.ini
@@ -334,7 +356,7 @@ class SettingShowResultOnMonitorFromLastGame(CheckboxActionAnalyzedMessage):
     def set_list_path_to_lane_dir(self, list_path_to_lane_dir):
         self._list_path_to_lane_dir = list_path_to_lane_dir
 
-    def analyze_message_to_lane(self, message: bytes):
+    def analyze_message_to_lane(self, message: LaneMessage):
         """
         Level of interference:
             1: b'____P_________\r'
@@ -349,12 +371,12 @@ class SettingShowResultOnMonitorFromLastGame(CheckboxActionAnalyzedMessage):
         if not self.is_enabled():
             return
 
-        if message[4:5] == b"P":
+        if message.kind == b"P":
             self.__copy_on_lanes_P(self._file_name, self._file_name_future, self._file_name_archive)
 
         return
 
-    def analyze_message_from_lane(self, message: bytes):
+    def analyze_message_from_lane(self, message: LaneMessage):
         """
         Level of interference:
             1: b'____i0__\r'
@@ -371,10 +393,10 @@ class SettingShowResultOnMonitorFromLastGame(CheckboxActionAnalyzedMessage):
         if not self.is_enabled():
             return
 
-        if message[4:6] == b"i0":
+        if message.opcode == b"i0":
             self.__copy_on_lanes(self._file_name, self._file_name_archive)
 
-        if message[4:6] == b"p1":
+        if message.opcode == b"p1":
             self.__copy_on_lanes(self._file_name_future, self._file_name, True)
 
         return
@@ -1,29 +1,71 @@
 """This module creates a log file and writes the logs to a log file"""
 import os
-from datetime import datetime
+import time
+
+from utils.log_store import LogStore
+from utils.log_writer import LogWriter
+
+# (second, formatted second) of the last formatted time, date is formatted once per second
+_datetime_cache = (None, "")
+
+
+def format_log_datetime(time_s: float, with_ms: bool = False) -> str:
+    """
+    This function returns the date and time as a formatted string, optionally including milliseconds. Date without
+    milliseconds is cached, so it is formatted once per second.
+
+    :param time_s: <float> time in seconds since the epoch, e.g. time.time()
+    :param with_ms: if True, then str in return include milliseconds
+    :return: str with datetime, without ms format: YYYY_MM_DD__gg_mm_ss, with ms: YYYY_MM_DD__gg_mm_ss_mmm
+    """
+    global _datetime_cache
+    second = int(time_s)
+    cache = _datetime_cache
+    if cache[0] != second:
+        cache = (second, time.strftime("%Y_%m_%d__%H_%M_%S", time.localtime(second)))
+        _datetime_cache = cache
+    if not with_ms:
+        return cache[1]
+    return "{}_{:03d}".format(cache[1], int((time_s - second) * 1000))
+
+
+def format_log_record(record: tuple) -> list:
+    """
+    :param record: <tuple(int, float, int, any, any, any)> index, time, priority, code, port, message
+    :return: <list[int, str, int, str, str, str]> index, datetime with ms, priority, code, port, message
+    """
+    index, time_s, priority, code, port, message = record
+    return [index, format_log_datetime(time_s, True), priority, code if type(code) == str else str(code),
+            port if type(port) == str else str(port), message if type(message) == str else str(message)]
+
+
+def format_log_line(record: tuple) -> str:
+    """
+    :param record: <tuple(int, float, int, any, any, any)> index, time, priority, code, port, message
+    :return: <str> line of log file
+    """
+    index, date, priority, code, port, message = format_log_record(record)
+    return "{}.\t{}\t{}\t{}\t{}\t{}".format(index, date, priority, code.ljust(14), port.ljust(26), message)
 
 
 class LogManagement:
-    def __init__(self, minimum_number_of_lines_to_write: int = 1):
+    def __init__(self, minimum_number_of_lines_to_write: int = 1, flush_interval: float = 1.0):
         """
         self.__name - <str> log file name
         self.__index - <int> index of the last saved log
-        self.__number_lines_to_write - <int> how many logs are waiting to be written
-        self.__minimum_number_of_lines_to_write - <int> when this number of logs are waiting,
-                                                        the logs are written to the file
-        self.__lines_to_writ - <str> logs waiting to be saved
+        self.__writer - <LogWriter> formats logs and writes them to the file in own thread
+        self.__log_store - <LogStore> the last logs of every priority as records (index, time, priority, code, port,
+                                      message), they are formatted only when they are shown
 
         :param minimum_number_of_lines_to_write: when this number of lines the program will then write them to the file
+        :param flush_interval: max time in seconds after which waiting lines are written to the file
         """
         if not os.path.exists("logs") or not os.path.isdir("logs"):
             os.makedirs("logs")
         self.__name = "logs/" + self.__get_file_name()
-        open(self.__name, "w").close()
+        self.__writer = LogWriter(self.__name, minimum_number_of_lines_to_write, flush_interval, format_log_line)
         self.__index = 0
-        self.__number_lines_to_write = 0
-        self.__minimum_number_of_lines_to_write = minimum_number_of_lines_to_write
-        self.__lines_to_write = ""
-        self.__log_list = []
+        self.__log_store = LogStore()
 
     def set_minimum_number_of_lines_to_write(self, minimum_number_of_lines_to_write):
         """
@@ -32,42 +74,31 @@ class LogManagement:
         :param minimum_number_of_lines_to_write: <int> when this number of logs are waiting,
                                                         the logs are written to the file
         """
-        self.__minimum_number_of_lines_to_write = minimum_number_of_lines_to_write
+        self.__writer.set_minimum_number_of_lines_to_write(minimum_number_of_lines_to_write)
 
-    def __get_file_name(self) -> str:
+    def set_flush_interval(self, flush_interval: float) -> None:
         """
-        This function generates and returns a log file name, which includes the current date and time in its format.
+        This method updates max time after which waiting logs are written to the file
 
-        :return: name of logs file, in name is datetime
+        :param flush_interval: <float> time in seconds
         """
-        filename = "logs_{}.log".format(self.__get_datetime())
-        return filename
+        self.__writer.set_flush_interval(flush_interval)
 
-    @staticmethod
-    def __get_datetime(with_ms: bool = False) -> str:
+    def __get_file_name(self) -> str:
         """
-        This function returns the current date and time as a formatted string, optionally including milliseconds.
+        This function generates and returns a log file name, which includes the current date and time in its format.
 
-        :param with_ms: if True, then str in return include milliseconds
-        :return: str with datetime, without ms format: YYYY_MM_DD__gg_mm_ss, with ms: YYYY_MM_DD__gg_mm_ss_mmmm
+        :return: name of logs file, in name is datetime
         """
-        now = datetime.now()
-        year = now.strftime("%Y")
-        month = now.strftime("%m")
-        day = now.strftime("%d")
-        hour = now.strftime("%H")
-        minute = now.strftime("%M")
-        second = now.strftime("%S")
-        datetime_str = "{}_{}_{}__{}_{}_{}".format(year, month, day, hour, minute, second)
-        if with_ms:
-            millisecond = now.strftime("%f")[:3]
-            datetime_str += "_{}".format(millisecond)
-        return datetime_str
+        filename = "logs_{}.log".format(format_log_datetime(time.time()))
+        return filename
 
     def add_log(self, priority: int, code: str, port: str, message: str) -> None:
         """
-        This method write log messages to log file. This method save logs to file, when is
-        __minimum_number_of_lines_to_write logs to save.
+        This method adds log to the list of logs and gives it to the LogWriter, which saves logs to file in own thread,
+        when is minimum_number_of_lines_to_write logs to save, after flush_interval or immediately for priority 10.
+        Logs with priority above 1 are also printed by LogWriter. Log is kept as raw record, it is formatted only when
+        it is written to the file or shown in GUI.
 
         :param code: log code, e.g. 'SKT_SEND'
         :param port: port name, e.g. 'COM1' or '127.0.0.1'
@@ -75,48 +106,18 @@ class LogManagement:
         :param priority: log priority level (0 - not important, ...)
         :return: None
         """
-        if type(port) == tuple:
-            port = str(port)
-        if type(code) != str:
-            code = str(code)
-        if type(port) != str:
-            port = str(port)
-        if type(message) != str:
-            message = str(message)
         self.__index += 1
-        self.__number_lines_to_write += 1
-        date = self.__get_datetime(True)
-        data = [self.__index, date, priority, code, port, message]
-        self.__log_list.append(data)
-        new_line = "{}.\t{}\t{}\t{}\t{}\t{}".format(self.__index, date, priority, code.ljust(14), port.ljust(26), message)
-        self.__lines_to_write += new_line + "\n"
-        if priority > 1:
-            print(new_line)
-
-        if self.__number_lines_to_write >= self.__minimum_number_of_lines_to_write:
-            if not os.path.exists("logs") or not os.path.isdir("logs"):
-                os.makedirs("logs")
-            with open(self.__name, "a") as file:
-                file.write(self.__lines_to_write)
-            self.__lines_to_write = ""
-            self.__number_lines_to_write = 0
-
-        if len(self.__log_list) > 500:
-            for i in range(0, len(self.__log_list)-50):
-                if int(self.__log_list[i][2]) < 10:
-                    self.__log_list.pop(i)
-                    break
+        record = (self.__index, time.time(), priority, code, port, message)
+        self.__log_store.add(record)
+        self.__writer.put(record, priority > 1, priority >= 10)
 
     def close_log_file(self) -> None:
         """
-        This method writes unsaved logs to a file.
+        This method writes unsaved logs to a file and closes it.
 
         :return: None
         """
-        with open(self.__name, "a") as file:
-            if not os.path.exists("logs") or not os.path.isdir("logs"):
-                os.makedirs("logs")
-            file.write(self.__lines_to_write)
+        self.__writer.close()
 
     def get_logs(self, min_priority: int, number_logs: int, number_additional_errors: int):
         """
@@ -125,16 +126,36 @@ class LogManagement:
         :param min_priority: log must have a minimum priority of this value
         :param number_logs: maximum number of logs can be returned, but errors will be additional returned
         :param number_additional_errors: maximum number of historical error logs
-        :return: list[logs]
-        """
-        data = []
-        for log in self.__log_list[::-1]:
-            if len(data) >= number_logs + number_additional_errors:
-                continue
-            elif int(log[2]) == 10:
-                data.append(log)
-            elif len(data) >= number_logs:
-                continue
-            elif int(log[2]) >= min_priority:
-                data.append(log)
-        return data
+        :return: list[list[index, datetime, priority, code, port, message]] formatted logs from the newest
+        """
+        return [format_log_record(log) for log in self.__log_store.get_logs(min_priority, number_logs,
+                                                                            number_additional_errors)]
+
+    def get_number_of_errors(self, min_priority: int, number_logs: int, number_additional_errors: int) -> int:
+        """
+        This func return number of errors (logs with priority 10) in logs returned by get_logs, logs aren't formatted
+
+        :param min_priority: log must have a minimum priority of this value
+        :param number_logs: maximum number of logs can be returned, but errors will be additional returned
+        :param number_additional_errors: maximum number of historical error logs
+        :return: <int> number of errors
+        """
+        return sum(1 for log in self.__log_store.get_logs(min_priority, number_logs, number_additional_errors)
+                   if int(log[2]) >= LogStore.MAX_PRIORITY)
+
+    def get_logs_after(self, index: int, min_priority: int, max_number: int):
+        """
+        This func return logs newer than log with 'index', which have priority is minimum min_priority or are errors
+
+        :param index: <int> index of log (the first column of log)
+        :param min_priority: <int> log must have a minimum priority of this value
+        :param max_number: <int> maximum number of logs
+        :return: list[list[index, datetime, priority, code, port, message]] formatted logs from the newest
+        """
+        return [format_log_record(log) for log in self.__log_store.get_logs_after(index, min_priority, max_number)]
+
+    def get_last_index(self) -> int:
+        """
+        :return: <int> index of the newest log, 0 - there isn't log
+        """
+        return self.__log_store.get_last_index()
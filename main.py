@@ -6,6 +6,9 @@ from gui.section_clearoff_fast import SectionClearOffTest
 from gui.setting_option import SettingTurnOnPrinter, SettingStartTimeInTrial, SettingStopCommunicationBeforeTrial, \
     SettingShowResultOnMonitorFromLastGame
 from gui.section_set_result_from_last_game import SectionSetResultFromLastGame
+from gui.log_table_model import LogTableModel
+from gui.connection_list_section import ConnectionListSection
+from gui.gui_event_bus import GuiEventBus
 from gui.socket_section import SocketSection
 from log_management import LogManagement
 from config_reader import ConfigReader, ConfigReaderError
@@ -21,6 +24,7 @@ from PyQt5.QtWidgets import (
     QGroupBox,
     QLabel,
     QMessageBox,
+    QTableView,
     QTableWidget,
     QTableWidgetItem,
     QVBoxLayout,
@@ -59,9 +63,10 @@ class GUI(QDialog):
         self.__layout - <QVBoxLayout> The main vertical layout for the window.
         self.__log_management - <None | LogManagement> Placeholder for the log management object.
         self.__connection_manager - <None | ConnectionManager> Placeholder for the connection management object.
-        self.__connect_list_layout - <None | QVBoxLayout> Placeholder for object with layouts describing the connection.
+        self.__connection_list_section - <None | ConnectionListSection> Placeholder for list describing the connection.
         self.__config - <None | dict> dict with configuration
-        self.__table_logs - <None | QTableWidget> An object with a log table
+        self.__table_logs - <None | QTableView> An object with a log table
+        self.__table_logs_model - <None | LogTableModel> Rows of the log table
         self.__table_lane_stat - <None | QTableWidget> An object with a lane stat table
         self.__label_errors - <None | QLabel> Label with number of errors
         self.__number_errors - <int> Number of errors
@@ -69,6 +74,7 @@ class GUI(QDialog):
         self.__show_logs - <bool> Show or hide the log table
         self.__show_lane_stat - <bool> Show or hide the lane stat table
         self.__priority_dropdown - <None | QComboBox> Priority list item to set __min_priority
+        self.__gui_event_bus - <GuiEventBus> Bus with changes of widgets posted by threads of communication
         self.__timer_connect_list_layout - <QTimer> Timer for updating the connection list layout.
         self.__timer_update_table_logs <QTimer> Timer for updating the logs table.
         self.__timer_update_table_lane_stat <QTimer> Timer for updating table with lane stat
@@ -81,8 +87,9 @@ class GUI(QDialog):
         self.__config = None
         self.__log_management = None
         self.__connection_manager = None
-        self.__connect_list_layout = None
+        self.__connection_list_section = None
         self.__table_logs = None
+        self.__table_logs_model = None
         self.__table_lane_stat = None
         self.__label_errors = None
         self.__number_errors = 0
@@ -92,13 +99,14 @@ class GUI(QDialog):
         self.__priority_dropdown = None
         self.__kegeln_program_has_been_started = False
         self.__socket_section = None
+        self.__gui_event_bus = GuiEventBus(self)
         self.__section_lane_control_panel = SectionLaneControlPanel(self)
-        self.__section_clearoff_fast = SectionClearOffTest()
-        self.__section_set_result_from_last_game = SectionSetResultFromLastGame(self)
+        self.__section_clearoff_fast = SectionClearOffTest(self.__gui_event_bus)
+        self.__section_set_result_from_last_game = SectionSetResultFromLastGame(self, self.__gui_event_bus)
 
         self.__action_setting_turn_on_printer = SettingTurnOnPrinter(self)
         self.__action_setting_start_time_in_trial = SettingStartTimeInTrial(self)
-        self.__action_setting_stop_communication = SettingStopCommunicationBeforeTrial(self)
+        self.__action_setting_stop_communication = SettingStopCommunicationBeforeTrial(self, self.__gui_event_bus)
         self.__action_show_result_from_last_block = SettingShowResultOnMonitorFromLastGame(self)
 
         self.__set_layout()
@@ -158,6 +166,7 @@ class GUI(QDialog):
         :logs: CNF_READ_ERROR (10), COM_MNGR_ERROR (10), MAIN_____ERROR (10), COM_MNGR (2), CNF_READ(2), START (0)
         """
         self.__log_management = LogManagement()
+        self.__gui_event_bus.set_on_add_log(self.__log_management.add_log)
         self.__log_management.add_log(0, "START", "", "Aplikacja została uruchomiona")
         try:
             self.__set_working_directory()
@@ -170,6 +179,7 @@ class GUI(QDialog):
             self.__update_table_lane_stat()
 
             self.__log_management.add_log(2, "CNF_READ", "", "Pobrano konfigurację")
+            self.__log_management.set_flush_interval(self.__config.get("log_flush_interval", 1.0))
             self.__log_management.set_minimum_number_of_lines_to_write(
                 self.__config["minimum_number_of_lines_to_write_in_log_file"]
             )
@@ -190,7 +200,24 @@ class GUI(QDialog):
                 self.__config["critical_response_time"],
                 self.__config["warning_response_time"],
                 self.__config["number_of_lane"],
-                self.__action_setting_stop_communication.communication_outgoing_is_enabled
+                self.__action_setting_stop_communication.communication_outgoing_is_enabled,
+                self.__config.get("event_driven_loop", False),
+                self.__config.get("event_loop_max_wait", 0.5),
+                self.__config.get("socket_queue_max_bytes", 0),
+                self.__config.get("socket_queue_max_messages", 0),
+                self.__config.get("socket_queue_overflow_policy", "drop_oldest"),
+                self.__config.get("socket_backend", "select"),
+                self.__config.get("analyze_queue_max_size", 1000),
+                self.__config.get("bad_checksum_policy", "pass"),
+                self.__config.get("lane_stat_percentile_windows", [1000, 0]),
+                self.__config.get("adaptive_timeout", False),
+                self.__config.get("adaptive_timeout_factor", 3.0),
+                self.__config.get("adaptive_timeout_min", 0.2),
+                self.__config.get("adaptive_timeout_min_samples", 50),
+                self.__config.get("adaptive_pacing", False),
+                self.__config.get("adaptive_pacing_min_gap", 150),
+                self.__config.get("adaptive_pacing_max_gap", 2000),
+                self.__config.get("com_max_messages_per_write", 1)
             )
             self.__socket_section.set_default_address(self.__config["default_ip"], self.__config["default_port"])
             self.__socket_section.set_func_to_get_list_ip(self.__connection_manager.on_get_list_ip)
@@ -215,18 +242,18 @@ class GUI(QDialog):
             self.__action_setting_stop_communication.init(self.__config["enable_action_stop_communication_after_block"], self.__log_management.add_log)
             self.__action_show_result_from_last_block.init(self.__config["enable_action_show_result_from_last_block"], self.__log_management.add_log)
 
-            self.__connection_manager.add_func_for_analyze_msg_to_recv(lambda msg: self.__section_set_result_from_last_game.analyze_message_from_lane(msg))
-            self.__connection_manager.add_func_for_analyze_msg_to_recv(lambda msg: self.__action_setting_stop_communication.analyze_message_from_lane(msg))
-            self.__connection_manager.add_func_for_analyze_msg_to_recv(lambda msg: self.__action_show_result_from_last_block.analyze_message_from_lane(msg))
-            self.__connection_manager.add_func_for_analyze_msg_to_recv(lambda msg: self.__section_clearoff_fast.analyze_message_from_lane(msg))
-            self.__connection_manager.add_func_for_analyze_msg_to_recv(lambda msg: self.__section_lane_control_panel.analyze_message_from_lane(msg))
+            self.__connection_manager.add_func_for_analyze_msg_to_recv(lambda msg: self.__section_set_result_from_last_game.analyze_message_from_lane(msg), self.__section_set_result_from_last_game.OPCODES_FROM_LANE)
+            self.__connection_manager.add_func_for_analyze_msg_to_recv(lambda msg: self.__action_setting_stop_communication.analyze_message_from_lane(msg), self.__action_setting_stop_communication.OPCODES_FROM_LANE)
+            self.__connection_manager.add_func_for_observe_msg_from_lane(lambda msg: self.__action_show_result_from_last_block.analyze_message_from_lane(msg), self.__action_show_result_from_last_block.OPCODES_FROM_LANE)
+            self.__connection_manager.add_func_for_analyze_msg_to_recv(lambda msg: self.__section_clearoff_fast.analyze_message_from_lane(msg), self.__section_clearoff_fast.OPCODES_FROM_LANE)
+            self.__connection_manager.add_func_for_analyze_msg_to_recv(lambda msg: self.__section_lane_control_panel.analyze_message_from_lane(msg), self.__section_lane_control_panel.OPCODES_FROM_LANE)
 
-            self.__connection_manager.add_func_for_analyze_msg_to_lane(lambda msg: self.__section_clearoff_fast.analyze_message_to_lane(msg))
-            self.__connection_manager.add_func_for_analyze_msg_to_lane(lambda msg: self.__action_setting_turn_on_printer.analyze_message_to_lane(msg))
-            self.__connection_manager.add_func_for_analyze_msg_to_lane(lambda msg: self.__action_setting_stop_communication.analyze_message_to_lane(msg))
-            self.__connection_manager.add_func_for_analyze_msg_to_lane(lambda msg: self.__action_show_result_from_last_block.analyze_message_to_lane(msg))
-            self.__connection_manager.add_func_for_analyze_msg_to_lane(lambda msg: self.__section_set_result_from_last_game.analyze_message_to_lane(msg))
-            self.__connection_manager.add_func_for_analyze_msg_to_lane(lambda msg: self.__action_setting_start_time_in_trial.analyze_message_to_lane(msg))
+            self.__connection_manager.add_func_for_analyze_msg_to_lane(lambda msg: self.__section_clearoff_fast.analyze_message_to_lane(msg), self.__section_clearoff_fast.OPCODES_TO_LANE)
+            self.__connection_manager.add_func_for_analyze_msg_to_lane(lambda msg: self.__action_setting_turn_on_printer.analyze_message_to_lane(msg), self.__action_setting_turn_on_printer.OPCODES_TO_LANE)
+            self.__connection_manager.add_func_for_analyze_msg_to_lane(lambda msg: self.__action_setting_stop_communication.analyze_message_to_lane(msg), self.__action_setting_stop_communication.OPCODES_TO_LANE)
+            self.__connection_manager.add_func_for_observe_msg_to_lane(lambda msg: self.__action_show_result_from_last_block.analyze_message_to_lane(msg), self.__action_show_result_from_last_block.OPCODES_TO_LANE)
+            self.__connection_manager.add_func_for_analyze_msg_to_lane(lambda msg: self.__section_set_result_from_last_game.analyze_message_to_lane(msg), self.__section_set_result_from_last_game.OPCODES_TO_LANE)
+            self.__connection_manager.add_func_for_analyze_msg_to_lane(lambda msg: self.__action_setting_start_time_in_trial.analyze_message_to_lane(msg), self.__action_setting_start_time_in_trial.OPCODES_TO_LANE)
 
             start_new_thread(self.__connection_manager.start, ())
         except ConfigReaderError as e:
@@ -248,9 +275,7 @@ class GUI(QDialog):
 
         self.__layout.setMenuBar(self.__create_menu_bar())
 
-        connect_list = QGroupBox("Komunikacja")
-        self.__connect_list_layout = QVBoxLayout()
-        connect_list.setLayout(self.__connect_list_layout)
+        self.__connection_list_section = ConnectionListSection()
 
         self.__label_errors = QLabel("Liczba błędów: " + str(self.__number_errors))
 
@@ -278,16 +303,16 @@ class GUI(QDialog):
         row1 = QWidget()
         row1_label = QHBoxLayout()
         row1.setLayout(row1_label)
-        row1_label.addWidget(connect_list)
+        row1_label.addWidget(self.__connection_list_section)
         row1_label.addWidget(col_config)
         self.__layout.addWidget(self.__socket_section)
         self.__layout.addWidget(row1)
 
-        self.__table_logs = QTableWidget()
-        self.__table_logs.setRowCount(0)
-        self.__table_logs.setColumnCount(6)
-        self.__table_logs.setHorizontalHeaderLabels(["Id", "Data", "Priorytet", "Kod", "Port", "Wiadomość"])
+        self.__table_logs_model = LogTableModel(250, 100, self)
+        self.__table_logs = QTableView()
+        self.__table_logs.setModel(self.__table_logs_model)
         self.__table_logs.verticalHeader().setVisible(False)
+        self.__table_logs.horizontalHeader().setStretchLastSection(True)
         self.__table_logs.setVisible(self.__show_logs)
 
         self.__layout.addWidget(self.__table_logs)
@@ -392,37 +417,21 @@ class GUI(QDialog):
         """
         Update list connected devices and received bytes.
         :return:
-            -1 - UI is not ready, __connection_manager or __connect_list_layout is none
+            -1 - UI is not ready, __connection_manager or __connection_list_section is none
             <0, +int> - number of connected devices
         """
-        if self.__connection_manager is None or self.__connect_list_layout is None:
+        if self.__connection_manager is None or self.__connection_list_section is None:
             return -1
 
-        while self.__connect_list_layout.count() > 0:
-            item = self.__connect_list_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-            elif item.layout():
-                item.layout().deleteLater()
-
         data = self.__connection_manager.get_info()
-        number_of_connected_devices = 0
-        for name, rec_communicates, rec_bytes, waiting_messages, duplicates in data:
-            rec = ""
-            if rec_communicates != "0" or rec_bytes != "0":
-                rec = " ( " + rec_communicates + " | " + rec_bytes + " B )"
-            if waiting_messages != "0":
-                rec += " | ( " + waiting_messages + " w kolejce )"
-            if duplicates != "0":
-                rec += " | ( " + duplicates + " duplikatów )"
-            label = QLabel(name + rec)
-            self.__connect_list_layout.addWidget(label)
-            number_of_connected_devices += 1
-        return number_of_connected_devices
+        self.__connection_list_section.update_list(data, self.__connection_manager.get_pipeline_info())
+        return len(data)
 
     def __update_table_logs(self, new_min_priority=None) -> int:
         """
         Update log table and error count display, filtering logs based on priority and updating the UI accordingly.
+        Only logs added since the last update are inserted to the table, all rows are replaced only after change of
+        min priority.
 
         :param new_min_priority: <None | int> - None - min_priority doesn't was changed, int <0, 10> new min priority
         :return:
@@ -436,34 +445,20 @@ class GUI(QDialog):
         if new_min_priority is not None:
             self.__min_priority = int(new_min_priority)
 
-        number_errors = 0
-        data = self.__log_management.get_logs(self.__min_priority, 250, 100)
-        for log in data:
-            if int(log[2]) == 10:
-                number_errors += 1
+        number_errors = self.__log_management.get_number_of_errors(self.__min_priority, 250, 100)
         self.__label_errors.setText("Liczba błędów: " + str(number_errors))
 
         vertical_scroll_bar = self.__table_logs.verticalScrollBar()
         current_scroll_position = vertical_scroll_bar.value()
-        if current_scroll_position > 3 and new_min_priority is None or not self.__show_logs:
+        if current_scroll_position > 3 and new_min_priority is None:
             return 0
 
-        self.__table_logs.setRowCount(0)
-
-        for index, log in enumerate(data):
-            self.__table_logs.insertRow(index)
-            for j, val in enumerate(log):
-                item = QTableWidgetItem(str(val))
-                item.setFlags(item.flags() & ~Qt.ItemIsEditable)
-                if j < 5:
-                    item.setTextAlignment(Qt.AlignCenter)
-                self.__table_logs.setItem(index, j, item)
-                if int(log[2]) == 10:
-                    item.setBackground(QtGui.QColor(255, 100, 100))
-                elif int(log[2]) >= 5:
-                    item.setBackground(QtGui.QColor(255, 255, 225))
-        self.__table_logs.resizeColumnsToContents()
-        self.__adjust_table_width(self.__table_logs, 1000)
+        number_new_rows = self.__table_logs_model.update(self.__log_management, self.__min_priority)
+        if number_new_rows == -1:
+            self.__table_logs.resizeColumnsToContents()
+            self.__adjust_table_width(self.__table_logs, 1000)
+        if not self.__show_logs:
+            return 0
         return 1
 
     def __update_table_lane_stat(self) -> int:
@@ -486,6 +481,7 @@ class GUI(QDialog):
         warning_col = 7
         critical_col = 8
         timeout_col = 9
+        bad_sum_cols = [10, 11]
         for lane_number, lane_data in enumerate(data):
             for j, val in enumerate(lane_data):
                 item = QTableWidgetItem(str(val))
@@ -507,6 +503,11 @@ class GUI(QDialog):
                         item.setBackground(QtGui.QColor(255, 105, 97))
                     else:
                         item.setBackground(QBrush(Qt.NoBrush))
+                elif j in bad_sum_cols:
+                    if val > 0:
+                        item.setBackground(QtGui.QColor(253, 253, 150))
+                    else:
+                        item.setBackground(QBrush(Qt.NoBrush))
         self.__table_lane_stat.resizeColumnsToContents()
         return 1
 
@@ -520,9 +521,10 @@ class GUI(QDialog):
         if self.__table_lane_stat is None:
             return -1
 
-        self.__table_lane_stat.setColumnCount(10)
+        self.__table_lane_stat.setColumnCount(16)
         self.__table_lane_stat.setHorizontalHeaderLabels(
-            ["Σ", "μ50", "μ50-100", "μ250", "μ1000", "μAll", "Max", "Warn", "Critical", "Timeout"])
+            ["Σ", "μ50", "μ50-100", "μ250", "μ1000", "μAll", "Max", "Warn", "Critical", "Timeout", "CRC In", "CRC Out",
+             "p50", "p90", "p95", "p99"])
         self.__table_lane_stat.setVisible(self.__show_lane_stat)
         warning_time = int(self.__config["warning_response_time"] * 1000)
         critical_time = int(self.__config["critical_response_time"] * 1000)
@@ -537,7 +539,16 @@ class GUI(QDialog):
             "Maksymalny czas w milisekundach oczekiwania",
             "Liczba warningów z powodu długiego czekania (ponad {}ms)".format(warning_time),
             "Liczba krytycznie długich oczekiwań (ponad {}ms)".format(critical_time),
-            "Liczba niedoczekania się odpowiedzi (czekano {}ms)".format(timeout_time)
+            "Liczba niedoczekania się odpowiedzi (czekano {}ms)".format(timeout_time),
+            "Liczba wiadomości z toru z błędną sumą kontrolną",
+            "Liczba wiadomości do toru z błędną sumą kontrolną"
+        ]
+        percentile_windows = self.__config.get("lane_stat_percentile_windows", [1000, 0])
+        percentile_window = "wszystkich" if len(percentile_windows) == 0 or percentile_windows[0] == 0 else \
+            "{} ostatnich".format(percentile_windows[0])
+        tooltips += [
+            "Czas w milisekundach, w którym przyszło {}% odpowiedzi z {} razy".format(percentile, percentile_window)
+            for percentile in [50, 90, 95, 99]
         ]
 
         for col, tooltip in enumerate(tooltips):
@@ -562,10 +573,10 @@ class GUI(QDialog):
         )
         return 1
 
-    def __adjust_table_width(self, table: QTableWidget, max_width: int) -> None:
+    def __adjust_table_width(self, table: QTableView, max_width: int) -> None:
         total_width = 0
 
-        for col in range(table.columnCount()):
+        for col in range(table.model().columnCount()):
             total_width += table.columnWidth(col)
 
         total_width += table.verticalHeader().width()
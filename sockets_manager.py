@@ -1,7 +1,10 @@
 import socket
-import select
+import selectors
+import threading
 from typing import Tuple
 
+from utils.send_queues import SendQueues
+
 
 class SocketsManagerError(Exception):
     """
@@ -11,6 +14,7 @@ class SocketsManagerError(Exception):
         11-002 - OverflowError error when creating server socket, it is when was give port number out of range (0-65535)
         11-003 - TypeError - error when creating server socket, it is when was give variable which has wrong type
         11-004 - PortError - error when server port number is out of range, must be from range 0-65535
+        11-005 - ValueError - unknown policy of queue overflow
     """
     def __init__(self, code, message):
         self.code = code
@@ -34,6 +38,8 @@ class SocketsManager:
             SKT_ATST_ERROR - 10 - Wrong data type specified for sending (Add data To Send - Type ERROR)
             SKT_ATSE_ERROR -  10 - Wrong last sign. Must be '\r' (Add data To Send - End sign ERROR)
             SKT_ATSL_ERROR -  10 - New message must has minimum one byte (Add data To Send - Length ERROR)
+            SKT_QOVF_DISCONNECT - 8 - Client socket has been closed, because its queue exceeded limit (Queue OVerFlow)
+            SKT_QOVF_DROP - 8 - The oldest messages have been removed, because queue exceeded limit (Queue OVerFlow)
             SKT_CQUE - 8 - Queue with not send data has been cleared (Cleared QUEue)
             SKT_EQUE - 8 - Queue with not send data was empty (Empty QUEue)
             SKT_RECV_CLOSE - 7 - While recv, class detected that the client socket was closed.
@@ -41,6 +47,7 @@ class SocketsManager:
             SKT_CLSE - 6 - Socket has been closed (CLose Socket Clint)
             SKT_CLSS - 6 - Server socket has been closed (CLose Socket Server)
             SKT_RECV - 5 - Data successfully received (RECeiVed data)
+            SKT_QOVF_SPILL - 5 - The oldest messages have been moved to file, because queue exceeded limit
             SKT_SEND - 3 - Data successfully sent (SENDed data)
             SKT_SRCD - 2 - Socket server was successfully created (SerweR CreateD)
             SKT_ATSD - 1 - Added new data to send queue in socket (Add To SenD)
@@ -48,23 +55,48 @@ class SocketsManager:
 
         :raise SocketsManagerError:
     """
-    def __init__(self, on_add_log):
+    def __init__(self, on_add_log, max_queue_bytes: int = 0, max_queue_messages: int = 0,
+                 overflow_policy: str = "drop_oldest"):
         """
         :param on_add_log: <func(int,str,str,str)> function to add logs
+        :param max_queue_bytes: <int> max number of bytes waiting to send to one client socket (and in queue when
+                                      aren't any client), 0 - without limit
+        :param max_queue_messages: <int> max number of messages waiting to send to one client socket (and in queue
+                                         when aren't any client), 0 - without limit
+        :param overflow_policy: <str> what happens when queue exceeds limit:
+                                        "drop_oldest" - the oldest messages are removed
+                                        "disconnect" - client socket is closed (in queue when aren't any client, the
+                                                       oldest messages are removed)
+                                        "spill_to_disk" - the oldest messages are moved to temporary file and they
+                                                          will be sent before data from memory
+        :raise SocketsManagerError: 11-005
 
         self.__on_add_log - same like in :param on_add_log:
         self.__sockets - <dict> key is descryptor, value is dict with fields:
-                                - data_to_send - <bytes> waiting queue for send data
+                                - is_waiting_to_send - <bool> socket is registered in self.__selector to write, it is
+                                                              only when there are data to send to this socket
                                 - data_to_recv - <bytes> waiting queue for recv, in this var socket wait to sign '\r'
                                 - number_received_bytes - <int> number of recv bytes from data_to_recv
                                 - number_received_communicates - <int> number of recv communicates from data_to_recv
+                                - address - <tuple> address of client, saved when client is accepted
         self.__server_socket - <socket.socket | None> object with server socket, via this socket client can connect with app
-        self.__queue_not_sent_data - <bytes> if aren't any client socket, then every data to send will be there storage
+        self.__data_to_send - <SendQueues> data to send to every client socket (descryptor is key of client), if
+                                           aren't any client socket, then data to send are storage in queue and the
+                                           first connected client takes them
+        self.__selector - <selectors.BaseSelector> registry with server socket and client sockets, which are monitored
+        self.__lock - <threading.RLock> public methods are called by communication thread and GUI thread (e.g. message
+                                        added by user, creating server), so they are used under this lock
         """
+        if overflow_policy not in SendQueues.LIST_POLICY:
+            raise SocketsManagerError("11-005", "ValueError - Unknown policy of queue overflow: {}"
+                                      .format(overflow_policy))
         self.__on_add_log = on_add_log
         self.__sockets = {}
         self.__server_socket = None
-        self.__queue_not_sent_data = b''
+        self.__selector = selectors.DefaultSelector()
+        self.__lock = threading.RLock()
+        self.__data_to_send = SendQueues(on_add_log, lambda socket_el: socket_el.getsockname(), max_queue_bytes,
+                                         max_queue_messages, overflow_policy)
 
 
     @staticmethod
@@ -106,47 +138,71 @@ class SocketsManager:
         :raise SocketsManagerError: 11-001, 11-002, 11-003
         :logs: SKT_SRCD (2)
         """
-        self.__check_types([["ip_addr", ip_addr, [str]], ["port", port, [int]]])
-        self.__check_port_number(port)
-        self.__sockets = {}
-        try:
-            server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            server_address = (ip_addr, port)
-            server_socket.bind(server_address)
-            server_socket.listen(5)
-            server_socket.settimeout(1)
-            self.__on_add_log(2, "SKT_SRCD", "", "Socket server: ip addr: {} port: {}".format(ip_addr, port))
-            self.__server_socket = server_socket
-        except OSError as e:
-            raise SocketsManagerError("11-001", "OSError - Error while create socket server | {}".format(e))
-        except OverflowError as e:
-            raise SocketsManagerError("11-002", "OverflowError - Error while create socket server - "
-                                                "wrong number of port | {}".format(e))
-        except TypeError as e:
-            raise SocketsManagerError("11-003", "TypeError - Error while create socket server - "
-                                                "wrong type of argument | {}".format(e))
-        return True
+        with self.__lock:
+            self.__check_types([["ip_addr", ip_addr, [str]], ["port", port, [int]]])
+            self.__check_port_number(port)
+            for socket_el in self.__sockets:
+                self.__selector.unregister(socket_el)
+            self.__data_to_send.remove_all_clients()
+            self.__sockets = {}
+            try:
+                server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                server_address = (ip_addr, port)
+                server_socket.bind(server_address)
+                server_socket.listen(5)
+                server_socket.settimeout(1)
+                self.__on_add_log(2, "SKT_SRCD", "", "Socket server: ip addr: {} port: {}".format(ip_addr, port))
+                if self.__server_socket is not None:
+                    self.__selector.unregister(self.__server_socket)
+                self.__selector.register(server_socket, selectors.EVENT_READ)
+                self.__server_socket = server_socket
+            except OSError as e:
+                raise SocketsManagerError("11-001", "OSError - Error while create socket server | {}".format(e))
+            except OverflowError as e:
+                raise SocketsManagerError("11-002", "OverflowError - Error while create socket server - "
+                                                    "wrong number of port | {}".format(e))
+            except TypeError as e:
+                raise SocketsManagerError("11-003", "TypeError - Error while create socket server - "
+                                                    "wrong type of argument | {}".format(e))
+            return True
 
     def get_info(self) -> list:
         """
         This method give list with primary information about every sockets with name ip addr and number of recv bytes.
 
-        :return: <list<list<str, str, str>>> -   list of list, in nested list is two str,
+        :return: <list<list<str, str, str, str, str, str>>> -   list of list, in nested list is six str,
                                                     first is ip addr or name
                                                     second is number of communicates,
                                                     third is number of recv bytes
+                                                    fourth is number of messages waiting to send
+                                                    fifth is number of duplicates (always "0")
+                                                    sixth is number of messages removed because of queue overflow
         """
-        result = []
-        for key in list(self.__sockets.keys()):
-            result.append([
-                str(key.getpeername()),
-                str(self.__sockets[key]["number_received_communicates"]),
-                str(self.__sockets[key]["number_received_bytes"]),
-                str(self.__sockets[key]["data_to_send"].count(b"\r")),
-                "0"
-            ])
-        result.append(["Kolejka", str(self.__queue_not_sent_data.count(b"\r")), str(len(self.__queue_not_sent_data)), "0", "0"])
-        return result
+        with self.__lock:
+            result = []
+            for key in list(self.__sockets.keys()):
+                result.append([
+                    str(self.__sockets[key]["address"]),
+                    str(self.__sockets[key]["number_received_communicates"]),
+                    str(self.__sockets[key]["number_received_bytes"]),
+                    str(self.__data_to_send.get_number_of_messages(key)),
+                    "0",
+                    str(self.__data_to_send.get_number_dropped_messages(key))
+                ])
+            queue = SendQueues.QUEUE_NOT_SENT_DATA
+            number_dropped_messages = str(self.__data_to_send.get_number_dropped_messages(queue))
+            if self.__data_to_send.has_queue_not_sent_data():
+                result.append([
+                    "Kolejka",
+                    str(self.__data_to_send.get_number_of_messages(queue)),
+                    str(self.__data_to_send.get_number_of_bytes(queue)),
+                    "0",
+                    "0",
+                    number_dropped_messages
+                ])
+            else:
+                result.append(["Kolejka", "0", "0", "0", "0", number_dropped_messages])
+            return result
 
     def communications(self, enable_send: bool) -> bytes:
         """
@@ -157,30 +213,32 @@ class SocketsManager:
         :return: <bytes> all received data
         :logs: SKT_MNGR_ERROR (10), SKT_MNGR_ERR_2 (10)
         """
-        received_data = b""
-        try:
-            all_skt_read, all_skt_write = list(self.__sockets.keys()), list(self.__sockets.keys())
-            if self.__server_socket is not None:
-                all_skt_read.append(self.__server_socket)
-            if len(all_skt_write) + len(all_skt_read) == 0:
-                return b""
-            list_ready_to_read, list_ready_to_write, _ = select.select(all_skt_read, all_skt_write, [], 0)
-            for socket_el in list_ready_to_read:
-                if socket_el == self.__server_socket:
-                    self.__accept_new_client()
-                else:
-                    received_data += self.__socket_recv(socket_el)[1]
-            if enable_send:
-                for socket_el in list_ready_to_write:
-                    self.__socket_send(socket_el)
-
-        except OSError as e:
-            self.__on_add_log(10, "SKT_MNGR_ERROR", "", "Error occurred while managing sockets connections "
-                                                        "| {}".format(e))
-        except Exception as e:
-            self.__on_add_log(10, "SKT_MNGR_ERR_2", "", "Unexpected error occurred while managing socket "
-                                                        "connections | {}".format(e))
-        return received_data
+        with self.__lock:
+            received_data = b""
+            try:
+                if len(self.__selector.get_map()) == 0:
+                    return b""
+                list_ready_to_write = []
+                for key, events in self.__selector.select(0):
+                    socket_el = key.fileobj
+                    if events & selectors.EVENT_READ:
+                        if socket_el == self.__server_socket:
+                            self.__accept_new_client()
+                        else:
+                            received_data += self.__socket_recv(socket_el)[1]
+                    if events & selectors.EVENT_WRITE:
+                        list_ready_to_write.append(socket_el)
+                if enable_send:
+                    for socket_el in list_ready_to_write:
+                        self.__socket_send(socket_el)
+
+            except OSError as e:
+                self.__on_add_log(10, "SKT_MNGR_ERROR", "", "Error occurred while managing sockets connections "
+                                                            "| {}".format(e))
+            except Exception as e:
+                self.__on_add_log(10, "SKT_MNGR_ERR_2", "", "Unexpected error occurred while managing socket "
+                                                            "connections | {}".format(e))
+            return received_data
 
     def __accept_new_client(self) -> bool:
         """
@@ -198,12 +256,15 @@ class SocketsManager:
             return False
 
         self.__sockets[client_socket] = {
-            "data_to_send": self.__queue_not_sent_data,
+            "is_waiting_to_send": False,
             "data_to_recv": b"",
             "number_received_bytes": 0,
-            "number_received_communicates": 0
+            "number_received_communicates": 0,
+            "address": client_address
         }
-        self.__queue_not_sent_data = b''
+        self.__data_to_send.add_client(client_socket)
+        self.__selector.register(client_socket, selectors.EVENT_READ)
+        self.__update_waiting_to_send(client_socket)
         self.__on_add_log(6, "SKT_ACPT", client_address, "New socket client")
         return True
 
@@ -214,9 +275,9 @@ class SocketsManager:
 
         :param new_bytes_to_send: <bytes> Bytes which will be add to send queue
         :return: <boot> True - successfully, False - was error
-        :logs: SKT_ATST_ERROR (10), SKT_ATSL_ERROR (10), SKT_ATSE_ERROR (10), SKT_ATSD (1), SKT_ATQE (1)
+        :logs: SKT_ATST_ERROR (10), SKT_ATSL_ERROR (10), SKT_ATSE_ERROR (10), SKT_ATSD (1), SKT_ATQE (1),
+               SKT_QOVF_DISCONNECT (8), SKT_QOVF_DROP (8), SKT_QOVF_SPILL (5)
         """
-        # TODO Add limit queue
         if type(new_bytes_to_send) != bytes:
             self.__on_add_log(10, "SKT_ATST_ERROR", "", "Wrong type of data to send: '{}' have type '{}'"
                               .format(new_bytes_to_send, type(new_bytes_to_send).__name__))
@@ -229,14 +290,18 @@ class SocketsManager:
             self.__on_add_log(10, "SKT_ATSE_ERROR", "", "Wrong last sign of data to send, last sign must be '\\r': '{}'"
                               .format(new_bytes_to_send))
             return False
-        if len(self.__sockets):
-            for key in self.__sockets:
-                self.__sockets[key]["data_to_send"] += new_bytes_to_send
-                self.__on_add_log(1, "SKT_ATSD", key.getsockname(), "{}".format(new_bytes_to_send))
-        else:
-            self.__queue_not_sent_data += new_bytes_to_send
-            self.__on_add_log(1, "SKT_ATQE", "", "{}".format(new_bytes_to_send))
-        return True
+        with self.__lock:
+            list_socket_to_close = self.__data_to_send.append(new_bytes_to_send)
+            if len(self.__sockets):
+                for key in self.__sockets:
+                    self.__on_add_log(1, "SKT_ATSD", key.getsockname(), "{}".format(new_bytes_to_send))
+                    if not self.__sockets[key]["is_waiting_to_send"]:
+                        self.__update_waiting_to_send(key)
+            else:
+                self.__on_add_log(1, "SKT_ATQE", "", "{}".format(new_bytes_to_send))
+            for socket_el in list_socket_to_close:
+                self.__socket_close(socket_el)
+            return True
 
     def __socket_recv(self, socket_el: socket.socket) -> Tuple[int, bytes]:
         """
@@ -296,24 +361,37 @@ class SocketsManager:
         """
         if socket_el not in self.__sockets:
             return -1
-        if b"\r" not in self.__sockets[socket_el]["data_to_send"]:
+        if self.__data_to_send.get_number_of_bytes(socket_el) == 0:
+            self.__update_waiting_to_send(socket_el)
             return 0
 
-        position_special_sign = self.__sockets[socket_el]["data_to_send"].rfind(b"\r")
         client_address = socket_el.getsockname()
         try:
-            number_sent_bits = socket_el.send(self.__sockets[socket_el]["data_to_send"][:position_special_sign+2])
+            number_sent_bits, sent_data = self.__data_to_send.send(socket_el, socket_el.send)
         except OSError as e:
             self.__on_add_log(10, "SKT_SEND_ERROR", client_address, "An error occurred while send data | {}".format(e))
             self.__socket_close(socket_el)
             return -2
-
-        sent_data = self.__sockets[socket_el]["data_to_send"][:number_sent_bits]
-        self.__sockets[socket_el]["data_to_send"] = self.__sockets[socket_el]["data_to_send"][number_sent_bits:]
+        self.__update_waiting_to_send(socket_el)
 
         self.__on_add_log(3, "SKT_SEND", client_address, sent_data)
         return number_sent_bits
 
+    def __update_waiting_to_send(self, socket_el: socket.socket) -> None:
+        """
+        This method registers socket in self.__selector to write only if there are data to send to this socket, so
+        sockets without data aren't checked if they are ready to write.
+
+        :param socket_el: <socket.socket> client socket
+        :return: None
+        """
+        is_waiting_to_send = self.__data_to_send.get_number_of_bytes(socket_el) > 0
+        if is_waiting_to_send == self.__sockets[socket_el]["is_waiting_to_send"]:
+            return
+        events = selectors.EVENT_READ | selectors.EVENT_WRITE if is_waiting_to_send else selectors.EVENT_READ
+        self.__selector.modify(socket_el, events)
+        self.__sockets[socket_el]["is_waiting_to_send"] = is_waiting_to_send
+
     def __socket_close(self, socket_el: socket.socket) -> bool:
         """
         This method close socket port and remove from self.__sockets
@@ -324,8 +402,9 @@ class SocketsManager:
         """
         address = socket_el.getsockname()
         removed = self.__sockets.pop(socket_el, None)
-        if removed is not None and len(self.__sockets) == 0:
-            self.__queue_not_sent_data = removed["data_to_send"]
+        if removed is not None:
+            self.__selector.unregister(socket_el)
+            self.__data_to_send.remove_client(socket_el)
         try:
             socket_el.close()
             self.__on_add_log(6, "SKT_CLSC", address, "Socket has been closed")
@@ -341,21 +420,23 @@ class SocketsManager:
         :return: True - closing was ended successfully, False - was error while closing server socket
         :logs: SKT_CLSS_ERROR (10), SKT_CLSS (6)
         """
-        for socket_el in list(self.__sockets.keys()):
-            self.__socket_close(socket_el)
-
-        if self.__server_socket is None:
-            self.__on_add_log(10, "SKT_CCSS_ERROR", "", "Error occurred while trying close closed server socket")
+        with self.__lock:
+            for socket_el in list(self.__sockets.keys()):
+                self.__socket_close(socket_el)
+
+            if self.__server_socket is None:
+                self.__on_add_log(10, "SKT_CCSS_ERROR", "", "Error occurred while trying close closed server socket")
+                return False
+            try:
+                self.__selector.unregister(self.__server_socket)
+                self.__server_socket.close()
+                self.__server_socket = None
+                self.__on_add_log(6, "SKT_CLSS", "", "Socket server has been closed")
+                return True
+            except OSError as e:
+                self.__on_add_log(10, "SKT_CLSS_ERROR", "", "Error occurred while trying close socket server"
+                                                            " | {}".format(e))
             return False
-        try:
-            self.__server_socket.close()
-            self.__server_socket = None
-            self.__on_add_log(6, "SKT_CLSS", "", "Socket server has been closed")
-            return True
-        except OSError as e:
-            self.__on_add_log(10, "SKT_CLSS_ERROR", "", "Error occurred while trying close socket server"
-                                                        " | {}".format(e))
-        return False
 
     def on_clear_queue(self) -> int:
         """
@@ -364,14 +445,13 @@ class SocketsManager:
         :return: <int> number of deleted bytes
         :logs: SKT_CQUE (8), SKT_EQUE (8)
         """
-
-        number_of_deleted_bytes = len(self.__queue_not_sent_data)
-        if number_of_deleted_bytes > 0:
-            self.__queue_not_sent_data = b""
-            self.__on_add_log(8, "SKT_CQUE", "", "Queue with unsent data has been cleared")
-        else:
-            self.__on_add_log(8, "SKT_EQUE", "", "Queue with unsent data was empty")
-        return number_of_deleted_bytes
+        with self.__lock:
+            number_of_deleted_bytes = self.__data_to_send.clear_queue_not_sent_data()
+            if number_of_deleted_bytes > 0:
+                self.__on_add_log(8, "SKT_CQUE", "", "Queue with unsent data has been cleared")
+            else:
+                self.__on_add_log(8, "SKT_EQUE", "", "Queue with unsent data was empty")
+            return number_of_deleted_bytes
 
     @staticmethod
     def get_list_ip():
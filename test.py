@@ -29,14 +29,15 @@
 #     #     if x % 1000000 == 0:
 #     #         print(x)
 from gui.setting_option import SettingStartTimeInTrial
+from utils.messages import LaneMessage
 
 a = SettingStartTimeInTrial(None)
-print(a.analyze_message_to_lane(b'3238P003014078\r'))
-print(a.analyze_message_to_lane(b'3238P00301407\r'))
-print(a.analyze_message_to_lane(b'3238P003014078s\r'))
-print(a.analyze_message_to_lane(b'\r'))
+print(a.analyze_message_to_lane(LaneMessage(b'3238P003014078\r', False)))
+print(a.analyze_message_to_lane(LaneMessage(b'3238P00301407\r', False)))
+print(a.analyze_message_to_lane(LaneMessage(b'3238P003014078s\r', False)))
+print(a.analyze_message_to_lane(LaneMessage(b'\r', False)))
 a.on_toggle()
-print(a.analyze_message_to_lane(b'3238P003014078\r'))
-print(a.analyze_message_to_lane(b'3238P00301407\r'))
-print(a.analyze_message_to_lane(b'3238P003014078s\r'))
-print(a.analyze_message_to_lane(b'\r'))
\ No newline at end of file
+print(a.analyze_message_to_lane(LaneMessage(b'3238P003014078\r', False)))
+print(a.analyze_message_to_lane(LaneMessage(b'3238P00301407\r', False)))
+print(a.analyze_message_to_lane(LaneMessage(b'3238P003014078s\r', False)))
+print(a.analyze_message_to_lane(LaneMessage(b'\r', False)))
\ No newline at end of file
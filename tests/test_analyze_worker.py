@@ -0,0 +1,77 @@
+import threading
+import time
+
+from utils.analyze_worker import AnalyzeWorker, StageStat
+
+
+def test_stage_stat():
+    a = StageStat()
+    assert a.get_number() == 0
+    assert a.get_avg_time() == 0
+    a.add(0.1)
+    a.add(0.3)
+    assert a.get_number() == 2
+    assert abs(a.get_avg_time() - 0.2) < 1e-9
+    assert a.get_max_time() == 0.3
+    a.clear()
+    assert a.get_max_time() == 0
+
+
+def test_observe_in_order():
+    result = []
+    a = AnalyzeWorker(lambda a, b, c, d: None)
+    a.start()
+    for i in range(5):
+        assert a.put([result.append], str(i).encode() + b"\r")
+    a.stop()
+    assert result == [b"0\r", b"1\r", b"2\r", b"3\r", b"4\r"]
+    assert a.get_stat_run().get_number() == 5
+
+
+def test_full_queue_does_not_block():
+    logs = []
+    release = threading.Event()
+    a = AnalyzeWorker(lambda a, b, c, d: logs.append(b), 1)
+    a.start()
+    assert a.put([lambda msg: release.wait(5)], b"A\r")
+    time.sleep(0.1)
+    assert a.put([lambda msg: None], b"B\r")
+    time_start = time.time()
+    assert not a.put([lambda msg: None], b"C\r")
+    assert time.time() - time_start < 0.1
+    assert a.get_number_dropped_messages() == 1
+    assert a.get_number_of_waiting_messages() == 1
+    assert logs == ["ANA_WRK_DROP"]
+    release.set()
+    a.stop()
+
+
+def test_exception_in_func():
+    logs = []
+    result = []
+    a = AnalyzeWorker(lambda a, b, c, d: logs.append(b))
+    a.start()
+    a.put([lambda msg: 1 / 0, result.append], b"A\r")
+    a.stop()
+    assert logs == ["ANA_WRK_ERROR"]
+    assert result == [b"A\r"]
+
+
+def test_stop_with_full_queue():
+    release = threading.Event()
+    list_thread = []
+    a = AnalyzeWorker(lambda a, b, c, d: None, 1)
+    a.start()
+    assert a.put([lambda msg: release.wait(5)], b"A\r")
+    time.sleep(0.1)
+    assert a.put([lambda msg: list_thread.append(threading.get_ident())], b"B\r")
+    assert not a.stop(0.1)
+
+    a.start()
+    release.set()
+    time.sleep(0.1)
+    assert a.put([lambda msg: list_thread.append(threading.get_ident())], b"C\r")
+    time.sleep(0.1)
+    assert a.stop()
+    assert len(list_thread) == 2 and list_thread[0] == list_thread[1]
+    assert a.stop()
@@ -0,0 +1,61 @@
+import socket
+import time
+
+from async_sockets_manager import AsyncSocketsManager
+
+
+def wait_for(condition, timeout=2.0):
+    time_end = time.time() + timeout
+    while not condition() and time.time() < time_end:
+        time.sleep(0.01)
+    return condition()
+
+
+def recv_until(client, expected):
+    data = b""
+    client.settimeout(2)
+    while len(data) < len(expected):
+        data += client.recv(1024)
+    return data
+
+
+def test_send_and_recv():
+    e = []
+    a = AsyncSocketsManager(lambda a, b, c, d: e.append(b))
+    a.create_server("localhost", 50001)
+    assert a.add_bytes_to_send(b"A\r")
+    assert a.get_info() == [['Kolejka', '1', '2', '0', '0', '0']]
+
+    b = socket.create_connection(("localhost", 50001))
+    c = socket.create_connection(("localhost", 50001))
+    assert wait_for(lambda: len(a.get_info()) == 3)
+    assert a.add_bytes_to_send(b"B\r")
+    assert recv_until(b, b"A\rB\r") == b"A\rB\r"
+    assert recv_until(c, b"B\r") == b"B\r"
+
+    b.send(b"3\r4")
+    assert wait_for(lambda: e[-1] == "SKT_RECV")
+    assert a.communications(True) == b"3\r"
+    assert a.communications(True) == b""
+
+    b.close()
+    c.close()
+    assert wait_for(lambda: len(a.get_info()) == 1)
+    assert a.close()
+    assert not a.close()
+    assert e[-1] == "SKT_CCSS_ERROR"
+
+
+def test_disconnect_slow_client():
+    e = []
+    a = AsyncSocketsManager(lambda a, b, c, d: e.append(b), 0, 2, "disconnect")
+    a.create_server("localhost", 50002)
+    b = socket.create_connection(("localhost", 50002))
+    assert wait_for(lambda: len(a.get_info()) == 2)
+    a.communications(False)
+    for _ in range(3):
+        a.add_bytes_to_send(b"M\r")
+    assert wait_for(lambda: len(a.get_info()) == 1)
+    assert "SKT_QOVF_DISCONNECT" in e
+    b.close()
+    assert a.close()
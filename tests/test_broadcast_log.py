@@ -0,0 +1,82 @@
+from utils.broadcast_log import BroadcastLog
+
+
+def send_max(n):
+    sent = []
+
+    def func_send(data):
+        sent.append(bytes(data[:n]))
+        return min(n, len(data))
+    return func_send, sent
+
+
+def test_readers_have_own_offsets():
+    a = BroadcastLog(b"\r", 0)
+    a.add_reader("A")
+    a.append(b"1\r2\r")
+    a.add_reader("B")
+    a.append(b"3\r")
+    assert a.get_number_of_messages("A") == 3 and a.get_number_of_bytes("A") == 6
+    assert a.get_number_of_messages("B") == 1 and a.get_number_of_bytes("B") == 2
+
+    func_send, sent = send_max(3)
+    assert a.send("A", func_send) == (3, b"1\r2")
+    assert a.get_number_of_messages("A") == 2 and a.get_number_of_bytes("A") == 3
+    assert a.send("A", func_send) == (3, b"\r3\r")
+    assert a.send("A", func_send) == (0, b"")
+    assert a.send("B", func_send) == (2, b"3\r")
+    assert a.get_number_of_messages("B") == 0
+
+
+def test_move_and_remove_reader():
+    a = BroadcastLog(b"\r", 0)
+    a.add_reader("Q")
+    a.append(b"1\r")
+    a.append(b"2\r")
+    a.move_reader("Q", "A")
+    assert a.get_number_of_bytes("A") == 4
+    a.remove_reader("A")
+    a.append(b"lost\r")
+    a.add_reader("B")
+    a.append(b"3\r")
+    assert a.get_number_of_bytes("B") == 2
+    assert a.skip("B") == 2
+    assert a.get_number_of_messages("B") == 0
+
+
+def test_trim():
+    a = BroadcastLog(b"\r", 0)
+    a.add_reader("A")
+    a.add_reader("B")
+    a.append(b"11\r22\r")
+    a.append(b"33\r44\r")
+    assert a.trim("A", 7, 0) == b"11\r22\r"
+    assert a.get_number_of_bytes("A") == 6
+    assert a.trim("B", 0, 1) == b"11\r22\r33\r"
+    assert a.get_number_of_messages("B") == 1
+    assert a.trim("B", 0, 1) == b""
+    func_send = lambda data: 2
+    a.send("A", func_send)
+    assert a.trim("A", 3, 0) == b"\r"
+
+
+def test_append_during_send():
+    a = BroadcastLog(b"\r", 0)
+    a.add_reader("A")
+    a.append(b"1\r")
+
+    def func_send(data):
+        a.append(b"2\r")
+        return len(data)
+    assert a.send("A", func_send) == (2, b"1\r")
+    assert a.get_number_of_bytes("A") == 2
+    assert a.send("A", lambda data: len(data)) == (2, b"2\r")
+
+
+def test_send_is_limited_to_max_send_size():
+    a = BroadcastLog(b"\r", 0)
+    a.add_reader("A")
+    a.append(b"x" * BroadcastLog.MAX_SEND_SIZE + b"\r")
+    number_sent_bytes, _ = a.send("A", lambda data: len(data))
+    assert number_sent_bytes == BroadcastLog.MAX_SEND_SIZE
+    assert a.get_number_of_bytes("A") == 1
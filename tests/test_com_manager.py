@@ -130,3 +130,51 @@ def test_send_wrong_type_of_message():
     b = ComManager("COM1", 1, 1, "COM_A", lambda a, b, c, d: print(a, b, c, d))
     b.add_bytes_to_send("aaa")
     b.close()
+
+
+def create_loop_com_manager(monkeypatch, write_timeout, max_messages_per_write):
+    monkeypatch.setattr(serial, "Serial",
+                        lambda port, baudrate, **kwargs: serial.serial_for_url("loop://", baudrate, **kwargs))
+    return ComManager("loop", 0.05, write_timeout, "COM_A", lambda a, b, c, d: None, [b"30", b"31"], 700,
+                      max_messages_per_write)
+
+
+def test_send_coalesced_messages(monkeypatch):
+    b = create_loop_com_manager(monkeypatch, 1, 3)
+    b.add_msg_to_send([], [{"message": m, "time_wait": 0, "priority": 5} for m in [b"30A\r", b"30B\r", b"31C\r"]])
+    b.add_msg_to_send([], [{"message": b"30D\r", "time_wait": -1, "priority": 5}])
+    assert b.send() == (12, b"30A\r31C\r30B\r")
+    assert b.read() == b"30A\r31C\r30B\r"
+    assert b.send() == (0, b"")
+    assert b.get_number_of_waiting_messages_to_send() == 1
+    b.close()
+
+
+def test_send_coalesced_messages_limited_by_write_timeout(monkeypatch):
+    b = create_loop_com_manager(monkeypatch, 0.01, 10)
+    b.add_msg_to_send([], [{"message": m, "time_wait": 0, "priority": 5} for m in [b"30AAA\r", b"31BBB\r"]])
+    assert b.send() == (6, b"30AAA\r")
+    assert b.read() == b"30AAA\r"
+    assert b.send() == (6, b"31BBB\r")
+    b.close()
+
+
+def test_send_again_after_write_timeout(monkeypatch):
+    port = serial.serial_for_url("loop://", 9600, timeout=0.05, write_timeout=1)
+    write = port.write
+    list_error = [serial.SerialTimeoutException("Write timeout")]
+
+    def write_with_timeout(data):
+        if len(list_error) > 0:
+            raise list_error.pop()
+        return write(data)
+
+    port.write = write_with_timeout
+    monkeypatch.setattr(serial, "Serial", lambda *args, **kwargs: port)
+    b = ComManager("loop", 0.05, 1, "COM_A", lambda a, b, c, d: None, [b"30", b"31"], 700, 2)
+    b.add_msg_to_send([], [{"message": m, "time_wait": -1, "priority": 5} for m in [b"30A\r", b"31B\r"]])
+    assert b.send() == (-1, b"")
+    assert b.get_number_of_waiting_messages_to_send() == 2
+    assert b.send() == (8, b"30A\r31B\r")
+    assert b.read() == b"30A\r31B\r"
+    b.close()
@@ -1,6 +1,12 @@
+import time
+
+import pytest
+
 from connection_manager import ConnectionManager
+import com_manager
 import serial
 from _thread import start_new_thread
+from utils.messages import prepare_message
 
 
 def test_one_message_in_one_write():
@@ -74,3 +80,212 @@ def test_no_ended_message():
     com_2.close()
     o.close()
     assert r == b""
+
+
+class FakeLanesPort:
+    """COM port with lanes, lane number i responds to every message after list_delay[i] seconds (None - never), response
+    is sent as from lane list_sender[i] (default lane i), with bad control sum if bad_sum"""
+    def __init__(self, list_delay, timeout, write_timeout, list_sender=None, bad_sum=False):
+        self.baudrate = 9600
+        self.timeout = timeout
+        self.write_timeout = write_timeout
+        self.out_waiting = 0
+        self.list_write = []
+        self.__list_delay = list_delay
+        self.__list_sender = list_sender
+        self.__bad_sum = bad_sum
+        self.__responses = []
+
+    @property
+    def in_waiting(self):
+        return sum(len(response) for time_response, response in self.__responses if time_response <= time.time())
+
+    def read(self, size):
+        time_now = time.time()
+        ready = [response for time_response, response in self.__responses if time_response <= time_now]
+        self.__responses = [item for item in self.__responses if item[0] > time_now]
+        return b"".join(ready)[:size]
+
+    def write(self, data):
+        self.list_write.append(data)
+        if self.__list_delay is not None:
+            for msg in data.split(b"\r")[:-1]:
+                lane = int(msg[1:2])
+                if self.__list_delay[lane] is None:
+                    continue
+                sender = lane if self.__list_sender is None else self.__list_sender[lane]
+                response = prepare_message(b"383" + str(sender).encode() + b"A")
+                if self.__bad_sum:
+                    response = response[:-3] + b"ZZ\r"
+                self.__responses.append((time.time() + self.__list_delay[lane], response))
+        return len(data)
+
+    def receive(self, data):
+        self.__responses.append((time.time(), data))
+
+    def close(self):
+        pass
+
+
+def test_responses_of_lanes_written_together(monkeypatch):
+    ports = {"X": FakeLanesPort([0.05, 0.3], 0.05, 0.05), "Y": FakeLanesPort(None, 0.05, 0.05)}
+    monkeypatch.setattr(com_manager.serial, "Serial", lambda port, baudrate, **kwargs: ports[port])
+    logs = []
+    o = ConnectionManager("X", "Y", 0.05, 0.05, lambda a, b, c, d: logs.append(b), 0.01, 3, 1.0, 0.4, 2,
+                          lambda: True, com_max_messages_per_write=2)
+    o.add_message_to_x(b"3038T24", False, 5, 0)
+    o.add_message_to_x(b"3138T24", False, 5, 0)
+    start_new_thread(o.start, ())
+    time.sleep(2.2)
+    o.stop()
+    time.sleep(0.1)
+    o.close()
+
+    assert len(ports["X"].list_write) == 1 and ports["X"].list_write[0].count(b"\r") == 2
+    stat = o.get_lane_response_stat()
+    assert [stat[0][0], stat[1][0]] == [1, 1]
+    assert stat[0][6] < 300 <= stat[1][6]
+    assert [stat[0][9], stat[1][9]] == [0, 0]
+    assert "CON_ANLS_ERROR_1" not in logs and "CON_ANLS_ERROR_2" not in logs and "CON_ERROR_WAIT" not in logs
+
+
+def test_response_from_other_lane_ends_waiting_without_coalescing(monkeypatch):
+    ports = {"X": FakeLanesPort([0.05, 0.05], 0.05, 0.05, [1, 1]), "Y": FakeLanesPort(None, 0.05, 0.05)}
+    monkeypatch.setattr(com_manager.serial, "Serial", lambda port, baudrate, **kwargs: ports[port])
+    logs = []
+    o = ConnectionManager("X", "Y", 0.05, 0.05, lambda a, b, c, d: logs.append(b), 0.01, 3, 1.0, 0.4, 2,
+                          lambda: True)
+    o.add_message_to_x(b"3038T24", False, 5, 0)
+    o.add_message_to_x(b"3138T24", False, 5, 0)
+    start_new_thread(o.start, ())
+    time.sleep(2.2)
+    o.stop()
+    time.sleep(0.1)
+    o.close()
+
+    assert [msg.count(b"\r") for msg in ports["X"].list_write] == [1, 1]
+    stat = o.get_lane_response_stat()
+    assert [stat[0][0], stat[1][0]] == [0, 1]
+    assert [stat[0][9], stat[1][9]] == [0, 0]
+    assert logs.count("CON_ANLS_ERROR_2") == 1 and "CON_ERROR_WAIT" not in logs
+
+
+def run_with_bad_sum(monkeypatch, policy):
+    ports = {"X": FakeLanesPort([0.05, None], 0.05, 0.05, bad_sum=True), "Y": FakeLanesPort(None, 0.05, 0.05)}
+    ports["Y"].receive(b"3138T24ZZ\r")
+    monkeypatch.setattr(com_manager.serial, "Serial", lambda port, baudrate, **kwargs: ports[port])
+    o = ConnectionManager("X", "Y", 0.05, 0.05, lambda a, b, c, d: None, 0.01, 0.4, 0.3, 0.2, 2, lambda: True,
+                          bad_checksum_policy=policy)
+    o.add_message_to_x(b"3038T24", False, 5, 0)
+    start_new_thread(o.start, ())
+    time.sleep(2.6)
+    o.stop()
+    time.sleep(0.1)
+    o.close()
+    return o, ports
+
+
+def test_bad_sum_pass(monkeypatch):
+    o, ports = run_with_bad_sum(monkeypatch, "pass")
+    stat = o.get_lane_response_stat()
+    assert [stat[0][10], stat[1][11]] == [1, 1]
+    assert [stat[0][0], stat[0][9]] == [1, 0]
+    assert stat[1][9] == 1
+    assert ports["Y"].list_write == [b"3830AZZ\r"]
+    assert o.get_quarantined_messages() == []
+
+
+def test_bad_sum_drop(monkeypatch):
+    o, ports = run_with_bad_sum(monkeypatch, "drop")
+    stat = o.get_lane_response_stat()
+    assert [stat[0][10], stat[1][11]] == [1, 1]
+    assert [stat[0][0], stat[0][9]] == [0, 1]
+    assert [msg[:2] for msg in ports["X"].list_write] == [b"30"]
+    assert ports["Y"].list_write == []
+    assert o.get_quarantined_messages() == []
+
+
+def test_bad_sum_quarantine(monkeypatch):
+    o, ports = run_with_bad_sum(monkeypatch, "quarantine")
+    stat = o.get_lane_response_stat()
+    assert [stat[0][10], stat[1][11]] == [1, 1]
+    assert [stat[0][0], stat[0][9]] == [0, 1]
+    assert b"3138T24ZZ\r" in ports["X"].list_write
+    assert ports["Y"].list_write == [b"3830AZZ\r"]
+    assert o.get_quarantined_messages() == [("COM_Y", b"3138T24ZZ\r"), ("COM_X", b"3830AZZ\r")]
+
+
+def create_adaptive_timeout_manager(monkeypatch, adaptive_timeout=True):
+    ports = {"X": FakeLanesPort(None, 0.05, 0.05), "Y": FakeLanesPort(None, 0.05, 0.05)}
+    monkeypatch.setattr(com_manager.serial, "Serial", lambda port, baudrate, **kwargs: ports[port])
+    return ConnectionManager("X", "Y", 0.05, 0.05, lambda a, b, c, d: None, 0.01, 3, 1.0, 0.4, 2, lambda: True,
+                             adaptive_timeout=adaptive_timeout, adaptive_timeout_factor=3.0, adaptive_timeout_min=0.1,
+                             adaptive_timeout_min_samples=50)
+
+
+def add_response_times(o, lane_id, list_time):
+    response_stat = o._ConnectionManager__history_of_communication_x[lane_id]["response_times"]
+    for time_ms in list_time:
+        response_stat.add(time_ms)
+
+
+def test_response_timeout_without_adaptive_timeout(monkeypatch):
+    o = create_adaptive_timeout_manager(monkeypatch, False)
+    add_response_times(o, 0, [50] * 60)
+    assert o.get_response_timeout(b"3038T24") == 3
+    o.close()
+
+
+def test_response_timeout_of_unknown_lane(monkeypatch):
+    o = create_adaptive_timeout_manager(monkeypatch)
+    assert o.get_response_timeout(b"3538T24") == 3
+    assert o.get_response_timeout(b"3X38T24") == 3
+    assert o.get_response_timeout(b"") == 3
+    o.close()
+
+
+def test_response_timeout_with_too_few_samples(monkeypatch):
+    o = create_adaptive_timeout_manager(monkeypatch)
+    add_response_times(o, 0, [50] * 49)
+    assert o.get_response_timeout(b"3038T24") == 3
+    add_response_times(o, 0, [50])
+    assert o.get_response_timeout(b"3038T24") == pytest.approx(0.15)
+    assert o.get_response_timeout(b"3138T24") == 3
+    o.close()
+
+
+def test_response_timeout_is_p99_multiplied_by_factor(monkeypatch):
+    o = create_adaptive_timeout_manager(monkeypatch)
+    add_response_times(o, 0, [40] * 99 + [60])
+    add_response_times(o, 1, [40] * 98 + [60] * 2)
+    assert o.get_response_timeout(b"3038T24") == pytest.approx(0.12)
+    assert o.get_response_timeout(b"3138T24") == pytest.approx(0.18)
+    o.close()
+
+
+def test_response_timeout_is_clamped(monkeypatch):
+    o = create_adaptive_timeout_manager(monkeypatch)
+    add_response_times(o, 0, [10] * 60)
+    add_response_times(o, 1, [2000] * 60)
+    assert o.get_response_timeout(b"3038T24") == 0.1
+    assert o.get_response_timeout(b"3138T24") == 3
+    o.close()
+
+
+@pytest.mark.parametrize("max_waiting_time_for_response", [0.4, 0.25])
+def test_gap_is_increased_once_after_missing_response(monkeypatch, max_waiting_time_for_response):
+    ports = {"X": FakeLanesPort(None, 0.05, 0.05), "Y": FakeLanesPort(None, 0.05, 0.05)}
+    monkeypatch.setattr(com_manager.serial, "Serial", lambda port, baudrate, **kwargs: ports[port])
+    o = ConnectionManager("X", "Y", 0.05, 0.05, lambda a, b, c, d: None, 0.01, max_waiting_time_for_response, 0.3,
+                          0.2, 2, lambda: True, adaptive_pacing=True, adaptive_pacing_max_gap=5000)
+    assert o.get_lane_gaps() == [700, 700]
+    o.add_message_to_x(b"3038T24", False, 5, 0)
+    start_new_thread(o.start, ())
+    time.sleep(2.2)
+    o.stop()
+    time.sleep(0.1)
+    o.close()
+
+    assert len(ports["X"].list_write) == 1
+    assert o.get_lane_response_stat()[0][9] == 1
+    assert o.get_lane_gaps() == [1400, 700]
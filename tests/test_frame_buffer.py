@@ -0,0 +1,14 @@
+from utils.frame_buffer import FrameBuffer
+
+
+def test_pop_frames():
+    a = FrameBuffer(b"\r")
+    assert a.pop_frames() == []
+    a.append(b"3038")
+    assert a.pop_frames() == [] and len(a) == 4
+    a.append(b"w1\r3138")
+    assert a.pop_frames() == [b"3038w1\r"] and len(a) == 4
+    a.append(b"i\r\r3238p")
+    assert a.pop_frames() == [b"3138i\r", b"\r"]
+    a.append(b"2\r")
+    assert a.pop_frames() == [b"3238p2\r"] and len(a) == 0
@@ -0,0 +1,46 @@
+import pytest
+
+QtCore = pytest.importorskip("PyQt5.QtCore")
+
+from gui.gui_event_bus import GuiEventBus
+
+
+@pytest.fixture
+def app():
+    application = QtCore.QCoreApplication.instance()
+    if application is None:
+        application = QtCore.QCoreApplication([])
+    return application
+
+
+def test_drain_coalesces_by_key(app):
+    result = []
+    a = GuiEventBus(app)
+    a.post(result.append, "A1", key="A")
+    a.post(result.append, "B1", key="B")
+    a.post(result.append, "A2", key="A")
+    assert a.drain() == 2
+    assert result == ["B1", "A2"]
+    assert a.drain() == 0
+
+
+def test_drain_coalesces_by_function(app):
+    result_a, result_b = [], []
+    a = GuiEventBus(app)
+    a.post(result_a.append, 1)
+    a.post(result_b.append, 2)
+    a.post(result_a.append, 3)
+    assert a.drain() == 2
+    assert result_a == [3] and result_b == [2]
+
+
+def test_drain_logs_exception(app):
+    logs = []
+    result = []
+    a = GuiEventBus(app)
+    a.set_on_add_log(lambda a, b, c, d: logs.append((a, b)))
+    a.post(lambda: 1 / 0, key="error")
+    a.post(result.append, "A", key="A")
+    assert a.drain() == 2
+    assert logs == [(10, "GUI_BUS_ERROR")]
+    assert result == ["A"]
@@ -0,0 +1,45 @@
+import time
+from datetime import datetime
+
+from log_management import LogManagement, format_log_datetime, format_log_line
+
+
+def test_format_log_datetime():
+    time_s = time.time()
+    now = datetime.fromtimestamp(time_s)
+    assert format_log_datetime(time_s) == now.strftime("%Y_%m_%d__%H_%M_%S")
+    assert format_log_datetime(time_s, True) == now.strftime("%Y_%m_%d__%H_%M_%S_%f")[:-3]
+    assert format_log_datetime(time_s + 1) == datetime.fromtimestamp(time_s + 1).strftime("%Y_%m_%d__%H_%M_%S")
+
+
+def test_format_log_line():
+    line = format_log_line((7, 0.25, 4, "COM_SEND", ("127.0.0.1", 3000), b"3038T24\r"))
+    assert line == "7.\t{}_250\t4\t{}\t{}\t{}".format(format_log_datetime(0), "COM_SEND".ljust(14),
+                                                      "('127.0.0.1', 3000)".ljust(26), "b'3038T24\\r'")
+
+
+def test_logs_written_and_returned(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    a = LogManagement(100, 60)
+    a.add_log(1, "A", "", "x")
+    a.add_log(10, "B", "COM_X", b"y")
+    a.add_log(5, "C", "", "z")
+    logs = a.get_logs(5, 1, 10)
+    assert [log[3] for log in logs] == ["C", "B"]
+    assert logs[1][5] == "b'y'"
+    a.close_log_file()
+    with open(str(next((tmp_path / "logs").iterdir()))) as file:
+        assert [line.split("\t")[3].strip() for line in file.read().splitlines()] == ["A", "B", "C"]
+
+
+def test_number_of_errors_equals_errors_in_get_logs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    a = LogManagement(100, 60)
+    for priority in [10, 1, 10, 5, 10, 7, 10, 3]:
+        a.add_log(priority, "A", "", "x")
+    for min_priority, number_logs, number_additional_errors in [(5, 2, 1), (5, 2, 10), (0, 100, 0), (6, 1, 0)]:
+        logs = a.get_logs(min_priority, number_logs, number_additional_errors)
+        assert a.get_number_of_errors(min_priority, number_logs, number_additional_errors) == \
+            sum(1 for log in logs if log[2] == 10)
+    assert a.get_number_of_errors(5, 2, 1) == 2
+    a.close_log_file()
@@ -0,0 +1,60 @@
+import random
+
+from log_management import LogManagement
+from utils.log_rows import LogRows
+
+
+class MirroredLogRows(LogRows):
+    """LogRows which copies every change to own list by hooks, like view of Qt model"""
+    def __init__(self, number_logs, number_additional_errors):
+        super().__init__(number_logs, number_additional_errors)
+        self.view = []
+        self.inserted = None
+
+    def _end_reset(self):
+        self.view = list(self.get_rows())
+
+    def _begin_insert(self, first, last):
+        self.inserted = (first, last)
+
+    def _end_insert(self):
+        first, last = self.inserted
+        self.view[first:first] = self.get_rows()[first:last + 1]
+
+    def _begin_remove(self, first, last):
+        del self.view[first:last + 1]
+
+
+def test_rows_equal_get_logs_after_random_updates(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    random.seed(1)
+    log_management = LogManagement(1000, 60)
+    rows = MirroredLogRows(20, 5)
+    min_priority = 3
+    for step in range(300):
+        if step % 50 == 49:
+            min_priority = random.randint(0, 10)
+        for _ in range(random.choice([0, 1, 3, 7, 19, 20, 45])):
+            log_management.add_log(random.choice([0, 1, 3, 5, 7, 9, 10]), "T", "", step)
+        result = rows.update(log_management, min_priority)
+        assert rows.get_rows() == log_management.get_logs(min_priority, 20, 5)
+        assert rows.view == rows.get_rows()
+        assert result == -1 or result <= 45
+    log_management.close_log_file()
+
+
+def test_update_returns_number_of_new_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    log_management = LogManagement(1000, 60)
+    rows = LogRows(3, 1)
+    assert rows.update(log_management, 5) == -1
+    log_management.add_log(10, "E", "", "")
+    log_management.add_log(1, "L", "", "")
+    log_management.add_log(5, "A", "", "")
+    assert rows.update(log_management, 5) == 2
+    log_management.add_log(6, "B", "", "")
+    log_management.add_log(6, "C", "", "")
+    assert rows.update(log_management, 5) == 2
+    assert [row[3] for row in rows.get_rows()] == ["C", "B", "A", "E"]
+    assert rows.get_number_of_errors() == 1
+    log_management.close_log_file()
@@ -0,0 +1,58 @@
+import random
+
+from utils.log_store import LogStore
+
+
+def old_get_logs(log_list, min_priority, number_logs, number_additional_errors):
+    data = []
+    for log in log_list[::-1]:
+        if len(data) >= number_logs + number_additional_errors:
+            continue
+        elif int(log[2]) == 10:
+            data.append(log)
+        elif len(data) >= number_logs:
+            continue
+        elif int(log[2]) >= min_priority:
+            data.append(log)
+    return data
+
+
+def test_the_same_logs_like_walking_list():
+    random.seed(3)
+    a = LogStore(10000, 10000)
+    log_list = []
+    for index in range(1, 3000):
+        record = (index, 0.0, random.choice([0, 1, 2, 4, 5, 7, 8, 10, 10]), "CODE", "", "")
+        a.add(record)
+        log_list.append(record)
+    for min_priority in [0, 3, 5, 10]:
+        for number_logs, number_errors in [(250, 100), (0, 5), (10, 0), (5000, 100)]:
+            assert a.get_logs(min_priority, number_logs, number_errors) == \
+                old_get_logs(log_list, min_priority, number_logs, number_errors)
+    assert a.get_last_index() == 2999
+
+
+def test_bounded_deques():
+    a = LogStore(3, 2)
+    for index in range(1, 11):
+        a.add((index, 0.0, 1, "", "", ""))
+    a.add((11, 0.0, 10, "", "", ""))
+    a.add((12, 0.0, 10, "", "", ""))
+    a.add((13, 0.0, 10, "", "", ""))
+    assert [log[0] for log in a.get_logs(0, 100, 100)] == [13, 12, 10, 9, 8]
+
+
+def test_priority_out_of_range():
+    a = LogStore()
+    a.add((1, 0.0, 12, "", "", ""))
+    a.add((2, 0.0, -1, "", "", ""))
+    assert [log[0] for log in a.get_logs(0, 10, 0)] == [2, 1]
+
+
+def test_logs_after_index():
+    a = LogStore()
+    for index, priority in enumerate([1, 5, 10, 2, 7], 1):
+        a.add((index, 0.0, priority, "", "", ""))
+    assert [log[0] for log in a.get_logs_after(2, 5, 10)] == [5, 3]
+    assert [log[0] for log in a.get_logs_after(0, 0, 2)] == [5, 4]
+    assert a.get_logs_after(5, 0, 10) == []
@@ -0,0 +1,44 @@
+import time
+
+from utils.log_writer import LogWriter
+
+
+def read(path):
+    with open(str(path)) as file:
+        return file.read()
+
+
+def test_lines_written_after_close(tmp_path):
+    path = tmp_path / "a.log"
+    a = LogWriter(str(path), 100, 60)
+    a.put("A")
+    a.put("B")
+    time.sleep(0.1)
+    assert read(path) == ""
+    a.close()
+    assert read(path) == "A\nB\n"
+    assert not a.put("C")
+
+
+def test_urgent_line_written_immediately(tmp_path):
+    path = tmp_path / "a.log"
+    a = LogWriter(str(path), 100, 60)
+    a.put("A")
+    a.put("B", is_urgent=True)
+    time.sleep(0.2)
+    assert read(path) == "A\nB\n"
+    a.close()
+
+
+def test_lines_written_by_size_and_interval(tmp_path):
+    path = tmp_path / "a.log"
+    a = LogWriter(str(path), 2, 60)
+    a.put("A")
+    a.put("B")
+    time.sleep(0.2)
+    assert read(path) == "A\nB\n"
+    a.set_flush_interval(0.1)
+    a.put("C")
+    time.sleep(0.4)
+    assert read(path) == "A\nB\nC\n"
+    a.close()
@@ -0,0 +1,70 @@
+from utils.messages import LaneMessage, prepare_message, calculate_message_control_sum, \
+    is_message_control_sum_valid, prepare_command_message, prepare_message_to_lane, prepare_z_message, COMMANDS
+
+
+def test_lane_message_throw():
+    raw = prepare_message(b"3831w00A00400F07B000000000003000")
+    msg = LaneMessage(raw, True)
+    assert len(msg) == 35
+    assert msg.lane == 1
+    assert msg.kind == b"w"
+    assert msg.is_throw
+    assert msg.throw_number == 10
+    assert msg.total_sum == 0x7B
+    assert msg.next_layout == b"000"
+    assert msg.fallen_pins == b"003"
+    assert msg.is_checksum_valid
+    assert str(msg) == str(raw)
+
+
+def test_lane_message_to_lane():
+    raw = prepare_message(b"3238IG078000000A201000")
+    msg = LaneMessage(raw, False)
+    assert msg.lane == 2
+    assert msg.opcode == b"IG"
+    assert not msg.is_throw
+    assert msg.throw_number is None
+    assert msg.total_sum == 0xA20
+    assert msg.is_checksum_valid
+
+
+def test_lane_message_invalid():
+    msg = LaneMessage(b"383xi0FF\r", True)
+    assert msg.lane is None
+    assert msg.total_sum is None
+    assert not msg.is_checksum_valid
+    msg = LaneMessage(b"\r", False)
+    assert msg.lane is None
+    assert msg.opcode == b""
+    assert not msg.is_checksum_valid
+
+
+def old_calculate_control_sum(message):
+    sum_ascii = 0
+    for x in message:
+        sum_ascii += x
+    return bytes(hex(sum_ascii).split("x")[-1].upper()[-2:], 'utf-8')
+
+
+def test_control_sum_like_old():
+    import random
+    random.seed(1)
+    for message in [b"", b"\x01", b"\x0f", b"\x10", b"3138T14", b"\xff" * 100]:
+        assert calculate_message_control_sum(message) == old_calculate_control_sum(message)
+    for _ in range(1000):
+        message = bytes(random.randrange(256) for _ in range(random.randrange(40)))
+        assert calculate_message_control_sum(message) == old_calculate_control_sum(message)
+
+
+def test_control_sum_valid():
+    assert is_message_control_sum_valid(prepare_message(b"3138T14"))
+    assert not is_message_control_sum_valid(b"3138T1400\r")
+    assert not is_message_control_sum_valid(b"\r")
+
+
+def test_prepare_command_and_z():
+    for command in COMMANDS + (b"X99",):
+        assert prepare_command_message(b"3138", command) == prepare_message(b"3138" + command)
+    assert prepare_message_to_lane(2, b"T24") == prepare_message(b"3238T24")
+    assert prepare_z_message(b"3138", b"00A", b"004", b"00F", b"07B", b"000", b"001", b"002", b"003", b"004") == \
+        prepare_message(b"3138Z00A00400F07B000001002003004")
@@ -0,0 +1,30 @@
+from utils.opcode_dispatcher import OpcodeDispatcher
+
+
+def test_get_funcs():
+    a = OpcodeDispatcher()
+    f_all = lambda msg: None
+    f_ig = lambda msg: None
+    f_p = lambda msg: None
+    f_throw = lambda msg: None
+    a.add(f_all)
+    a.add(f_ig, [b"IG"])
+    a.add(f_p, [b"P"])
+    a.add(f_throw, [b"i0", b"w", b"g"])
+    assert len(a) == 4
+    assert a.get_funcs(b"3838IG0000000\r") == [f_all, f_ig]
+    assert a.get_funcs(b"3031P000000\r") == [f_all, f_p]
+    assert a.get_funcs(b"3831i0F1\r") == [f_all, f_throw]
+    assert a.get_funcs(b"3831w01000\r") == [f_all, f_throw]
+    assert a.get_funcs(b"3831i1F1\r") == [f_all]
+    assert a.get_funcs(b"\r") == [f_all]
+
+
+def test_cache_after_add():
+    a = OpcodeDispatcher()
+    assert a.get_funcs(b"3838IG0000000\r") == []
+    f_ig = lambda msg: None
+    a.add(f_ig, [b"IG"])
+    assert a.get_funcs(b"3838IG0000000\r") == [f_ig]
+    a.add(f_ig, [])
+    assert a.get_funcs(b"3838IG0000000\r") == [f_ig]
@@ -0,0 +1,43 @@
+from utils.pacing_controller import PacingController
+
+
+def test_initial_gap():
+    a = PacingController(3, 700, 150, 2000)
+    assert a.get_list_gap() == [700, 700, 700]
+    assert PacingController(1, 3000, 150, 2000).get_gap(0) == 2000
+
+
+def test_gap_decreases_to_response_time_with_margin():
+    a = PacingController(2, 700, 150, 2000)
+    assert a.on_response(0, 100) == 690
+    for _ in range(100):
+        a.on_response(0, 100)
+    assert a.get_gap(0) == 100 + PacingController.SAFETY_MARGIN
+    assert a.get_gap(1) == 700
+
+
+def test_gap_not_below_min_gap():
+    a = PacingController(1, 700, 150, 2000)
+    for _ in range(100):
+        a.on_response(0, 10)
+    assert a.get_gap(0) == 150
+
+
+def test_gap_increases_after_missing_response():
+    a = PacingController(1, 700, 150, 2000)
+    assert a.on_missing_response(0) == 1400
+    assert a.on_missing_response(0) == 2000
+    a.clear()
+    assert a.get_gap(0) == 700
+
+
+def test_response_never_increases_gap():
+    a = PacingController(1, 200, 150, 2000)
+    for _ in range(100):
+        a.on_response(0, 400)
+    assert a.get_gap(0) == 200
+    a.on_missing_response(0)
+    a.on_missing_response(0)
+    for _ in range(100):
+        a.on_response(0, 400)
+    assert a.get_gap(0) == 400 + PacingController.SAFETY_MARGIN
@@ -0,0 +1,54 @@
+from utils.pending_responses import PendingResponses
+
+
+def test_responses_are_matched_per_key():
+    a = PendingResponses(0.4, 1.0)
+    a.add(0, b"30A\r", 10.0, 3)
+    a.add(1, b"31B\r", 10.0, 3)
+    a.add(0, b"30C\r", 10.0, 3)
+    assert a.pop(1)[0] == b"31B\r"
+    assert a.pop(1) is None
+    assert a.pop(0)[0] == b"30A\r"
+    assert a.is_waiting()
+    assert a.pop(0)[0] == b"30C\r"
+    assert not a.is_waiting()
+
+
+def test_pop_oldest_from_any_key():
+    a = PendingResponses(0.4, 1.0)
+    assert a.pop_oldest() is None
+    a.add(1, b"31B\r", 11.0, 3)
+    a.add(None, b"38A\r", 10.0, 3)
+    assert a.pop_oldest()[0] == b"38A\r"
+    assert a.pop_oldest()[0] == b"31B\r"
+    assert not a.is_waiting()
+
+
+def test_check_reports_every_stage_once():
+    a = PendingResponses(0.4, 1.0)
+    a.add(0, b"30A\r", 10.0, 2)
+    a.add(1, b"31B\r", 10.0, 3)
+    assert a.check(10.3, True) == []
+    assert a.get_next_deadline(True) == 10.4
+    assert a.check(10.5, True) == [(b"30A\r", 2, 2), (b"31B\r", 2, 2)]
+    assert a.check(10.6, True) == []
+    assert a.check(11.5, True) == [(b"30A\r", 1, 1), (b"31B\r", 1, 1)]
+    assert a.get_next_deadline(True) == 12.0
+    assert a.check(12.0, True) == [(b"30A\r", 0, 1)]
+    assert a.pop(1)[3] == 1
+    assert not a.is_waiting()
+
+
+def test_no_timeout_when_checking_timeout_is_disabled():
+    a = PendingResponses(0.4, 1.0)
+    a.add(None, b"38A\r", 10.0, 1)
+    assert a.check(20.0, False) == [(b"38A\r", 2, 2), (b"38A\r", 1, 1)]
+    assert a.get_next_deadline(False) is None
+    assert a.is_waiting()
+    assert a.check(20.0, True) == [(b"38A\r", 0, 1)]
+
+
+def test_timeout_before_warning_time():
+    a = PendingResponses(0.4, 1.0)
+    a.add(0, b"30A\r", 10.0, 0.2)
+    assert a.check(10.2, True) == [(b"30A\r", 0, 3)]
@@ -0,0 +1,81 @@
+import random
+
+from utils.response_stat import ResponseStat, LatencyHistogram
+
+
+def old_stat(list_all, left_max):
+    data_lane = [len(list_all)]
+    for n in [50, [100, 50], 250, 1000, len(list_all)]:
+        left = n[0] if isinstance(n, list) else n
+        right = n[1] if isinstance(n, list) else 0
+        l = list_all[-left:-right] if right > 0 else list_all[-left:]
+        if len(list_all) <= right:
+            data_lane.append("")
+        elif len(l) == 0:
+            data_lane.append(0)
+        else:
+            data_lane.append(int(sum(l) / len(l)))
+    list_max = list_all[left_max:]
+    data_lane.append(0 if len(list_max) == 0 else max(list_max))
+    return data_lane
+
+
+def new_stat(a):
+    if a.get_number() == 0:
+        return [0, "", "", "", "", "", a.get_max()]
+    return [a.get_number(), a.get_avg_last(50), a.get_avg_between(50, 100), a.get_avg_last(250),
+            a.get_avg_last(1000), a.get_avg_all(), a.get_max()]
+
+
+def test_like_list():
+    random.seed(2)
+    a = ResponseStat()
+    list_all = []
+    left_max = 0
+    assert new_stat(a) == old_stat(list_all, left_max)
+    for i in range(2500):
+        value = random.randrange(2000)
+        a.add(value)
+        list_all.append(value)
+        if i == 1700:
+            a.clear_max()
+            left_max = len(list_all)
+        if i < 120 or i % 97 == 0:
+            assert new_stat(a) == old_stat(list_all, left_max)
+
+
+def test_limit_of_time():
+    a = ResponseStat()
+    a.add(100000)
+    a.add(-5)
+    assert a.get_max() == ResponseStat.MAX_TIME
+    assert a.get_avg_all() == ResponseStat.MAX_TIME // 2
+
+
+def exact_percentile(values, percentile):
+    values = sorted(values)
+    rank = max(1, -(-percentile * len(values) // 100))
+    return values[rank - 1]
+
+
+def test_histogram_percentiles():
+    random.seed(3)
+    a = LatencyHistogram()
+    assert a.get_percentiles([50]) == []
+    values = [int(random.expovariate(1 / 300)) for _ in range(5000)]
+    for value in values:
+        a.add(min(value, 65535))
+    for percentile, value in zip([50, 90, 99, 100], a.get_percentiles([50, 90, 99, 100])):
+        exact = exact_percentile(values, percentile)
+        assert exact <= value <= exact * 1.032 + 1
+
+
+def test_percentiles_in_window():
+    a = ResponseStat((100, 0))
+    for _ in range(100):
+        a.add(1000)
+    for _ in range(100):
+        a.add(10)
+    assert a.get_percentiles(100, [50, 99]) == [10, 10]
+    assert a.get_percentiles(0, [50, 99]) == [10, LatencyHistogram.get_bucket_value(LatencyHistogram.get_bucket(1000))]
+    assert sorted(a.get_percentile_windows()) == [0, 100]
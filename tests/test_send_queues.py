@@ -0,0 +1,46 @@
+from utils.send_queues import SendQueues
+
+
+def send_all(data):
+    return len(data)
+
+
+def test_queue_not_sent_data_goes_to_first_client():
+    a = SendQueues(lambda a, b, c, d: None, str)
+    a.append(b"1\r")
+    assert a.has_queue_not_sent_data()
+    a.add_client("A")
+    a.add_client("B")
+    assert not a.has_queue_not_sent_data()
+    a.append(b"2\r")
+    assert a.send("A", send_all) == (4, b"1\r2\r")
+    assert a.send("B", send_all) == (2, b"2\r")
+
+    a.append(b"3\r")
+    a.remove_client("A")
+    a.remove_client("B")
+    assert a.get_number_of_messages(SendQueues.QUEUE_NOT_SENT_DATA) == 1
+    assert a.clear_queue_not_sent_data() == 2
+
+
+def test_overflow_policy():
+    e = []
+    a = SendQueues(lambda a, b, c, d: e.append(b), str, 0, 1, "drop_oldest")
+    a.add_client("A")
+    assert a.append(b"1\r") == []
+    assert a.append(b"2\r") == []
+    assert a.get_number_dropped_messages("A") == 1 and e[-1] == "SKT_QOVF_DROP"
+
+    a = SendQueues(lambda a, b, c, d: e.append(b), str, 0, 1, "disconnect")
+    a.add_client("A")
+    a.append(b"1\r")
+    assert a.append(b"2\r") == ["A"] and e[-1] == "SKT_QOVF_DISCONNECT"
+
+    a = SendQueues(lambda a, b, c, d: e.append(b), str, 0, 1, "spill_to_disk")
+    a.add_client("A")
+    a.append(b"1\r")
+    a.append(b"2\r")
+    a.append(b"3\r")
+    assert a.get_number_of_messages("A") == 3 and e[-1] == "SKT_QOVF_SPILL"
+    assert a.send("A", send_all) == (4, b"1\r2\r")
+    assert a.send("A", send_all) == (2, b"3\r")
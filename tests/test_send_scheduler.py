@@ -0,0 +1,136 @@
+from utils.send_scheduler import SendScheduler
+
+
+def msg(message, priority=5, time_wait=-1):
+    return {"message": message, "time_wait": time_wait, "priority": priority}
+
+
+def test_empty():
+    a = SendScheduler(3, 700)
+    assert a.get_message_to_send(1000) == (-1, None)
+    assert a.get_time_to_next_message(1000) is None
+    assert a.get_number_of_messages() == 0
+
+
+def test_time_wait_between_messages_on_bucket():
+    a = SendScheduler(2, 700)
+    a.add_message_end(0, msg(b"A\r"))
+    a.add_message_end(0, msg(b"B\r"))
+    assert a.get_number_of_messages() == 2
+
+    bucket_index, m = a.get_message_to_send(1000)
+    assert bucket_index == 0 and m["message"] == b"A\r"
+    a.mark_message_as_sent(bucket_index, 1000)
+
+    assert a.get_message_to_send(1500) == (-1, None)
+    assert a.get_time_to_next_message(1500) == 200
+    bucket_index, m = a.get_message_to_send(1700)
+    assert bucket_index == 0 and m["message"] == b"B\r"
+    a.mark_message_as_sent(bucket_index, 1700)
+    assert a.get_time_to_next_message(1700) is None
+
+
+def test_own_time_wait_of_message():
+    a = SendScheduler(1, 700)
+    a.add_message_end(0, msg(b"A\r", time_wait=0))
+    a.mark_message_as_sent(a.get_message_to_send(1000)[0], 1000)
+    a.add_message_end(0, msg(b"B\r", time_wait=0))
+    a.add_message_end(0, msg(b"C\r", time_wait=800))
+    assert a.get_message_to_send(1000)[1]["message"] == b"B\r"
+    a.mark_message_as_sent(0, 1000)
+    assert a.get_time_to_next_message(1000) == 800
+
+
+def test_priority_and_round_robin():
+    a = SendScheduler(3, 0)
+    for i in range(3):
+        a.add_message_end(i, msg(bytes([65 + i]) + b"1\r"))
+        a.add_message_end(i, msg(bytes([65 + i]) + b"2\r"))
+    a.add_message_end(1, msg(b"X\r", priority=9))
+
+    sent = []
+    time_now = 0
+    while a.get_number_of_messages() > 0:
+        bucket_index, m = a.get_message_to_send(time_now)
+        sent.append(m["message"])
+        a.mark_message_as_sent(bucket_index, time_now)
+        time_now += 1
+    assert sent == [b"A1\r", b"B1\r", b"C1\r", b"A2\r", b"B2\r", b"X\r", b"C2\r"]
+
+    a.add_message_end(2, msg(b"L\r", priority=1))
+    a.add_message_end(0, msg(b"H\r", priority=9))
+    assert a.get_message_to_send(time_now)[1]["message"] == b"H\r"
+
+
+def test_message_at_front_changes_time_wait():
+    a = SendScheduler(1, 700)
+    a.add_message_end(0, msg(b"A\r"))
+    a.mark_message_as_sent(0, 1000)
+    a.add_message_end(0, msg(b"B\r"))
+    assert a.get_time_to_next_message(1000) == 700
+    a.add_message_front(0, msg(b"C\r", priority=9, time_wait=0))
+    assert a.get_time_to_next_message(1000) == 0
+    assert a.get_message_to_send(1000)[1]["message"] == b"C\r"
+
+
+def test_duplicates():
+    a = SendScheduler(2, 700)
+    m = msg(b"A\r")
+    assert a.add_message_end(0, m) is None
+    assert a.add_message_end(0, msg(b"B\r")) is None
+    assert a.add_message_end(0, msg(b"A\r"))["message"] == b"A\r"
+    assert a.add_message_end(1, msg(b"A\r")) is None
+    assert a.get_number_of_messages() == 3
+
+    assert a.add_message_front(0, msg(b"B\r", priority=9)) is not None
+    assert a.get_number_of_messages() == 3
+    assert a.get_message_to_send(1000)[1]["message"] == b"B\r"
+    a.mark_message_as_sent(0, 1000)
+    assert a.get_message_to_send(1700)[0] == 1
+    a.mark_message_as_sent(1, 1700)
+    assert a.get_message_to_send(1700) == (0, m)
+    a.mark_message_as_sent(0, 1700)
+    assert a.get_number_of_messages() == 0
+    assert a.get_time_to_next_message(1700) is None
+
+
+def test_default_time_wait_of_bucket():
+    a = SendScheduler(2, 700)
+    a.add_message_end(0, msg(b"A\r"))
+    a.add_message_end(0, msg(b"B\r"))
+    a.mark_message_as_sent(a.get_message_to_send(1000)[0], 1000)
+    assert a.get_time_to_next_message(1000) == 700
+    a.set_default_time_wait(0, 200)
+    assert a.get_default_time_wait(0) == 200
+    assert a.get_default_time_wait(1) == 700
+    assert a.get_time_to_next_message(1000) == 200
+    assert a.get_message_to_send(1200)[1]["message"] == b"B\r"
+
+
+def test_get_messages_to_send_like_sending_one_by_one():
+    a = SendScheduler(3, 0)
+    b = SendScheduler(3, 0)
+    for s in [a, b]:
+        s.add_message_end(0, msg(b"A1\r"))
+        s.add_message_end(0, msg(b"A2\r", time_wait=100))
+        s.add_message_end(1, msg(b"B1\r"))
+        s.add_message_end(1, msg(b"B2\r", priority=9))
+        s.add_message_end(2, msg(b"C1\r"))
+        s.add_message_end(2, msg(b"C1\r"))
+
+    list_msg = a.get_messages_to_send(0, 10)
+    assert a.get_number_of_messages() == 5
+    sent = []
+    while True:
+        bucket_index, m = b.get_message_to_send(0)
+        if m is None:
+            break
+        sent.append((bucket_index, m))
+        b.mark_message_as_sent(bucket_index, 0)
+    assert list_msg == sent
+    assert a.get_messages_to_send(0, 2) == sent[:2]
+
+    for bucket_index, _ in list_msg:
+        a.mark_message_as_sent(bucket_index, 0)
+    assert a.get_messages_to_send(99, 10) == []
+    assert [m["message"] for _, m in a.get_messages_to_send(100, 10)] == [b"A2\r"]
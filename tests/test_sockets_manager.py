@@ -142,7 +142,7 @@ def test_0_client():
     assert a.add_bytes_to_send(b"DEF\r")
     assert e[-1] == "SKT_ATQE"
 
-    assert a._SocketsManager__queue_not_sent_data == b"ABC\rDEF\r"
+    assert a.get_info() == [['Kolejka', '2', '8', '0', '0', '0']]
 
     assert a.communications() == b""
 
@@ -196,9 +196,9 @@ def test_1_client():
     d.start()
     while len(a.get_info()) == 1:
         assert a.communications() == b""
-    assert a._SocketsManager__sockets[list(a._SocketsManager__sockets)[0]]["data_to_send"] == b"D\rE\r"
+    assert a.get_info()[0][3] == "2"
     assert a.communications() == b""
-    assert a._SocketsManager__sockets[list(a._SocketsManager__sockets)[0]]["data_to_send"] == b""
+    assert a.get_info()[0][3] == "0"
     while True:
         x = a.communications()
         assert x in [b"", b'3\xde\xae\xde\xef\xa6\xce\xce\xce\xce~\xce\xee\xfa\xaf\xfc\r3\r']
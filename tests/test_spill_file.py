@@ -0,0 +1,15 @@
+from utils.spill_file import SpillFile
+
+
+def test_fifo():
+    a = SpillFile(b"\r")
+    a.write(b"11\r22\r")
+    a.write(b"33\r")
+    assert a.get_number_of_bytes() == 9 and a.get_number_of_messages() == 3
+    assert a.peek(4) == b"11\r2"
+    a.consume(b"11\r2")
+    assert a.get_number_of_bytes() == 5 and a.get_number_of_messages() == 2
+    assert a.peek(100) == b"2\r33\r"
+    a.consume(b"2\r33\r")
+    assert a.get_number_of_bytes() == 0 and a.get_number_of_messages() == 0
+    a.close()
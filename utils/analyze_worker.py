@@ -0,0 +1,198 @@
+"""This module runs functions which only observe messages in own thread, so they don't delay forwarding"""
+import queue
+import threading
+import time
+
+
+class StageStat:
+    """
+        This class keeps statistic of time spent by messages in one stage of communication
+    """
+    def __init__(self):
+        """
+        self.__number - <int> number of measurements
+        self.__sum_time - <float> sum of measured times in seconds
+        self.__max_time - <float> the longest measured time in seconds
+        """
+        self.__number = 0
+        self.__sum_time = 0.0
+        self.__max_time = 0.0
+
+    def add(self, time_s: float) -> None:
+        """
+        :param time_s: <float> measured time in seconds
+        :return: None
+        """
+        self.__number += 1
+        self.__sum_time += time_s
+        if time_s > self.__max_time:
+            self.__max_time = time_s
+
+    def get_number(self) -> int:
+        """
+        :return: <int> number of measurements
+        """
+        return self.__number
+
+    def get_avg_time(self) -> float:
+        """
+        :return: <float> average time in seconds, 0 if there was no measurement
+        """
+        if self.__number == 0:
+            return 0.0
+        return self.__sum_time / self.__number
+
+    def get_max_time(self) -> float:
+        """
+        :return: <float> the longest time in seconds
+        """
+        return self.__max_time
+
+    def clear(self) -> None:
+        """
+        :return: None
+        """
+        self.__number = 0
+        self.__sum_time = 0.0
+        self.__max_time = 0.0
+
+
+class AnalyzeWorker:
+    """
+        This class calls functions which only observe messages (e.g. copy files when message was received), their
+        results are ignored. Messages wait in bounded queue, when queue is full, then message is dropped, so slow
+        function never stops forwarding of messages between COM ports.
+
+        Thread ends after stop, when queue is empty. It clears self.__thread itself, so start never runs second thread
+        while the previous one is still observing messages, it only cancels stopping of the previous one.
+
+        Logs:
+            ANA_WRK_ERROR - 10 - Function which observes message raised exception
+            ANA_WRK_DROP - 8 - Queue is full, so message won't be observed
+    """
+    WAIT_FOR_MESSAGE = 0.1
+
+    def __init__(self, on_add_log, max_queue_size: int = 1000):
+        """
+        :param on_add_log: <func(int,str,str,str)> function to add logs
+        :param max_queue_size: <int> max number of messages waiting to observe, 0 - without limit
+
+        self.__queue - <queue.Queue> items (list of functions, message, time of put), None wakes thread to check if
+                       it should stop
+        self.__thread - <threading.Thread | None> running thread, None - thread ended
+        self.__is_stopping - <bool> True - thread ends when queue is empty
+        self.__lock - <threading.Lock> lock of self.__thread and self.__is_stopping
+        self.__stat_wait - <StageStat> time from put to the beginning of calling functions
+        self.__stat_run - <StageStat> time of calling all functions for one message
+        """
+        self.__on_add_log = on_add_log
+        self.__queue = queue.Queue(max_queue_size)
+        self.__thread = None
+        self.__is_stopping = False
+        self.__lock = threading.Lock()
+        self.__number_dropped_messages = 0
+        self.__stat_wait = StageStat()
+        self.__stat_run = StageStat()
+
+    def start(self) -> None:
+        """
+        This method starts thread which calls functions
+
+        :return: None
+        """
+        with self.__lock:
+            self.__is_stopping = False
+            if self.__thread is not None:
+                return
+            self.__thread = threading.Thread(target=self.__run, daemon=True)
+            self.__thread.start()
+
+    def stop(self, timeout: float = 1.0) -> bool:
+        """
+        This method stops thread after observing messages which are already in queue
+
+        :param timeout: <float> max time in seconds of waiting for end of thread
+        :return: <bool> True - thread ended, False - thread is still observing messages, it will end when queue is empty
+        """
+        with self.__lock:
+            thread = self.__thread
+            if thread is None:
+                return True
+            self.__is_stopping = True
+        try:
+            self.__queue.put_nowait(None)
+        except queue.Full:
+            pass
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def put(self, list_func: list, message) -> bool:
+        """
+        This method adds message to queue, it never blocks
+
+        :param list_func: <list[func(LaneMessage)]> functions which will be called with message
+        :param message: <LaneMessage> message given to functions
+        :return: <bool> True - message was added, False - queue is full, message was dropped
+        :logs: ANA_WRK_DROP (8)
+        """
+        if len(list_func) == 0:
+            return True
+        try:
+            self.__queue.put_nowait((list_func, message, time.time()))
+            return True
+        except queue.Full:
+            self.__number_dropped_messages += 1
+            self.__on_add_log(8, "ANA_WRK_DROP", "", "Kolejka analizy jest pełna, pominięto: {}".format(message))
+            return False
+
+    def get_number_of_waiting_messages(self) -> int:
+        """
+        :return: <int> number of messages in queue
+        """
+        return self.__queue.qsize()
+
+    def get_number_dropped_messages(self) -> int:
+        """
+        :return: <int> number of messages dropped because queue was full
+        """
+        return self.__number_dropped_messages
+
+    def get_stat_wait(self) -> StageStat:
+        """
+        :return: <StageStat> time which messages waited in queue
+        """
+        return self.__stat_wait
+
+    def get_stat_run(self) -> StageStat:
+        """
+        :return: <StageStat> time of calling functions for one message
+        """
+        return self.__stat_run
+
+    def __run(self) -> None:
+        """
+        Main loop of thread
+
+        :return: None
+        :logs: ANA_WRK_ERROR (10)
+        """
+        while True:
+            try:
+                item = self.__queue.get(timeout=self.WAIT_FOR_MESSAGE)
+            except queue.Empty:
+                item = None
+            if item is None:
+                with self.__lock:
+                    if self.__is_stopping and self.__queue.empty():
+                        self.__thread = None
+                        return
+                continue
+            list_func, message, time_put = item
+            time_start = time.time()
+            self.__stat_wait.add(time_start - time_put)
+            for func in list_func:
+                try:
+                    func(message)
+                except Exception as e:
+                    self.__on_add_log(10, "ANA_WRK_ERROR", "", "{}: {}".format(message, e))
+            self.__stat_run.add(time.time() - time_start)
@@ -0,0 +1,188 @@
+"""This module keeps data which must be sent to many receivers"""
+from bisect import bisect_right
+
+
+class BroadcastLog:
+    """
+        This class is one append-only buffer shared by all receivers (e.g. socket clients). Every receiver has only
+        own offset in this buffer, so data added once are sent to all receivers without copying it for everyone.
+
+        Offsets are absolute (number of bytes added from the beginning), the beginning of buffer is removed when every
+        receiver has already read it.
+
+        :param separator: <bytes> last byte of every message, used to count messages
+        :param min_size_to_reclaim: <int> read data are removed from buffer when they have at least this size
+    """
+    # max number of bytes given to func_send by one call of send
+    MAX_SEND_SIZE = 65536
+
+    def __init__(self, separator: bytes = b"\r", min_size_to_reclaim: int = 4096):
+        """
+        :param separator: <bytes> last byte of every message
+        :param min_size_to_reclaim: <int> minimum number of read bytes at the beginning of buffer to remove them
+
+        self.__data - <bytearray> data which weren't read by every receiver
+        self.__base_offset - <int> absolute offset of the first byte in self.__data
+        self.__chunk_ends - <list[int]> absolute offsets of ends of appended chunks, in ascending order
+        self.__chunk_messages - <list[int]> number of messages in all chunks from the first to this one (inclusive)
+        self.__first_chunk - <int> index of first chunk in self.__chunk_ends, which is still in self.__data
+        self.__readers - <dict[object, int]> receiver -> absolute offset of the first not read byte
+        """
+        self.__separator = separator
+        self.__min_size_to_reclaim = min_size_to_reclaim
+        self.__data = bytearray()
+        self.__base_offset = 0
+        self.__chunk_ends = []
+        self.__chunk_messages = []
+        self.__first_chunk = 0
+        self.__readers = {}
+
+    def append(self, data: bytes) -> None:
+        """
+        This method adds message (or several messages) at the end of buffer
+
+        :param data: <bytes> messages, every message is ended with separator
+        :return: None
+        """
+        number_of_messages = data.count(self.__separator)
+        if len(self.__chunk_messages) > 0:
+            number_of_messages += self.__chunk_messages[-1]
+        self.__data += data
+        self.__chunk_ends.append(self.__base_offset + len(self.__data))
+        self.__chunk_messages.append(number_of_messages)
+        if len(self.__readers) == 0:
+            self.__reclaim()
+
+    def add_reader(self, key) -> None:
+        """
+        This method adds new receiver, which will read only data added from now
+
+        :param key: <object> receiver identifier
+        :return: None
+        """
+        self.__readers[key] = self.__base_offset + len(self.__data)
+
+    def remove_reader(self, key) -> None:
+        """
+        This method removes receiver
+
+        :param key: <object> receiver identifier
+        :return: None
+        """
+        del self.__readers[key]
+        self.__reclaim()
+
+    def move_reader(self, key, new_key) -> None:
+        """
+        This method changes identifier of receiver, not read data are kept for new identifier
+
+        :param key: <object> current receiver identifier
+        :param new_key: <object> new receiver identifier
+        :return: None
+        """
+        self.__readers[new_key] = self.__readers.pop(key)
+
+    def has_reader(self, key) -> bool:
+        """
+        :param key: <object> receiver identifier
+        :return: <bool> True - receiver was added, False - otherwise
+        """
+        return key in self.__readers
+
+    def send(self, key, func_send) -> (int, bytes):
+        """
+        This method gives not read data of receiver (at most MAX_SEND_SIZE bytes) to func_send and moves offset of
+        receiver by number of bytes which func_send returned. Data are given as bytes, not as view of buffer, because
+        buffer with exported view can't be resized, so append during e.g. socket.send (it releases GIL) would fail.
+
+        :param key: <object> receiver identifier
+        :param func_send: <func(bytes) -> int> function which sends data, e.g. socket.send
+        :return: <int, bytes> number of sent bytes and sent bytes
+        """
+        start = self.__readers[key] - self.__base_offset
+        if start == len(self.__data):
+            return 0, b""
+        data_to_send = bytes(self.__data[start:start + self.MAX_SEND_SIZE])
+        number_sent_bytes = func_send(data_to_send)
+        sent_data = data_to_send[:number_sent_bytes]
+        self.__readers[key] += number_sent_bytes
+        self.__reclaim()
+        return number_sent_bytes, sent_data
+
+    def skip(self, key) -> int:
+        """
+        This method marks all data as read by receiver
+
+        :param key: <object> receiver identifier
+        :return: <int> number of skipped bytes
+        """
+        number_skipped_bytes = self.get_number_of_bytes(key)
+        self.__readers[key] += number_skipped_bytes
+        self.__reclaim()
+        return number_skipped_bytes
+
+    def trim(self, key, max_bytes: int, max_messages: int) -> bytes:
+        """
+        This method removes the oldest messages of receiver, so receiver has at most max_bytes and max_messages not
+        read data. Receiver will start reading from the beginning of message.
+
+        :param key: <object> receiver identifier
+        :param max_bytes: <int> max number of not read bytes, 0 - without limit
+        :param max_messages: <int> max number of not read messages, 0 - without limit
+        :return: <bytes> removed data
+        """
+        offset = self.__readers[key]
+        end_offset = self.__base_offset + len(self.__data)
+        new_offset = offset
+        if max_bytes > 0 and end_offset - offset > max_bytes:
+            index = self.__data.find(self.__separator, end_offset - max_bytes - 1 - self.__base_offset)
+            new_offset = self.__base_offset + index + 1
+        if max_messages > 0:
+            self.__readers[key] = new_offset
+            for _ in range(self.get_number_of_messages(key) - max_messages):
+                new_offset = self.__base_offset + self.__data.index(self.__separator, new_offset - self.__base_offset) + 1
+        removed_data = bytes(self.__data[offset - self.__base_offset:new_offset - self.__base_offset])
+        self.__readers[key] = new_offset
+        self.__reclaim()
+        return removed_data
+
+    def get_number_of_bytes(self, key) -> int:
+        """
+        :param key: <object> receiver identifier
+        :return: <int> number of bytes which receiver didn't read
+        """
+        return self.__base_offset + len(self.__data) - self.__readers[key]
+
+    def get_number_of_messages(self, key) -> int:
+        """
+        :param key: <object> receiver identifier
+        :return: <int> number of messages which receiver didn't read completely
+        """
+        offset = self.__readers[key]
+        index = bisect_right(self.__chunk_ends, offset, self.__first_chunk)
+        if index == len(self.__chunk_ends):
+            return 0
+        number_of_messages = self.__chunk_messages[-1] - self.__chunk_messages[index]
+        return number_of_messages + self.__data.count(self.__separator, offset - self.__base_offset,
+                                                      self.__chunk_ends[index] - self.__base_offset)
+
+    def __reclaim(self) -> None:
+        """
+        This method removes from the beginning of buffer data which were read by every receiver
+
+        :return: None
+        """
+        if len(self.__readers) == 0:
+            min_offset = self.__base_offset + len(self.__data)
+        else:
+            min_offset = min(self.__readers.values())
+        number_of_bytes = min_offset - self.__base_offset
+        if number_of_bytes == 0 or (number_of_bytes < self.__min_size_to_reclaim and number_of_bytes < len(self.__data)):
+            return
+        del self.__data[:number_of_bytes]
+        self.__base_offset = min_offset
+        self.__first_chunk = bisect_right(self.__chunk_ends, min_offset, self.__first_chunk)
+        if self.__first_chunk > len(self.__chunk_ends) // 2:
+            del self.__chunk_ends[:self.__first_chunk]
+            del self.__chunk_messages[:self.__first_chunk]
+            self.__first_chunk = 0
@@ -0,0 +1,58 @@
+"""This module collects received bytes and splits them into frames"""
+
+
+class FrameBuffer:
+    """
+        This class is a reusable receive buffer. Received data are appended to one bytearray and complete frames (ended
+        with separator) are cut from the beginning of it, so the buffer isn't created again after every read.
+
+        self.__separator - <bytes> last byte of every frame
+        self.__buffer - <bytearray> received bytes which aren't popped yet
+        self.__checked_length - <int> number of bytes at the beginning of self.__buffer which haven't separator, so
+                                      they don't have to be searched again
+    """
+    def __init__(self, separator: bytes = b"\r"):
+        """
+        :param separator: <bytes> last byte of every frame
+        """
+        self.__separator = separator
+        self.__buffer = bytearray()
+        self.__checked_length = 0
+
+    def append(self, data: bytes) -> None:
+        """
+        This method adds received data at the end of buffer
+
+        :param data: <bytes> received data
+        :return: None
+        """
+        self.__buffer += data
+
+    def pop_frames(self) -> list:
+        """
+        This method removes all complete frames from the beginning of buffer and returns them.
+        Unfinished frame stays in buffer.
+
+        :return: <list[bytes]> frames with separator at the end, in order of receiving
+        """
+        end = self.__buffer.rfind(self.__separator, self.__checked_length)
+        if end == -1:
+            self.__checked_length = len(self.__buffer)
+            return []
+        end += 1
+        list_frames = []
+        with memoryview(self.__buffer) as view:
+            start = 0
+            while start < end:
+                stop = self.__buffer.index(self.__separator, start, end) + 1
+                list_frames.append(bytes(view[start:stop]))
+                start = stop
+        del self.__buffer[:end]
+        self.__checked_length = 0
+        return list_frames
+
+    def __len__(self) -> int:
+        """
+        :return: <int> number of bytes waiting for the end of frame
+        """
+        return len(self.__buffer)
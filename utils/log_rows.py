@@ -0,0 +1,119 @@
+"""This module keeps rows of the log table and updates them incrementally"""
+
+
+class LogRows:
+    """
+        This class keeps rows of the log table like LogManagement.get_logs: the newest 'number_logs' logs with priority
+        at least min_priority (errors too) and then up to 'number_additional_errors' older errors, from the newest.
+
+        Rows are filled from LogManagement only after change of min_priority, later only logs newer than the newest row
+        are taken, they are inserted at the top and rows which fall out of the table are removed. Every change is
+        surrounded by calls of hooks (_begin_reset/_end_reset, _begin_insert/_end_insert, _begin_remove/_end_remove),
+        which do nothing here, so subclass (e.g. Qt model) can repaint only changed rows.
+    """
+    def __init__(self, number_logs: int = 250, number_additional_errors: int = 100):
+        """
+        :param number_logs: <int> maximum number of the newest logs in the table
+        :param number_additional_errors: <int> maximum number of older errors below the newest logs
+
+        self.__rows - <list[list[index, datetime, priority, code, port, message]]> formatted logs from the newest
+        self.__number_newest_rows - <int> number of rows from the newest 'number_logs' logs, next rows are older errors
+        self.__min_priority - <int | None> min priority of logs in the table, None - table wasn't filled
+        self.__last_index - <int> index of the newest log in the table, 0 - table is empty
+        """
+        self.__number_logs = number_logs
+        self.__number_additional_errors = number_additional_errors
+        self.__rows = []
+        self.__number_newest_rows = 0
+        self.__min_priority = None
+        self.__last_index = 0
+
+    def get_rows(self) -> list:
+        """
+        :return: <list[list[index, datetime, priority, code, port, message]]> rows from the newest, don't change it
+        """
+        return self.__rows
+
+    def update(self, log_management, min_priority: int) -> int:
+        """
+        This method adds to the table logs added since the last update, or fills the table again, if min_priority was
+        changed or there are too many new logs
+
+        :param log_management: <LogManagement> source of logs
+        :param min_priority: <int> log must have a minimum priority of this value
+        :return: <int> -1 - table was filled again, otherwise number of new rows
+        """
+        if min_priority != self.__min_priority:
+            self.__fill(log_management, min_priority)
+            return -1
+        new_rows = log_management.get_logs_after(self.__last_index, min_priority, self.__number_logs)
+        if len(new_rows) == 0:
+            return 0
+        if len(new_rows) >= self.__number_logs:
+            self.__fill(log_management, min_priority)
+            return -1
+
+        self._begin_insert(0, len(new_rows) - 1)
+        self.__rows[0:0] = new_rows
+        self._end_insert()
+        self.__last_index = new_rows[0][0]
+
+        position = self.__number_logs
+        for _ in range(self.__number_newest_rows + len(new_rows) - self.__number_logs):
+            if int(self.__rows[position][2]) >= 10:
+                position += 1
+            else:
+                self.__remove_rows(position, position)
+        self.__number_newest_rows = min(self.__number_newest_rows + len(new_rows), self.__number_logs)
+
+        max_number_of_rows = self.__number_newest_rows + self.__number_additional_errors
+        if len(self.__rows) > max_number_of_rows:
+            self.__remove_rows(max_number_of_rows, len(self.__rows) - 1)
+        return len(new_rows)
+
+    def get_number_of_errors(self) -> int:
+        """
+        :return: <int> number of errors (logs with priority 10) in the table
+        """
+        return sum(1 for row in self.__rows if int(row[2]) >= 10)
+
+    def _begin_reset(self) -> None:
+        pass
+
+    def _end_reset(self) -> None:
+        pass
+
+    def _begin_insert(self, first: int, last: int) -> None:
+        pass
+
+    def _end_insert(self) -> None:
+        pass
+
+    def _begin_remove(self, first: int, last: int) -> None:
+        pass
+
+    def _end_remove(self) -> None:
+        pass
+
+    def __fill(self, log_management, min_priority: int) -> None:
+        """
+        :param log_management: <LogManagement> source of logs
+        :param min_priority: <int> log must have a minimum priority of this value
+        :return: None
+        """
+        self._begin_reset()
+        self.__rows = log_management.get_logs(min_priority, self.__number_logs, self.__number_additional_errors)
+        self.__number_newest_rows = min(len(self.__rows), self.__number_logs)
+        self.__min_priority = min_priority
+        self.__last_index = self.__rows[0][0] if len(self.__rows) > 0 else 0
+        self._end_reset()
+
+    def __remove_rows(self, first: int, last: int) -> None:
+        """
+        :param first: <int> index of the first removed row
+        :param last: <int> index of the last removed row
+        :return: None
+        """
+        self._begin_remove(first, last)
+        del self.__rows[first:last + 1]
+        self._end_remove()
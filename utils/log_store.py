@@ -0,0 +1,115 @@
+"""This module keeps the last logs in memory, separately for every priority"""
+import heapq
+import threading
+from collections import deque
+
+
+class LogStore:
+    """
+        This class keeps the last logs in one bounded deque for every priority (0 - 10), so adding and removing of the
+        oldest log is O(1) and many unimportant logs never remove errors. Logs are records (index, time, priority,
+        code, port, message), index is global sequence number of log, so logs from several deques are merged by index.
+
+        Logs are added by communication thread and read by GUI thread, so deques are used under lock.
+    """
+    MIN_PRIORITY = 0
+    MAX_PRIORITY = 10
+
+    def __init__(self, max_logs_per_priority: int = 500, max_errors: int = 1000):
+        """
+        :param max_logs_per_priority: <int> max number of kept logs with one priority lower than MAX_PRIORITY
+        :param max_errors: <int> max number of kept logs with MAX_PRIORITY (errors)
+
+        self.__logs - <list[deque[tuple]]> priority -> the last logs with this priority, the newest is at the end
+        self.__last_index - <int> index of the newest log, 0 - there isn't log
+        """
+        self.__logs = [deque(maxlen=max_logs_per_priority) for _ in range(self.MAX_PRIORITY)]
+        self.__logs.append(deque(maxlen=max_errors))
+        self.__last_index = 0
+        self.__lock = threading.Lock()
+
+    def add(self, record: tuple) -> None:
+        """
+        :param record: <tuple(int, float, int, any, any, any)> index, time, priority, code, port, message, index must
+                       be bigger than index of every added log
+        :return: None
+        """
+        priority = min(max(int(record[2]), self.MIN_PRIORITY), self.MAX_PRIORITY)
+        with self.__lock:
+            self.__logs[priority].append(record)
+            self.__last_index = record[0]
+
+    def get_last_index(self) -> int:
+        """
+        :return: <int> index of the newest log, 0 - there isn't log
+        """
+        return self.__last_index
+
+    def get_logs(self, min_priority: int, number_logs: int, number_additional_errors: int) -> list:
+        """
+        This method returns the newest 'number_logs' logs with priority at least min_priority and then up to
+        'number_additional_errors' older errors. Deques are merged from the newest log (k-way merge), so only returned
+        logs are visited.
+
+        :param min_priority: <int> log must have a minimum priority of this value (errors are always returned)
+        :param number_logs: <int> maximum number of logs can be returned, but errors will be additional returned
+        :param number_additional_errors: <int> maximum number of historical error logs
+        :return: <list[tuple]> records from the newest
+        """
+        with self.__lock:
+            data = []
+            for record in self.__merge_from_newest(min_priority):
+                if len(data) >= number_logs:
+                    break
+                data.append(record)
+            if len(data) < number_logs:
+                return data
+
+            number_errors = 0
+            oldest_index = data[-1][0] if len(data) > 0 else self.__last_index + 1
+            for record in reversed(self.__logs[self.MAX_PRIORITY]):
+                if number_errors >= number_additional_errors:
+                    break
+                if record[0] < oldest_index:
+                    data.append(record)
+                    number_errors += 1
+            return data
+
+    def get_logs_after(self, index: int, min_priority: int, max_number: int) -> list:
+        """
+        This method returns logs newer than log with 'index', which have priority at least min_priority or are errors
+
+        :param index: <int> index of log, e.g. index of the newest log which is already shown
+        :param min_priority: <int> log must have a minimum priority of this value (errors are always returned)
+        :param max_number: <int> max number of returned logs
+        :return: <list[tuple]> the newest records from the newest, at most max_number
+        """
+        with self.__lock:
+            data = []
+            for record in self.__merge_from_newest(min_priority):
+                if len(data) >= max_number or record[0] <= index:
+                    break
+                data.append(record)
+            return data
+
+    def __merge_from_newest(self, min_priority: int):
+        """
+        This method must be called under self.__lock
+
+        :param min_priority: <int> minimal priority of logs, errors are always returned
+        :return: <generator[tuple]> records with priority from min_priority to MAX_PRIORITY from the newest
+        """
+        min_priority = min(max(min_priority, self.MIN_PRIORITY), self.MAX_PRIORITY)
+        list_iterator = [self.__iterate_from_newest(self.__logs[priority])
+                         for priority in range(min_priority, self.MAX_PRIORITY + 1)]
+        for _, record in heapq.merge(*list_iterator):
+            yield record
+
+    @staticmethod
+    def __iterate_from_newest(logs: deque):
+        """
+        :param logs: <deque[tuple]> logs with one priority
+        :return: <generator[(int, tuple)]> (-index, record) from the newest log, for heapq.merge
+        """
+        for record in reversed(logs):
+            yield -record[0], record
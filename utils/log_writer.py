@@ -0,0 +1,138 @@
+"""This module formats logs and writes them to the log file in own thread, so it doesn't delay the caller"""
+import queue
+import sys
+import threading
+import time
+
+
+class LogWriter:
+    """
+        This class writes lines to the file, which is open all the time. Records wait in bounded queue, thread takes
+        all waiting records at once, formats them by format_line and writes them together, when
+        minimum_number_of_lines_to_write lines are waiting, when flush_interval passed from the last writing, when
+        urgent record (e.g. error) was added or when writer is closed. Lines can be also printed to stdout, it is done
+        in the same thread.
+
+        When queue is full, new records are dropped and number of dropped records is written to the file with the next
+        lines.
+    """
+    MAX_QUEUE_SIZE = 10000
+
+    def __init__(self, file_name: str, minimum_number_of_lines_to_write: int = 1, flush_interval: float = 1.0,
+                 format_line=str):
+        """
+        :param file_name: <str> path to the log file, file is created (or cleared)
+        :param minimum_number_of_lines_to_write: <int> when this number of lines are waiting, they are written
+        :param flush_interval: <float> max time in seconds of waiting of line in memory
+        :param format_line: <func(any)=str> function which makes line (without '\n') from record given to put
+
+        self.__queue - <queue.Queue> items (record, is_printed, is_urgent), None closes writer
+        self.__number_dropped_lines - <int> number of lines dropped since the last writing
+        """
+        self.__file = open(file_name, "w")
+        self.__minimum_number_of_lines_to_write = minimum_number_of_lines_to_write
+        self.__flush_interval = flush_interval
+        self.__format_line = format_line
+        self.__queue = queue.Queue(self.MAX_QUEUE_SIZE)
+        self.__number_dropped_lines = 0
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def set_minimum_number_of_lines_to_write(self, minimum_number_of_lines_to_write: int) -> None:
+        """
+        :param minimum_number_of_lines_to_write: <int> when this number of lines are waiting, they are written
+        :return: None
+        """
+        self.__minimum_number_of_lines_to_write = minimum_number_of_lines_to_write
+
+    def set_flush_interval(self, flush_interval: float) -> None:
+        """
+        :param flush_interval: <float> max time in seconds of waiting of line in memory
+        :return: None
+        """
+        self.__flush_interval = flush_interval
+
+    def put(self, record, is_printed: bool = False, is_urgent: bool = False) -> bool:
+        """
+        This method adds record to queue, it never blocks
+
+        :param record: <any> record formatted to line by format_line, e.g. line without '\n'
+        :param is_printed: <bool> True - line will be also printed to stdout
+        :param is_urgent: <bool> True - line and all waiting lines will be written immediately
+        :return: <bool> True - record was added, False - queue is full, record was dropped
+        """
+        if self.__thread is None:
+            return False
+        try:
+            self.__queue.put_nowait((record, is_printed, is_urgent))
+            return True
+        except queue.Full:
+            self.__number_dropped_lines += 1
+            return False
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        This method writes all waiting lines, closes the file and stops thread
+
+        :param timeout: <float> max time in seconds of waiting for the end of thread
+        :return: None
+        """
+        if self.__thread is None:
+            return
+        try:
+            self.__queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self.__thread.join(timeout)
+        self.__thread = None
+
+    def __run(self) -> None:
+        """
+        Main loop of thread
+
+        :return: None
+        """
+        list_line = []
+        time_last_writing = time.time()
+        is_closed = False
+        while not is_closed:
+            is_urgent = False
+            try:
+                item = self.__queue.get(timeout=max(0.0, time_last_writing + self.__flush_interval - time.time()))
+                while item is not None:
+                    record, is_printed, is_urgent_line = item
+                    try:
+                        line = self.__format_line(record)
+                    except Exception as e:
+                        line = "{} ({}: {})".format(record, type(e).__name__, e)
+                    list_line.append(line)
+                    if is_printed:
+                        print(line)
+                    is_urgent = is_urgent or is_urgent_line
+                    item = self.__queue.get_nowait()
+                is_closed = True
+            except queue.Empty:
+                pass
+            if is_closed or is_urgent or len(list_line) >= self.__minimum_number_of_lines_to_write or \
+                    time.time() >= time_last_writing + self.__flush_interval:
+                self.__write(list_line)
+                list_line = []
+                time_last_writing = time.time()
+        self.__file.close()
+
+    def __write(self, list_line: list) -> None:
+        """
+        :param list_line: <list[str]> lines to write
+        :return: None
+        """
+        number_dropped_lines = self.__number_dropped_lines
+        if number_dropped_lines > 0:
+            self.__number_dropped_lines -= number_dropped_lines
+            list_line.append("Kolejka logów była pełna, pominięto {} logów".format(number_dropped_lines))
+        if len(list_line) == 0:
+            return
+        try:
+            self.__file.write("\n".join(list_line) + "\n")
+            self.__file.flush()
+        except (OSError, ValueError) as e:
+            print("Nie można zapisać logów: {}".format(e), file=sys.stderr)
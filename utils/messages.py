@@ -1,3 +1,13 @@
+# marks fields of LaneMessage which haven't been parsed yet
+_NOT_PARSED = object()
+# control sum for every value of (sum of bytes) & 0xFF
+_HEX_TABLE = tuple("{:02X}".format(i).encode() for i in range(256))
+# commands to lane, which are added to messages by analyzers
+COMMANDS = (b"T14", b"T16", b"T22", b"T24", b"T40", b"T41")
+# command -> sum of its bytes, used by prepare_command_message
+_COMMAND_SUM = {command: sum(command) for command in COMMANDS}
+
+
 def extract_lane_id_from_incoming_message(msg: bytes, lane_count=-1):
     """
     Extract lane id from incoming message.
@@ -28,13 +38,24 @@ def extract_lane_id_from_outgoing_message(msg: bytes, lane_count=-1):
 
 def calculate_message_control_sum(message):
     """
+    Control sum is the last byte of sum of message bytes, written as two hex digits (upper case).
 
+    :param message: <bytes> message without control sum and b"\r"
+    :return: <bytes> control sum, e.g. b"4F"
+    """
+    sum_ascii = sum(message)
+    if sum_ascii < 16:
+        return format(sum_ascii, "X").encode()
+    return _HEX_TABLE[sum_ascii & 0xFF]
+
+def is_message_control_sum_valid(message):
+    """
+    :param message: <bytes> message with control sum and b"\r" at the end
+    :return: <bool> True - control sum in message is correct
     """
-    sum_ascii = 0
-    for x in message:
-        sum_ascii += x
-    checksum = bytes(hex(sum_ascii).split("x")[-1].upper()[-2:], 'utf-8')
-    return checksum
+    if len(message) < 3:
+        return False
+    return calculate_message_control_sum(message[:-3]) == message[-3:-1]
 
 def encapsulate_message(prepared_message, priority=5, time_wait=-1):
     """
@@ -60,6 +81,163 @@ def prepare_message(message):
     message_with_control_sum = message + calculate_message_control_sum(message) + b"\r"
     return message_with_control_sum
 
+def prepare_command_message(message_head, command):
+    """
+    Faster prepare_message(message_head + command) for command from COMMANDS, sum of command is calculated once.
+
+    :param message_head: <bytes> e.g. b"3138"
+    :param command: <bytes> e.g. b"T14"
+    :return: <bytes> message with control sum and b"\r"
+    """
+    command_sum = _COMMAND_SUM.get(command)
+    if command_sum is None:
+        return prepare_message(message_head + command)
+    return message_head + command + _HEX_TABLE[(sum(message_head) + command_sum) & 0xFF] + b"\r"
+
+def prepare_z_message(message_head, number_of_throw, last_throw_result, lane_sum, total_sum, next_layout,
+                      number_of_x, time_to_end, fallen_pins, options):
+    """
+    Prepare message 'Z' which sets result on lane, every field has 3 bytes (hex), fields are like in message with
+    result of throw (see LaneMessage).
+
+    :return: <bytes> message with control sum and b"\r"
+    """
+    return prepare_message(b"".join((message_head, b"Z", number_of_throw, last_throw_result, lane_sum, total_sum,
+                                     next_layout, number_of_x, time_to_end, fallen_pins, options)))
+
 def prepare_message_to_lane(lane_id, content):
-    message = b"3" + bytes(str(lane_id), "cp1250") + b"38" + content
-    return prepare_message(message)
+    message_head = b"3" + bytes(str(lane_id), "cp1250") + b"38"
+    return prepare_command_message(message_head, content)
+
+
+class LaneMessage:
+    """
+    Message from lane or to lane, parsed once and given to every analyzer.
+
+    Fields which need conversion (lane, throw number, sum, checksum) are calculated on first use and kept, so analyzers
+    don't repeat parsing of the same bytes.
+
+    Message with result of throw (35 bytes, type 'w', 'g', 'h', 'f' or 'k'):
+        [0:4] head, [4:5] type, [5:8] number of throw, [8:11] last throw result, [11:14] lane sum, [14:17] total sum,
+        [17:20] next layout, [20:23] number of x, [23:26] time to end, [26:29] fallen pins, [29:32] options,
+        [32:34] control sum, [34:35] b"\r"
+    Message 'IG' (to lane):
+        [6:9] number of full throws, [9:12] number of clear off throws, [15:18] total sum
+    """
+    __slots__ = ("raw", "is_from_lane", "_lane", "_throw_number", "_total_sum", "_is_checksum_valid")
+
+    THROW_TYPES = (b"w", b"g", b"h", b"f", b"k")
+
+    def __init__(self, raw: bytes, is_from_lane: bool):
+        """
+        :param raw: <bytes> message ended with b"\r"
+        :param is_from_lane: <bool> True - message was received from lane, False - message is sent to lane
+        """
+        self.raw = raw
+        self.is_from_lane = is_from_lane
+        self._lane = _NOT_PARSED
+        self._throw_number = _NOT_PARSED
+        self._total_sum = _NOT_PARSED
+        self._is_checksum_valid = _NOT_PARSED
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def __str__(self) -> str:
+        return str(self.raw)
+
+    def __repr__(self) -> str:
+        return "LaneMessage({!r}, {})".format(self.raw, self.is_from_lane)
+
+    @property
+    def opcode(self) -> bytes:
+        """
+        :return: <bytes> type of message, e.g. b"IG", b"i0", b"p1" (two bytes after head)
+        """
+        return self.raw[4:6]
+
+    @property
+    def kind(self) -> bytes:
+        """
+        :return: <bytes> the first byte of message content, e.g. b"P", b"w", b"T"
+        """
+        return self.raw[4:5]
+
+    @property
+    def lane(self):
+        """
+        :return: <int | None> lane id from head of message (sender for messages from lane, addressee for messages to
+                 lane), None - head is invalid
+        """
+        if self._lane is _NOT_PARSED:
+            try:
+                if self.is_from_lane:
+                    self._lane = extract_lane_id_from_incoming_message(self.raw)
+                else:
+                    self._lane = extract_lane_id_from_outgoing_message(self.raw)
+            except ValueError:
+                self._lane = None
+        return self._lane
+
+    @property
+    def is_throw(self) -> bool:
+        """
+        :return: <bool> True - message with result of throw
+        """
+        return len(self.raw) == 35 and self.raw[4:5] in self.THROW_TYPES
+
+    @property
+    def throw_number(self):
+        """
+        :return: <int | None> number of throw in message with result of throw, None - other message
+        """
+        if self._throw_number is _NOT_PARSED:
+            self._throw_number = None
+            if self.raw[4:5] in self.THROW_TYPES:
+                try:
+                    self._throw_number = int(self.raw[5:8], 16)
+                except ValueError:
+                    pass
+        return self._throw_number
+
+    @property
+    def next_layout(self) -> bytes:
+        """
+        :return: <bytes> next layout of pins in message with result of throw
+        """
+        return self.raw[17:20]
+
+    @property
+    def fallen_pins(self) -> bytes:
+        """
+        :return: <bytes> fallen pins in message with result of throw
+        """
+        return self.raw[26:29]
+
+    @property
+    def total_sum(self):
+        """
+        :return: <int | None> total sum from message 'IG' or message with result of throw, None - other message
+        """
+        if self._total_sum is _NOT_PARSED:
+            self._total_sum = None
+            if self.raw[4:6] == b"IG":
+                field = self.raw[15:18]
+            elif self.raw[4:5] in self.THROW_TYPES:
+                field = self.raw[14:17]
+            else:
+                field = b""
+            try:
+                self._total_sum = int(field, 16)
+            except ValueError:
+                pass
+        return self._total_sum
+
+    @property
+    def is_checksum_valid(self) -> bool:
+        """
+        :return: <bool> True - control sum in message is correct
+        """
+        if self._is_checksum_valid is _NOT_PARSED:
+            self._is_checksum_valid = is_message_control_sum_valid(self.raw)
+        return self._is_checksum_valid
@@ -0,0 +1,42 @@
+"""This module chooses functions which analyze message by its type"""
+
+
+class OpcodeDispatcher:
+    """
+        This class keeps functions which analyze messages together with types of messages (opcodes) which they handle.
+        Opcode is beginning of message content (e.g. b"IG", b"P", b"i0", b"w"), so it is compared with message[4:6].
+        List of functions for every message[4:6] is calculated once and cached, so messages which aren't handled by
+        any function skip analysis.
+    """
+    def __init__(self):
+        """
+        self.__list_func - <list[(func, list[bytes] | None)]> functions with their opcodes, None - every message
+        self.__cache - <dict[bytes, list[func]]> message[4:6] -> functions in order of adding
+        """
+        self.__list_func = []
+        self.__cache = {}
+
+    def add(self, func, list_opcode=None) -> None:
+        """
+        :param func: <func(bytes)> function to analyze message
+        :param list_opcode: <list[bytes] | None> opcodes of messages handled by func, None - every message
+        :return: None
+        """
+        self.__list_func.append((func, None if list_opcode is None else list(list_opcode)))
+        self.__cache = {}
+
+    def get_funcs(self, message: bytes) -> list:
+        """
+        :param message: <bytes> message ended with '\r'
+        :return: <list[func]> functions which handle this message, in order of adding
+        """
+        key = message[4:6]
+        list_func = self.__cache.get(key)
+        if list_func is None:
+            list_func = [func for func, list_opcode in self.__list_func
+                         if list_opcode is None or any(key.startswith(opcode) for opcode in list_opcode)]
+            self.__cache[key] = list_func
+        return list_func
+
+    def __len__(self) -> int:
+        return len(self.__list_func)
@@ -0,0 +1,93 @@
+"""This module calculates time between messages sent to the same lane from its real response times"""
+
+
+class PacingController:
+    """
+        This class keeps for every lane time between two messages sent to this lane (gap) and changes it like AIMD:
+        after every response gap is decreased by DECREASE_STEP, but not below smoothed response time of lane plus
+        SAFETY_MARGIN, after every missing or critically late response gap is multiplied by INCREASE_FACTOR. Gap is
+        always between min_gap and max_gap.
+
+        Smoothed response time is exponential moving average with weight SMOOTHING of the newest response.
+        All times are in milliseconds.
+    """
+    DECREASE_STEP = 10
+    INCREASE_FACTOR = 2.0
+    SAFETY_MARGIN = 50
+    SMOOTHING = 0.125
+
+    def __init__(self, number_of_lane: int, initial_gap: int, min_gap: int, max_gap: int):
+        """
+        :param number_of_lane: <int> number of lanes
+        :param initial_gap: <int> gap of every lane before the first response
+        :param min_gap: <int> the shortest gap
+        :param max_gap: <int> the longest gap
+
+        self.__list_gap - <list[int]> lane -> current gap
+        self.__list_smoothed_time - <list[float | None]> lane -> smoothed response time, None - no response yet
+        """
+        self.__min_gap = min_gap
+        self.__max_gap = max(min_gap, max_gap)
+        self.__initial_gap = self.__limit(initial_gap)
+        self.__list_gap = [self.__initial_gap for _ in range(number_of_lane)]
+        self.__list_smoothed_time = [None for _ in range(number_of_lane)]
+
+    def on_response(self, lane: int, response_time: int) -> int:
+        """
+        This method decreases gap of lane after response
+
+        :param lane: <int> index of lane
+        :param response_time: <int> time from sending message to response
+        :return: <int> new gap of lane
+        """
+        smoothed_time = self.__list_smoothed_time[lane]
+        if smoothed_time is None:
+            smoothed_time = float(response_time)
+        else:
+            smoothed_time += self.SMOOTHING * (response_time - smoothed_time)
+        self.__list_smoothed_time[lane] = smoothed_time
+        floor = int(smoothed_time) + self.SAFETY_MARGIN
+        gap = self.__list_gap[lane]
+        if gap > floor:
+            gap = max(gap - self.DECREASE_STEP, floor)
+        self.__list_gap[lane] = self.__limit(gap)
+        return self.__list_gap[lane]
+
+    def on_missing_response(self, lane: int) -> int:
+        """
+        This method increases gap of lane after lane didn't respond or responded critically late
+
+        :param lane: <int> index of lane
+        :return: <int> new gap of lane
+        """
+        self.__list_gap[lane] = self.__limit(int(self.__list_gap[lane] * self.INCREASE_FACTOR))
+        return self.__list_gap[lane]
+
+    def get_gap(self, lane: int) -> int:
+        """
+        :param lane: <int> index of lane
+        :return: <int> current gap of lane
+        """
+        return self.__list_gap[lane]
+
+    def get_list_gap(self) -> list:
+        """
+        :return: <list[int]> current gap of every lane
+        """
+        return list(self.__list_gap)
+
+    def clear(self) -> None:
+        """
+        This method restores initial gap and forgets response times of every lane
+
+        :return: None
+        """
+        self.__list_gap = [self.__initial_gap for _ in self.__list_gap]
+        self.__list_smoothed_time = [None for _ in self.__list_smoothed_time]
+
+    def __limit(self, gap: int) -> int:
+        """
+        :param gap: <int> gap
+        :return: <int> gap limited to <min_gap, max_gap>
+        """
+        return min(max(gap, self.__min_gap), self.__max_gap)
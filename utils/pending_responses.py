@@ -0,0 +1,131 @@
+"""This module keeps messages sent to lanes, which wait for response"""
+from collections import deque
+
+
+class PendingResponses:
+    """
+        This class keeps messages sent to lanes, which wait for response, separately for every lane (key), because
+        several messages to different lanes (or several messages to one lane) can be written together to COM port.
+        Response from lane is matched with the oldest message waiting for response from this lane.
+
+        Every message has own mode like response_waiting_mode in ConnectionManager.start:
+            3 - waiting shorter than warning_time
+            2 - waiting longer than warning_time
+            1 - waiting longer than critical_time
+        and own deadline, after which waiting ends without response. Times are in seconds.
+    """
+    STAGE_TIMEOUT = 0
+    STAGE_CRITICAL = 1
+    STAGE_WARNING = 2
+
+    def __init__(self, warning_time: float, critical_time: float):
+        """
+        :param warning_time: <float> time of waiting after which message is reported as waiting warningly long
+        :param critical_time: <float> time of waiting after which message is reported as waiting critically long
+
+        self.__pending - <dict[object, deque[list[bytes, float, float, int]]]> key (e.g. lane index) -> messages
+                         [message, time of sending, deadline, mode] from the oldest
+        """
+        self.__warning_time = warning_time
+        self.__critical_time = critical_time
+        self.__pending = {}
+
+    def add(self, key, message: bytes, time_send: float, timeout: float) -> None:
+        """
+        :param key: <object> who should respond, e.g. lane index
+        :param message: <bytes> sent message
+        :param time_send: <float> time of sending
+        :param timeout: <float> max time of waiting for response
+        :return: None
+        """
+        if key not in self.__pending:
+            self.__pending[key] = deque()
+        self.__pending[key].append([message, time_send, time_send + timeout, 3])
+
+    def pop(self, key):
+        """
+        This method removes the oldest message waiting for response from key
+
+        :param key: <object> who responded, e.g. lane index
+        :return: <None | list[bytes, float, float, int]> None - nothing waits for response from key, otherwise
+                 [message, time of sending, deadline, mode]
+        """
+        messages = self.__pending.get(key)
+        if messages is None:
+            return None
+        item = messages.popleft()
+        if len(messages) == 0:
+            del self.__pending[key]
+        return item
+
+    def pop_oldest(self):
+        """
+        This method removes the oldest message waiting for response from any key
+
+        :return: <None | list[bytes, float, float, int]> None - nothing waits for response, otherwise
+                 [message, time of sending, deadline, mode]
+        """
+        if len(self.__pending) == 0:
+            return None
+        key = min(self.__pending, key=lambda k: self.__pending[k][0][1])
+        return self.pop(key)
+
+    def is_waiting(self) -> bool:
+        """
+        :return: <bool> True - any message waits for response
+        """
+        return len(self.__pending) > 0
+
+    def check(self, time_now: float, check_timeout: bool) -> list:
+        """
+        This method changes modes of messages waiting too long and removes messages after their deadline
+
+        :param time_now: <float> current time
+        :param check_timeout: <bool> False - messages are never removed (e.g. sending is disabled)
+        :return: <list[(bytes, int, int)]> (message, STAGE_WARNING | STAGE_CRITICAL | STAGE_TIMEOUT, mode of message
+                 after change) for every change in order of sending, e.g. mode 1 with STAGE_TIMEOUT - message waited
+                 critically long before timeout
+        """
+        list_event = []
+        for key in list(self.__pending.keys()):
+            messages = self.__pending[key]
+            for item in messages:
+                message, time_send, deadline, mode = item
+                if mode == 3 and time_now > time_send + self.__warning_time:
+                    list_event.append((time_send, message, self.STAGE_WARNING, 2))
+                    mode = 2
+                if mode == 2 and time_now > time_send + self.__critical_time:
+                    list_event.append((time_send, message, self.STAGE_CRITICAL, 1))
+                    mode = 1
+                item[3] = mode
+            while check_timeout and len(messages) > 0 and time_now >= messages[0][2]:
+                message, time_send, _, mode = messages.popleft()
+                list_event.append((time_send, message, self.STAGE_TIMEOUT, mode))
+            if len(messages) == 0:
+                del self.__pending[key]
+        list_event.sort(key=lambda event: (event[0], -event[2]))
+        return [(message, stage, mode) for _, message, stage, mode in list_event]
+
+    def get_next_deadline(self, check_timeout: bool):
+        """
+        :param check_timeout: <bool> False - deadlines of messages are not taken into account
+        :return: <float | None> the nearest time when check will report change, None - nothing waits for response
+        """
+        list_deadline = []
+        for messages in self.__pending.values():
+            for _, time_send, deadline, mode in messages:
+                if mode == 3:
+                    list_deadline.append(time_send + self.__warning_time)
+                elif mode == 2:
+                    list_deadline.append(time_send + self.__critical_time)
+                if check_timeout:
+                    list_deadline.append(deadline)
+        if len(list_deadline) == 0:
+            return None
+        return min(list_deadline)
+
+    def clear(self) -> None:
+        """
+        :return: None
+        """
+        self.__pending = {}
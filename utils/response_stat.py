@@ -0,0 +1,206 @@
+"""This module keeps statistic of lane response times in constant memory"""
+import math
+from array import array
+
+
+class LatencyHistogram:
+    """
+        This class counts times in buckets with logarithmic width: times below EXACT_LIMIT have own bucket, bigger times
+        share bucket with times which differ by less than 1/SUB_BUCKETS (about 3%). Adding and removing time is O(1),
+        reading percentile is O(NUMBER_OF_BUCKETS).
+
+        Times are in milliseconds from 0 to 65535.
+    """
+    SUB_BUCKETS = 32
+    EXACT_LIMIT = 2 * SUB_BUCKETS
+    NUMBER_OF_BUCKETS = EXACT_LIMIT + 10 * SUB_BUCKETS
+
+    def __init__(self):
+        """
+        self.__counts - <array('L')> bucket -> number of times
+        self.__number - <int> number of counted times
+        """
+        self.__counts = array("L", [0]) * self.NUMBER_OF_BUCKETS
+        self.__number = 0
+
+    @classmethod
+    def get_bucket(cls, time_ms: int) -> int:
+        """
+        :param time_ms: <int> time from 0 to 65535
+        :return: <int> index of bucket
+        """
+        if time_ms < cls.EXACT_LIMIT:
+            return time_ms
+        shift = time_ms.bit_length() - 6
+        return cls.EXACT_LIMIT + (shift - 1) * cls.SUB_BUCKETS + (time_ms >> shift) - cls.SUB_BUCKETS
+
+    @classmethod
+    def get_bucket_value(cls, bucket: int) -> int:
+        """
+        :param bucket: <int> index of bucket
+        :return: <int> the biggest time counted in bucket
+        """
+        if bucket < cls.EXACT_LIMIT:
+            return bucket
+        shift = (bucket - cls.EXACT_LIMIT) // cls.SUB_BUCKETS + 1
+        mantissa = (bucket - cls.EXACT_LIMIT) % cls.SUB_BUCKETS + cls.SUB_BUCKETS
+        return ((mantissa + 1) << shift) - 1
+
+    def add(self, time_ms: int) -> None:
+        """
+        :param time_ms: <int> time from 0 to 65535
+        :return: None
+        """
+        self.__counts[self.get_bucket(time_ms)] += 1
+        self.__number += 1
+
+    def remove(self, time_ms: int) -> None:
+        """
+        :param time_ms: <int> time which was added earlier
+        :return: None
+        """
+        self.__counts[self.get_bucket(time_ms)] -= 1
+        self.__number -= 1
+
+    def get_number(self) -> int:
+        """
+        :return: <int> number of counted times
+        """
+        return self.__number
+
+    def get_percentiles(self, list_percentile: list) -> list:
+        """
+        :param list_percentile: <list[float]> sorted percentiles from 0 to 100, e.g. [50, 95, 99]
+        :return: <list[int]> for every percentile the biggest time from its bucket, empty list if there is no time
+        """
+        if self.__number == 0:
+            return []
+        list_rank = [max(1, int(math.ceil(percentile * self.__number / 100))) for percentile in list_percentile]
+        result = []
+        counted = 0
+        for bucket, count in enumerate(self.__counts):
+            counted += count
+            while len(result) < len(list_rank) and counted >= list_rank[len(result)]:
+                result.append(self.get_bucket_value(bucket))
+            if len(result) == len(list_rank):
+                break
+        return result
+
+
+class ResponseStat:
+    """
+        This class keeps response times of one lane. The last BUFFER_SIZE times are kept in ring buffer and sums of the
+        last WINDOWS times are updated with every new time, so every statistic is read in O(1).
+
+        For every window from percentile_windows LatencyHistogram is kept, time which leaves the window is removed
+        from its histogram, window 0 - all times.
+
+        Times are in milliseconds, longer than MAX_TIME are saved as MAX_TIME.
+    """
+    BUFFER_SIZE = 1000
+    WINDOWS = (50, 100, 250, 1000)
+    MAX_TIME = 65535
+
+    def __init__(self, percentile_windows=(1000, 0)):
+        """
+        :param percentile_windows: <tuple[int]> windows (number of the last times, 0 - all times) for percentiles,
+                                   max BUFFER_SIZE
+
+        self.__buffer - <array('H')> ring buffer with the last BUFFER_SIZE times
+        self.__position - <int> index in buffer where next time will be saved
+        self.__number - <int> number of all saved times
+        self.__sum_all - <int> sum of all saved times
+        self.__sum_window - <dict[int, int]> window -> sum of the last 'window' times
+        self.__max_time - <int> the longest time since clear_max
+        self.__histograms - <dict[int, LatencyHistogram]> window -> histogram of the last 'window' times
+        """
+        self.__buffer = array("H", bytes(2 * self.BUFFER_SIZE))
+        self.__position = 0
+        self.__number = 0
+        self.__sum_all = 0
+        self.__sum_window = {window: 0 for window in self.WINDOWS}
+        self.__max_time = 0
+        self.__histograms = {min(window, self.BUFFER_SIZE): LatencyHistogram() for window in percentile_windows}
+
+    def add(self, time_ms: int) -> None:
+        """
+        :param time_ms: <int> response time in milliseconds
+        :return: None
+        """
+        time_ms = min(max(time_ms, 0), self.MAX_TIME)
+        for window in self.WINDOWS:
+            self.__sum_window[window] += time_ms
+            if self.__number >= window:
+                self.__sum_window[window] -= self.__buffer[(self.__position - window) % self.BUFFER_SIZE]
+        for window, histogram in self.__histograms.items():
+            histogram.add(time_ms)
+            if 0 < window <= self.__number:
+                histogram.remove(self.__buffer[(self.__position - window) % self.BUFFER_SIZE])
+        self.__buffer[self.__position] = time_ms
+        self.__position = (self.__position + 1) % self.BUFFER_SIZE
+        self.__number += 1
+        self.__sum_all += time_ms
+        if time_ms > self.__max_time:
+            self.__max_time = time_ms
+
+    def get_number(self) -> int:
+        """
+        :return: <int> number of all saved times
+        """
+        return self.__number
+
+    def get_avg_last(self, window: int) -> int:
+        """
+        :param window: <int> one of WINDOWS
+        :return: <int> average of the last 'window' times (or of all times, if there are fewer), 0 - no time
+        """
+        number = min(window, self.__number)
+        if number == 0:
+            return 0
+        return int(self.__sum_window[window] / number)
+
+    def get_avg_between(self, window_newer: int, window_older: int):
+        """
+        :param window_newer: <int> one of WINDOWS, the newest times which are skipped
+        :param window_older: <int> one of WINDOWS, bigger than window_newer
+        :return: <int | str> average of times from window_older-th to (window_newer+1)-th last time, "" - there are
+                 no more than window_newer times
+        """
+        if self.__number <= window_newer:
+            return ""
+        number = min(window_older, self.__number) - window_newer
+        return int((self.__sum_window[window_older] - self.__sum_window[window_newer]) / number)
+
+    def get_avg_all(self) -> int:
+        """
+        :return: <int> average of all times, 0 - no time
+        """
+        if self.__number == 0:
+            return 0
+        return int(self.__sum_all / self.__number)
+
+    def get_percentiles(self, window: int, list_percentile: list) -> list:
+        """
+        :param window: <int> one of percentile_windows
+        :param list_percentile: <list[float]> sorted percentiles, e.g. [50, 90, 95, 99]
+        :return: <list[int]> time for every percentile (about 3% precision), empty list if there is no time
+        """
+        return self.__histograms[window].get_percentiles(list_percentile)
+
+    def get_percentile_windows(self) -> list:
+        """
+        :return: <list[int]> windows for which percentiles are kept
+        """
+        return list(self.__histograms.keys())
+
+    def get_max(self) -> int:
+        """
+        :return: <int> the longest time since clear_max
+        """
+        return self.__max_time
+
+    def clear_max(self) -> None:
+        """
+        :return: None
+        """
+        self.__max_time = 0
@@ -0,0 +1,238 @@
+"""This module keeps data waiting to send to socket clients"""
+from utils.broadcast_log import BroadcastLog
+from utils.spill_file import SpillFile
+
+
+class SendQueues:
+    """
+        This class keeps data waiting to send to every socket client. All clients share one BroadcastLog, so data are
+        stored once. If aren't any client, then data are stored for QUEUE_NOT_SENT_DATA and the first connected client
+        takes them, when the last client is disconnected, its not sent data return to QUEUE_NOT_SENT_DATA.
+
+        Queue of every client (and QUEUE_NOT_SENT_DATA) can have limit of bytes and messages, when queue exceeds limit,
+        then overflow policy is used:
+            "drop_oldest" - the oldest messages are removed
+            "disconnect" - client should be closed (for QUEUE_NOT_SENT_DATA the oldest messages are removed)
+            "spill_to_disk" - the oldest messages are moved to temporary file and they will be sent before data from
+                              memory
+
+        Logs:
+            SKT_QOVF_DISCONNECT - 8 - Client socket will be closed, because its queue exceeded limit (Queue OVerFlow)
+            SKT_QOVF_DROP - 8 - The oldest messages have been removed, because queue exceeded limit (Queue OVerFlow)
+            SKT_QOVF_SPILL - 5 - The oldest messages have been moved to file, because queue exceeded limit
+    """
+    # key of queue which keeps data when aren't any client socket
+    QUEUE_NOT_SENT_DATA = "Kolejka"
+    # policies of queue overflow
+    POLICY_DROP_OLDEST = "drop_oldest"
+    POLICY_DISCONNECT = "disconnect"
+    POLICY_SPILL_TO_DISK = "spill_to_disk"
+    LIST_POLICY = [POLICY_DROP_OLDEST, POLICY_DISCONNECT, POLICY_SPILL_TO_DISK]
+    # max number of bytes read from spill file to send by one call of send
+    SPILL_READ_SIZE = 65536
+
+    def __init__(self, on_add_log, get_address, max_bytes: int = 0, max_messages: int = 0,
+                 overflow_policy: str = "drop_oldest"):
+        """
+        :param on_add_log: <func(int,str,str,str)> function to add logs
+        :param get_address: <func(object) -> object> function which returns address of client, it is used in logs
+        :param max_bytes: <int> max number of bytes waiting to send to one client, 0 - without limit
+        :param max_messages: <int> max number of messages waiting to send to one client, 0 - without limit
+        :param overflow_policy: <str> one of LIST_POLICY
+
+        self.__data_to_send - <BroadcastLog> data to send shared by all clients, client (or QUEUE_NOT_SENT_DATA) is
+                                             key of reader
+        self.__spill_files - <dict[object, SpillFile]> client -> file with the oldest data to send, which didn't fit
+                                                       in memory
+        self.__number_dropped_messages - <dict[object, int]> client -> number of messages removed because of queue
+                                                             overflow
+        self.__clients - <set> connected clients
+        """
+        self.__on_add_log = on_add_log
+        self.__get_address = get_address
+        self.__max_bytes = max_bytes
+        self.__max_messages = max_messages
+        self.__overflow_policy = overflow_policy
+        self.__data_to_send = BroadcastLog(b"\r")
+        self.__data_to_send.add_reader(self.QUEUE_NOT_SENT_DATA)
+        self.__spill_files = {}
+        self.__number_dropped_messages = {self.QUEUE_NOT_SENT_DATA: 0}
+        self.__clients = set()
+
+    def add_client(self, key) -> None:
+        """
+        This method adds new client, if aren't other clients, then client takes data from QUEUE_NOT_SENT_DATA
+
+        :param key: <object> client identifier
+        :return: None
+        """
+        self.__clients.add(key)
+        self.__number_dropped_messages[key] = 0
+        if self.__data_to_send.has_reader(self.QUEUE_NOT_SENT_DATA):
+            self.__move_reader(self.QUEUE_NOT_SENT_DATA, key)
+        else:
+            self.__data_to_send.add_reader(key)
+
+    def remove_client(self, key) -> None:
+        """
+        This method removes client, if it was the last client, then its not sent data return to QUEUE_NOT_SENT_DATA
+
+        :param key: <object> client identifier
+        :return: None
+        """
+        if key not in self.__clients:
+            return
+        self.__clients.remove(key)
+        del self.__number_dropped_messages[key]
+        if len(self.__clients) == 0:
+            self.__move_reader(key, self.QUEUE_NOT_SENT_DATA)
+        else:
+            self.__remove_reader(key)
+
+    def remove_all_clients(self) -> None:
+        """
+        This method removes all clients with their not sent data
+
+        :return: None
+        """
+        for key in self.__clients:
+            del self.__number_dropped_messages[key]
+            self.__remove_reader(key)
+        self.__clients = set()
+        if not self.__data_to_send.has_reader(self.QUEUE_NOT_SENT_DATA):
+            self.__data_to_send.add_reader(self.QUEUE_NOT_SENT_DATA)
+
+    def append(self, data: bytes) -> list:
+        """
+        This method adds data to send to all clients (or to QUEUE_NOT_SENT_DATA if aren't any client) and checks limits.
+
+        :param data: <bytes> messages ended with '\r'
+        :return: <list> clients which exceeded limit and should be closed (policy "disconnect")
+        :logs: SKT_QOVF_DISCONNECT (8), SKT_QOVF_DROP (8), SKT_QOVF_SPILL (5)
+        """
+        self.__data_to_send.append(data)
+        if len(self.__clients) == 0:
+            self.__check_limit(self.QUEUE_NOT_SENT_DATA)
+            return []
+        return [key for key in self.__clients if not self.__check_limit(key)]
+
+    def send(self, key, func_send) -> (int, bytes):
+        """
+        This method gives not sent data of client to func_send, data from spill file are sent first.
+
+        :param key: <object> client identifier
+        :param func_send: <func(bytes | memoryview) -> int> function which sends data and returns number of sent bytes
+        :return: <int, bytes> number of sent bytes and sent bytes
+        """
+        if key not in self.__spill_files:
+            return self.__data_to_send.send(key, func_send)
+        spill_file = self.__spill_files[key]
+        data_to_send = spill_file.peek(self.SPILL_READ_SIZE)
+        number_sent_bytes = func_send(data_to_send)
+        sent_data = data_to_send[:number_sent_bytes]
+        spill_file.consume(sent_data)
+        if spill_file.get_number_of_bytes() == 0:
+            self.__spill_files.pop(key).close()
+        return number_sent_bytes, sent_data
+
+    def has_queue_not_sent_data(self) -> bool:
+        """
+        :return: <bool> True - aren't any client, so data are stored in QUEUE_NOT_SENT_DATA, False - otherwise
+        """
+        return self.__data_to_send.has_reader(self.QUEUE_NOT_SENT_DATA)
+
+    def clear_queue_not_sent_data(self) -> int:
+        """
+        This method removes data from QUEUE_NOT_SENT_DATA
+
+        :return: <int> number of removed bytes
+        """
+        if not self.__data_to_send.has_reader(self.QUEUE_NOT_SENT_DATA):
+            return 0
+        number_of_removed_bytes = self.get_number_of_bytes(self.QUEUE_NOT_SENT_DATA)
+        self.__data_to_send.skip(self.QUEUE_NOT_SENT_DATA)
+        if self.QUEUE_NOT_SENT_DATA in self.__spill_files:
+            self.__spill_files.pop(self.QUEUE_NOT_SENT_DATA).close()
+        return number_of_removed_bytes
+
+    def get_number_of_bytes(self, key) -> int:
+        """
+        :param key: <object> client identifier or QUEUE_NOT_SENT_DATA
+        :return: <int> number of bytes waiting to send in memory and in spill file
+        """
+        number_of_bytes = self.__data_to_send.get_number_of_bytes(key)
+        if key in self.__spill_files:
+            number_of_bytes += self.__spill_files[key].get_number_of_bytes()
+        return number_of_bytes
+
+    def get_number_of_messages(self, key) -> int:
+        """
+        :param key: <object> client identifier or QUEUE_NOT_SENT_DATA
+        :return: <int> number of messages waiting to send in memory and in spill file
+        """
+        number_of_messages = self.__data_to_send.get_number_of_messages(key)
+        if key in self.__spill_files:
+            number_of_messages += self.__spill_files[key].get_number_of_messages()
+        return number_of_messages
+
+    def get_number_dropped_messages(self, key) -> int:
+        """
+        :param key: <object> client identifier or QUEUE_NOT_SENT_DATA
+        :return: <int> number of messages removed because of queue overflow
+        """
+        return self.__number_dropped_messages[key]
+
+    def __check_limit(self, key) -> bool:
+        """
+        This method checks if queue of client doesn't exceed limits, if it exceeds, then overflow policy is used.
+
+        :param key: <object> client identifier or QUEUE_NOT_SENT_DATA
+        :return: <bool> True - queue is ok now, False - client should be closed
+        :logs: SKT_QOVF_DISCONNECT (8), SKT_QOVF_DROP (8), SKT_QOVF_SPILL (5)
+        """
+        is_exceeded_bytes = 0 < self.__max_bytes < self.__data_to_send.get_number_of_bytes(key)
+        is_exceeded_messages = 0 < self.__max_messages < self.__data_to_send.get_number_of_messages(key)
+        if not is_exceeded_bytes and not is_exceeded_messages:
+            return True
+
+        address = "" if key == self.QUEUE_NOT_SENT_DATA else self.__get_address(key)
+        if self.__overflow_policy == self.POLICY_DISCONNECT and key != self.QUEUE_NOT_SENT_DATA:
+            self.__on_add_log(8, "SKT_QOVF_DISCONNECT", address, "Queue exceeded limit, so client socket is closed")
+            return False
+
+        removed_data = self.__data_to_send.trim(key, self.__max_bytes, self.__max_messages)
+        if self.__overflow_policy == self.POLICY_SPILL_TO_DISK:
+            if key not in self.__spill_files:
+                self.__spill_files[key] = SpillFile(b"\r")
+            self.__spill_files[key].write(removed_data)
+            self.__on_add_log(5, "SKT_QOVF_SPILL", address, "Queue exceeded limit, so {} B have been moved to file"
+                              .format(len(removed_data)))
+        else:
+            number_of_messages = removed_data.count(b"\r")
+            self.__number_dropped_messages[key] += number_of_messages
+            self.__on_add_log(8, "SKT_QOVF_DROP", address, "Queue exceeded limit, so {} messages ({} B) have been "
+                                                           "removed".format(number_of_messages, len(removed_data)))
+        return True
+
+    def __move_reader(self, key, new_key) -> None:
+        """
+        This method moves data waiting to send (in memory and in spill file) to other reader
+
+        :param key: <object> client identifier or QUEUE_NOT_SENT_DATA
+        :param new_key: <object> client identifier or QUEUE_NOT_SENT_DATA
+        :return: None
+        """
+        self.__data_to_send.move_reader(key, new_key)
+        if key in self.__spill_files:
+            self.__spill_files[new_key] = self.__spill_files.pop(key)
+
+    def __remove_reader(self, key) -> None:
+        """
+        This method removes data waiting to send (in memory and in spill file) of reader
+
+        :param key: <object> client identifier
+        :return: None
+        """
+        self.__data_to_send.remove_reader(key)
+        if key in self.__spill_files:
+            self.__spill_files.pop(key).close()
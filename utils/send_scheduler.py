@@ -0,0 +1,271 @@
+"""This module chooses which queued message can be sent to COM port as next"""
+import heapq
+from bisect import bisect_left, insort
+from collections import deque
+from typing import Union
+
+
+class SendScheduler:
+    """
+        This class keeps messages to send in buckets (one bucket for one recipient) and chooses next message to send.
+
+        Message can be sent, when from the last sending from this bucket passed 'time_wait' of the first message in
+        bucket (or default time wait of bucket, if 'time_wait' is -1). From all messages which can be sent, the message with the
+        highest priority is chosen. If several buckets have the same priority, the first bucket starting from
+        self.__pointer is chosen (round-robin).
+
+        Buckets which are waiting are in heap ordered by time when they can send, buckets which can send are in
+        sorted lists grouped by priority, so choosing next message is O(log n).
+
+        Bucket never has two the same messages. Every bucket has dict message -> entry in queue, so duplicate is found
+        in O(1). When earlier message is removed because the same message was added at the beginning, its entry is only
+        marked as removed and is skipped when it gets to the beginning of the queue.
+    """
+    def __init__(self, number_of_buckets: int, default_time_wait: int):
+        """
+        :param number_of_buckets: <int> number of buckets (recipients)
+        :param default_time_wait: <int> time in ms between messages from the same bucket, used when message has
+                                        'time_wait' equal -1, it can be changed for every bucket separately
+
+        self.__buckets - <list[dict]> buckets with fields:
+                                - time_last_send - <int> time in ms when last message from this bucket was sent
+                                - messages - <deque[list[dict, bool]]> entries [message, is_not_removed], where
+                                        message is dict<"message": bytes, "time_wait": int, "priority": int>, first
+                                        entry is never removed
+                                - index - <dict[bytes, list[dict, bool]]> message -> not removed entry in 'messages'
+        self.__bucket_time_wait - <list[int]> bucket index -> default time wait of bucket in ms
+        self.__pointer - <int> index of bucket which will be preferred when several buckets have the same priority
+        self.__waiting_heap - <list[tuple(int, int, int)]> heap with (time when bucket can send, bucket index, version)
+        self.__ready_buckets - <dict[int, list[int]]> priority of first message -> sorted indexes of buckets which
+                                                      can send now
+        self.__bucket_ready_priority - <list[int | None]> priority under which bucket is in self.__ready_buckets,
+                                                          None - bucket isn't there
+        self.__bucket_version - <list[int]> entry in heap is valid only when has the same version like bucket
+        self.__number_of_messages - <int> number of messages in all buckets
+        """
+        self.__bucket_time_wait = [default_time_wait for _ in range(number_of_buckets)]
+        self.__buckets = [{"time_last_send": 0, "messages": deque(), "index": {}} for _ in range(number_of_buckets)]
+        self.__pointer = 0
+        self.__waiting_heap = []
+        self.__ready_buckets = {}
+        self.__bucket_ready_priority = [None for _ in range(number_of_buckets)]
+        self.__bucket_version = [0 for _ in range(number_of_buckets)]
+        self.__number_of_messages = 0
+
+    def add_message_front(self, bucket_index: int, msg: dict) -> Union[dict, None]:
+        """
+        This method adds message at the beginning of bucket. If the same message is already in bucket, then this
+        older message is removed.
+
+        :param bucket_index: <int> index of bucket
+        :param msg: <dict<"message": bytes, "time_wait": int (ms), "priority": int>> message to send
+        :return: <dict | None> removed duplicate or None
+        """
+        bucket = self.__buckets[bucket_index]
+        entry = [msg, True]
+        duplicate = bucket["index"].get(msg["message"])
+        if duplicate is None:
+            self.__number_of_messages += 1
+        else:
+            duplicate[1] = False
+        bucket["index"][msg["message"]] = entry
+        bucket["messages"].appendleft(entry)
+        self.__reindex_bucket(bucket_index)
+        return None if duplicate is None else duplicate[0]
+
+    def add_message_end(self, bucket_index: int, msg: dict) -> Union[dict, None]:
+        """
+        This method adds message at the end of bucket. If the same message is already in bucket, then new message
+        isn't added.
+
+        :param bucket_index: <int> index of bucket
+        :param msg: <dict<"message": bytes, "time_wait": int (ms), "priority": int>> message to send
+        :return: <dict | None> msg if it wasn't added because it is duplicate, otherwise None
+        """
+        bucket = self.__buckets[bucket_index]
+        if msg["message"] in bucket["index"]:
+            return msg
+        entry = [msg, True]
+        bucket["index"][msg["message"]] = entry
+        bucket["messages"].append(entry)
+        self.__number_of_messages += 1
+        if len(bucket["messages"]) == 1:
+            self.__reindex_bucket(bucket_index)
+        return None
+
+    def get_message_to_send(self, time_now: int) -> (int, Union[dict, None]):
+        """
+        This method returns message which should be sent now, message stays in bucket until mark_message_as_sent
+
+        :param time_now: <int> current time in ms
+        :return: <int, dict | None> index of bucket and message, or -1 and None if no message can be sent now
+        """
+        self.__move_ready_buckets(time_now)
+        if len(self.__ready_buckets) == 0:
+            return -1, None
+        list_bucket_index = self.__ready_buckets[max(self.__ready_buckets)]
+        i = bisect_left(list_bucket_index, self.__pointer)
+        bucket_index = list_bucket_index[i] if i < len(list_bucket_index) else list_bucket_index[0]
+        return bucket_index, self.__buckets[bucket_index]["messages"][0][0]
+
+    def get_messages_to_send(self, time_now: int, max_number: int) -> list:
+        """
+        This method returns up to max_number messages in the same order in which they would be returned by
+        get_message_to_send, if every message was marked as sent at time_now before getting the next one. Messages stay
+        in buckets, so if sending fails nothing has to be restored, after sending they must be marked as sent in
+        returned order.
+
+        :param time_now: <int> current time in ms
+        :param max_number: <int> max number of returned messages
+        :return: <list[tuple(int, dict)]> indexes of buckets and messages, empty if no message can be sent now
+        """
+        self.__move_ready_buckets(time_now)
+        ready_buckets = {priority: list(indexes) for priority, indexes in self.__ready_buckets.items()}
+        next_entry = {}
+        pointer = self.__pointer
+        list_msg = []
+        while len(list_msg) < max_number and len(ready_buckets) > 0:
+            priority = max(ready_buckets)
+            list_bucket_index = ready_buckets[priority]
+            i = bisect_left(list_bucket_index, pointer)
+            if i == len(list_bucket_index):
+                i = 0
+            bucket_index = list_bucket_index.pop(i)
+            if len(list_bucket_index) == 0:
+                del ready_buckets[priority]
+            if bucket_index == pointer:
+                pointer = (pointer + 1) % len(self.__buckets)
+
+            messages = self.__buckets[bucket_index]["messages"]
+            j = next_entry.get(bucket_index, 0)
+            list_msg.append((bucket_index, messages[j][0]))
+            j += 1
+            while j < len(messages) and not messages[j][1]:
+                j += 1
+            next_entry[bucket_index] = j
+            if j < len(messages):
+                msg = messages[j][0]
+                time_wait = msg["time_wait"] if msg["time_wait"] != -1 else self.__bucket_time_wait[bucket_index]
+                if time_wait <= 0:
+                    insort(ready_buckets.setdefault(msg["priority"], []), bucket_index)
+        return list_msg
+
+    def mark_message_as_sent(self, bucket_index: int, time_now: int) -> None:
+        """
+        This method removes first message from bucket after it has been sent
+
+        :param bucket_index: <int> index of bucket returned by get_message_to_send
+        :param time_now: <int> time in ms when message was sent
+        :return: None
+        """
+        bucket = self.__buckets[bucket_index]
+        msg, _ = bucket["messages"].popleft()
+        del bucket["index"][msg["message"]]
+        while len(bucket["messages"]) > 0 and not bucket["messages"][0][1]:
+            bucket["messages"].popleft()
+        bucket["time_last_send"] = time_now
+        self.__number_of_messages -= 1
+        if bucket_index == self.__pointer:
+            self.__pointer = (self.__pointer + 1) % len(self.__buckets)
+        self.__reindex_bucket(bucket_index)
+
+    def get_time_to_next_message(self, time_now: int) -> Union[int, None]:
+        """
+        This method returns how long to wait until any message can be sent
+
+        :param time_now: <int> current time in ms
+        :return: <int | None> time in ms (0 - message can be sent now), None - there aren't messages
+        """
+        self.__move_ready_buckets(time_now)
+        if len(self.__ready_buckets) > 0:
+            return 0
+        self.__remove_outdated_heap_entries()
+        if len(self.__waiting_heap) == 0:
+            return None
+        return self.__waiting_heap[0][0] - time_now
+
+    def set_default_time_wait(self, bucket_index: int, time_wait: int) -> None:
+        """
+        This method changes time between messages from bucket, which is used when message has 'time_wait' equal -1
+
+        :param bucket_index: <int> index of bucket
+        :param time_wait: <int> time in ms
+        :return: None
+        """
+        if self.__bucket_time_wait[bucket_index] == time_wait:
+            return
+        self.__bucket_time_wait[bucket_index] = time_wait
+        if len(self.__buckets[bucket_index]["messages"]) > 0:
+            self.__reindex_bucket(bucket_index)
+
+    def get_default_time_wait(self, bucket_index: int) -> int:
+        """
+        :param bucket_index: <int> index of bucket
+        :return: <int> time in ms between messages from bucket, used when message has 'time_wait' equal -1
+        """
+        return self.__bucket_time_wait[bucket_index]
+
+    def get_number_of_messages(self) -> int:
+        """
+        :return: <int> number of messages in all buckets
+        """
+        return self.__number_of_messages
+
+    def __reindex_bucket(self, bucket_index: int) -> None:
+        """
+        This method must be called after first message in bucket was changed. Bucket is removed from
+        self.__ready_buckets and old entries in heap are made outdated, then bucket is added to heap with new time.
+
+        :param bucket_index: <int> index of bucket
+        :return: None
+        """
+        priority = self.__bucket_ready_priority[bucket_index]
+        if priority is not None:
+            list_bucket_index = self.__ready_buckets[priority]
+            del list_bucket_index[bisect_left(list_bucket_index, bucket_index)]
+            if len(list_bucket_index) == 0:
+                del self.__ready_buckets[priority]
+            self.__bucket_ready_priority[bucket_index] = None
+        self.__bucket_version[bucket_index] += 1
+
+        bucket = self.__buckets[bucket_index]
+        if len(bucket["messages"]) == 0:
+            return
+        time_wait = bucket["messages"][0][0]["time_wait"]
+        if time_wait == -1:
+            time_wait = self.__bucket_time_wait[bucket_index]
+        entry = (bucket["time_last_send"] + time_wait, bucket_index, self.__bucket_version[bucket_index])
+        heapq.heappush(self.__waiting_heap, entry)
+        if len(self.__waiting_heap) > 4 * len(self.__buckets) + 64:
+            self.__waiting_heap = [e for e in self.__waiting_heap if e[2] == self.__bucket_version[e[1]]]
+            heapq.heapify(self.__waiting_heap)
+
+    def __move_ready_buckets(self, time_now: int) -> None:
+        """
+        This method moves buckets which can send now from self.__waiting_heap to self.__ready_buckets
+
+        :param time_now: <int> current time in ms
+        :return: None
+        """
+        while len(self.__waiting_heap) > 0 and self.__waiting_heap[0][0] <= time_now:
+            _, bucket_index, version = heapq.heappop(self.__waiting_heap)
+            if version != self.__bucket_version[bucket_index]:
+                continue
+            priority = self.__buckets[bucket_index]["messages"][0][0]["priority"]
+            if priority not in self.__ready_buckets:
+                self.__ready_buckets[priority] = []
+            insort(self.__ready_buckets[priority], bucket_index)
+            self.__bucket_ready_priority[bucket_index] = priority
+            self.__bucket_version[bucket_index] += 1
+
+    def __remove_outdated_heap_entries(self) -> None:
+        """
+        This method removes outdated entries from the top of self.__waiting_heap
+
+        :return: None
+        """
+        while len(self.__waiting_heap) > 0:
+            _, bucket_index, version = self.__waiting_heap[0]
+            if version == self.__bucket_version[bucket_index]:
+                return
+            heapq.heappop(self.__waiting_heap)
@@ -0,0 +1,76 @@
+"""This module keeps data to send in temporary file, when they can't be kept in memory"""
+import tempfile
+
+
+class SpillFile:
+    """
+        This class is FIFO queue of bytes in temporary file. File is removed from disk after close.
+
+        :param separator: <bytes> last byte of every message, used to count messages
+    """
+    def __init__(self, separator: bytes = b"\r"):
+        """
+        :param separator: <bytes> last byte of every message
+
+        self.__file - <file> temporary file, data are added at the end and read from self.__read_position
+        self.__read_position - <int> position of the first not read byte in file
+        self.__size - <int> number of bytes written to file
+        self.__number_of_messages - <int> number of messages which weren't read completely
+        """
+        self.__separator = separator
+        self.__file = tempfile.TemporaryFile(prefix="KL3_spill_")
+        self.__read_position = 0
+        self.__size = 0
+        self.__number_of_messages = 0
+
+    def write(self, data: bytes) -> None:
+        """
+        This method adds data at the end of file
+
+        :param data: <bytes> data to add
+        :return: None
+        """
+        self.__file.seek(self.__size)
+        self.__file.write(data)
+        self.__size += len(data)
+        self.__number_of_messages += data.count(self.__separator)
+
+    def peek(self, max_size: int) -> bytes:
+        """
+        This method returns first not read data, data stay in file until consume
+
+        :param max_size: <int> max number of returned bytes
+        :return: <bytes> data from the beginning of queue
+        """
+        self.__file.seek(self.__read_position)
+        return self.__file.read(min(max_size, self.__size - self.__read_position))
+
+    def consume(self, data: bytes) -> None:
+        """
+        This method removes data from the beginning of queue
+
+        :param data: <bytes> data returned by peek (or their beginning), which was used
+        :return: None
+        """
+        self.__read_position += len(data)
+        self.__number_of_messages -= data.count(self.__separator)
+
+    def get_number_of_bytes(self) -> int:
+        """
+        :return: <int> number of not read bytes
+        """
+        return self.__size - self.__read_position
+
+    def get_number_of_messages(self) -> int:
+        """
+        :return: <int> number of messages which weren't read completely
+        """
+        return self.__number_of_messages
+
+    def close(self) -> None:
+        """
+        This method closes and removes file
+
+        :return: None
+        """
+        self.__file.close()